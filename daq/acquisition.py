@@ -0,0 +1,125 @@
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+from daq.profiler import PROFILER, Histogram
+from daq.realtime import enable_realtime, disable_realtime, gc_paused
+from daq.scheduler import RateClock, SKIP
+
+
+class Acquisition:
+    """
+    Reads all sensors on a dedicated thread at a fixed rate.
+
+    Every sample is passed to the registered hooks on this thread first
+    (interlocks and anything else that must not wait for the GUI), then queued
+    for consumers such as the dashboard, which drain() it at their own pace.
+    An exception in a read or a hook is counted in error_count/last_error
+    and never stops the thread or the other hooks.
+
+    With realtime=True the thread asks for SCHED_FIFO priority and its own
+    CPU, and keeps the GC out of the hooks (the sensor read may allocate
+    freely); a dict instead passes enable_realtime() options, e.g.
+    {'lock_memory': True}, whose process-wide effects are undone when the
+    thread stops (see daq.realtime). Wakeup latency and period jitter are
+    recorded either way.
+    """
+
+    def __init__(self, read_sensors, period, policy=SKIP, maxlen=10000, realtime=False, name="acquisition"):
+        self.read_sensors = read_sensors
+        self.realtime = realtime     # False, True or a dict of enable_realtime() options
+        self.realtime_status = None  # what enable_realtime() managed to apply
+        self.wakeup_latency = Histogram()  # deadline to actual wakeup (ns)
+        self.jitter = Histogram()          # |interval between wakeups - period| (ns)
+        self.clock = RateClock(period, policy)
+        self.samples = deque(maxlen=maxlen)  # (timestamp, sample); oldest dropped if nobody drains
+        self.hooks = []
+        self.latest = (None, None)  # most recent (timestamp, sample), replaced whole
+        self.error_count = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # cuts the current wait short after a rate change
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def add_hook(self, hook):
+        """hook(timestamp, read_ns, sample) runs on the acquisition thread for every sample."""
+        self.hooks.append(hook)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+
+    def set_period(self, period):
+        self.clock.set_period(period)
+        self._wake.set()
+
+    def drain(self):
+        """Pop every queued (timestamp, sample) in arrival order."""
+        out = []
+        while self.samples:
+            out.append(self.samples.popleft())
+        return out
+
+    def _run(self):
+        if self.realtime:
+            self.realtime_status = enable_realtime(**(self.realtime if isinstance(self.realtime, dict) else {}))
+        try:
+            self._loop(gc_paused if self.realtime else nullcontext)
+        finally:
+            if self.realtime_status is not None:
+                disable_realtime(self.realtime_status)
+
+    def _loop(self, critical):
+        last_wakeup = None
+        while not self._stop.is_set():
+            self._wake.wait(self.clock.delay())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            deadline = self.clock.next_deadline
+            now = time.monotonic()
+            runs = self.clock.due(now)
+            if not runs:
+                continue
+            self._record_timing(now, deadline, last_wakeup)
+            last_wakeup = now
+            for _ in range(runs):
+                self._sample(critical)
+
+    def _record_timing(self, now, deadline, last_wakeup):
+        late_ns = int((now - deadline) * 1e9)
+        self.wakeup_latency.add(late_ns)
+        PROFILER.record("acq_wakeup", late_ns)
+        if last_wakeup is not None:
+            jitter_ns = int(abs(now - last_wakeup - self.clock.period) * 1e9)
+            self.jitter.add(jitter_ns)
+            PROFILER.record("acq_jitter", jitter_ns)
+
+    def _sample(self, critical=nullcontext):
+        try:
+            with PROFILER.span("read_sensors"):
+                sample = self.read_sensors()
+        except Exception as e:
+            self.error_count += 1
+            self.last_error = e
+            return
+        read_ns = time.perf_counter_ns()
+        timestamp = time.time()
+        with critical():
+            self._run_hooks(self.hooks, timestamp, read_ns, sample)
+        self.latest = (timestamp, sample)
+        self.samples.append((timestamp, sample))
+
+    def _run_hooks(self, hooks, timestamp, read_ns, sample):
+        # A failing hook is counted like a failed read; the others (interlocks included) still run
+        for hook in hooks:
+            try:
+                hook(timestamp, read_ns, sample)
+            except Exception as e:
+                self.error_count += 1
+                self.last_error = e
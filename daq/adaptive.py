@@ -0,0 +1,105 @@
+import time
+from collections import Counter
+import numpy as np
+from daq.channels import INDEX, N_CHANNELS
+
+# CONFIG
+BASE_PERIOD = 1.0    # s, sample period during steady holds
+FAST_PERIOD = 0.05   # s, sample period while something is changing; blocking reads must be retuned
+                     # for it (on_period, e.g. daq.tuning.PeriodTuning.apply) or every deadline is missed
+HOLD = 3.0           # s to stay fast after the last trigger
+DECAY = 1.5          # then the period grows by this factor per sample back to BASE_PERIOD
+RATE_WINDOW = 0.1    # s, rates are taken over at least this long so noise doesn't look like change
+
+# Rate of change (channel units per second) above which sampling speeds up
+THRESHOLDS = {
+    "Temperature": 2.0,
+    "RPM": 300.0,
+    "Thrust": 20.0,
+    "Torque": 2.0,
+    "grams_per_min": 100.0,
+}
+
+
+class AdaptiveRate:
+    """
+    Acquisition hook that samples fast while anything changes and slowly
+    otherwise. A channel changing faster than its threshold, or a control
+    event (throttle step, choke, cut/restart), switches the acquisition to
+    FAST_PERIOD; after HOLD seconds without a trigger the period decays
+    geometrically back to BASE_PERIOD. `on_period(period)` is called before
+    each change so the sensors can switch to reads that fit the new cycle;
+    deadlines missed while fast are counted in `fast_missed`.
+    """
+
+    def __init__(self, acquisition, thresholds=THRESHOLDS, base_period=BASE_PERIOD,
+                 fast_period=FAST_PERIOD, hold=HOLD, decay=DECAY, on_period=None):
+        self.acquisition = acquisition
+        self.on_period = on_period
+        self.base_period = base_period
+        self.fast_period = fast_period
+        self.hold = hold
+        self.decay = decay
+        self._limit = np.full(N_CHANNELS, np.inf)
+        for name, limit in thresholds.items():
+            self._limit[INDEX[name]] = limit
+        self._names = {INDEX[name]: name for name in thresholds}
+        self.period = base_period
+        self.triggers = Counter()  # boosts by cause (channel name or event name)
+        self.samples = 0
+        self.fast_samples = 0
+        self.fast_missed = 0
+        self._missed = acquisition.clock.stats.missed
+        self._fast_until = 0.0
+        self._ref_sample = None
+        self._ref_time = None
+        self._set_period(base_period)
+
+    def event(self, name):
+        """A control action happened (any thread): sample fast from now on."""
+        self._boost(name, time.time())
+
+    def check(self, timestamp, read_ns, sample):
+        """Acquisition hook: compare channel rates to their thresholds and adjust the period."""
+        self.samples += 1
+        missed = self.acquisition.clock.stats.missed
+        if self.period < self.base_period:
+            self.fast_samples += 1
+            self.fast_missed += missed - self._missed
+        self._missed = missed
+
+        if self._ref_time is None:
+            self._ref_sample, self._ref_time = sample.copy(), timestamp
+        elif timestamp - self._ref_time >= RATE_WINDOW:
+            with np.errstate(invalid='ignore'):
+                rates = np.abs(sample - self._ref_sample) / (timestamp - self._ref_time)
+                # NaN (missing reading) compares False, so it never triggers
+                over = np.flatnonzero(rates > self._limit)
+            self._ref_sample, self._ref_time = sample.copy(), timestamp
+            if over.size:
+                self._boost(self._names[int(over[0])], timestamp)
+                return
+
+        if timestamp >= self._fast_until and self.period < self.base_period:
+            self._set_period(min(self.base_period, self.period * self.decay))
+
+    def _boost(self, cause, now):
+        self.triggers[cause] += 1
+        self._fast_until = now + self.hold
+        if self.period != self.fast_period:
+            self._set_period(self.fast_period)
+
+    def _set_period(self, period):
+        if self.on_period is not None:
+            self.on_period(period)
+        self.period = period
+        self.acquisition.set_period(period)
+
+    def summary(self):
+        return {
+            'period': self.period,
+            'samples': self.samples,
+            'fast_samples': self.fast_samples,
+            'fast_missed': self.fast_missed,
+            'triggers': dict(self.triggers),
+        }
@@ -0,0 +1,238 @@
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from daq.channels import NAMES, derive_table
+from daq.export import export_chunks, side_path
+from daq.compress import is_compressed, read_uniform_table
+
+# CONFIG
+FORMATS = ('parquet', 'feather', 'npz')
+CACHE_FILE = "batch_cache.json"        # in the output directory
+SUMMARY_FILE = "campaign_summary.csv"  # one row per run
+HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    """SHA-256 of the file contents; the cache key for a run."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _float(value):
+    # Sensor modules used to log problems as strings ('No Raw Data'); those become NaN
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def sheet_names(path):
+    """Sheet names of a workbook (closed again right away)."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def read_sheet(path, sheet=None):
+    """
+    One sheet of a run workbook as a float64 structured array (first sheet by
+    default). Read-only mode streams rows instead of loading cell objects.
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ()) if name is not None]
+        columns = [[] for _ in header]
+        for row in rows:
+            for column, value in zip(columns, row):
+                column.append(_float(value))
+    finally:
+        wb.close()
+    table = np.empty(len(columns[0]) if columns else 0, dtype=[(name, 'f8') for name in header])
+    for name, column in zip(header, columns):
+        table[name] = column
+    return table
+
+
+def _add_derived(table):
+    """Fill in derived channels that runs logged before they existed are missing."""
+    derived = derive_table(table)
+    missing = [name for name in derived if name not in table.dtype.names]
+    if not missing:
+        return table
+    out = np.empty(len(table), dtype=table.dtype.descr + [(name, 'f8') for name in missing])
+    for name in table.dtype.names:
+        out[name] = table[name]
+    for name in missing:
+        out[name] = derived[name]
+    return out
+
+
+def summarize(table):
+    """Per-run statistics: size, timing and mean/std/min/max of every channel present."""
+    summary = {'rows': len(table)}
+    if 'Time' in table.dtype.names and len(table):
+        summary['start'] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(np.nanmin(table['Time'])))
+        summary['duration_s'] = round(float(np.nanmax(table['Time']) - np.nanmin(table['Time'])), 3)
+    if 'Throttle' in table.dtype.names:
+        throttles = table['Throttle'][np.isfinite(table['Throttle'])]
+        summary['throttle_settings'] = int(np.unique(throttles).size)
+        summary['throttle_max'] = float(throttles.max()) if throttles.size else np.nan
+    for name in NAMES:
+        if name not in table.dtype.names:
+            continue
+        column = table[name]
+        column = column[np.isfinite(column)]
+        summary[f"{name} valid"] = int(column.size)
+        if column.size:
+            summary[f"{name} mean"] = float(column.mean())
+            summary[f"{name} std"] = float(column.std())
+            summary[f"{name} min"] = float(column.min())
+            summary[f"{name} max"] = float(column.max())
+    return summary
+
+
+def _write(table, path, fmt, extra_tables):
+    if fmt == 'npz':
+        np.savez(path, **{name: table[name] for name in table.dtype.names})
+        for name, extra in extra_tables.items():
+            np.savez(side_path(path, name), **{field: extra[field] for field in extra.dtype.names})
+    else:
+        export_chunks([table], table.dtype, path, fmt, extra_tables=extra_tables)
+
+
+def convert_run(src, dst, fmt):
+    """Worker: convert one xlsx run to `fmt` and return its summary (compressed runs on their uniform grid)."""
+    sheets = sheet_names(src)
+    if is_compressed(src):
+        table = _add_derived(read_uniform_table(src))
+    else:
+        table = _add_derived(read_sheet(src, "Readings" if "Readings" in sheets else None))
+    extra = {'Segments': read_sheet(src, "Segments")} if "Segments" in sheets else {}
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    _write(table, dst, fmt, extra)
+    return summarize(table)
+
+
+def find_runs(src_dir):
+    """Every .xlsx under src_dir, as paths relative to it, in a stable order."""
+    runs = []
+    for root, _, files in os.walk(src_dir):
+        for name in files:
+            if name.endswith('.xlsx') and not name.startswith('~$'):
+                runs.append(os.path.relpath(os.path.join(root, name), src_dir))
+    return sorted(runs)
+
+
+def _load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def convert_campaign(src_dir, out_dir, fmt='parquet', jobs=None, force=False, progress=print):
+    """
+    Convert every run under src_dir into out_dir in parallel, skipping runs
+    whose content hash matches the cache. Writes the per-run summaries to
+    SUMMARY_FILE. Returns ({relative path: cache entry}, {relative path: error}).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown batch format: {fmt}")
+    if fmt != 'npz':
+        import pyarrow  # fail once here rather than in every worker
+    os.makedirs(out_dir, exist_ok=True)
+    cache_path = os.path.join(out_dir, CACHE_FILE)
+    cache = {} if force else _load_cache(cache_path)
+
+    todo = {}
+    entries = {}
+    for rel in find_runs(src_dir):
+        digest = file_hash(os.path.join(src_dir, rel))
+        output = os.path.splitext(rel)[0] + f".{fmt}"
+        cached = cache.get(rel)
+        if cached and cached['sha256'] == digest and cached['output'] == output \
+                and os.path.exists(os.path.join(out_dir, output)):
+            entries[rel] = cached
+        else:
+            todo[rel] = {'sha256': digest, 'output': output}
+    progress(f"{len(entries)} runs cached, {len(todo)} to convert")
+
+    failed = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(convert_run, os.path.join(src_dir, rel),
+                               os.path.join(out_dir, entry['output']), fmt): rel
+                   for rel, entry in todo.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            rel = futures[future]
+            try:
+                entries[rel] = dict(todo[rel], summary=future.result())
+                progress(f"[{done}/{len(todo)}] {rel}")
+            except Exception as e:
+                failed[rel] = e
+                progress(f"[{done}/{len(todo)}] {rel} FAILED: {e}")
+
+    entries = dict(sorted(entries.items()))
+    with open(cache_path, 'w') as f:
+        json.dump(entries, f, indent=1)
+    write_summary(entries, os.path.join(out_dir, SUMMARY_FILE))
+    return entries, failed
+
+
+def write_summary(entries, path):
+    fields = ['run']
+    for entry in entries.values():
+        fields += [key for key in entry['summary'] if key not in fields]
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for rel, entry in entries.items():
+            writer.writerow(dict(entry['summary'], run=rel))
+
+
+def load_run(path):
+    """A converted run as a DataFrame."""
+    import pandas as pd
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return pd.DataFrame({name: data[name] for name in data.files})
+    if path.endswith('.feather'):
+        return pd.read_feather(path)
+    return pd.read_parquet(path)
+
+
+def load_campaign(out_dir):
+    """Every converted run in out_dir as one DataFrame with a 'Run' column."""
+    import pandas as pd
+    entries = _load_cache(os.path.join(out_dir, CACHE_FILE))
+    frames = [load_run(os.path.join(out_dir, entry['output'])).assign(Run=rel)
+              for rel, entry in entries.items()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# Usage: python -m daq.batch <runs dir> [-o out dir] [-f parquet|feather|npz] [-j jobs] [--force]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert archived xlsx runs to a columnar format and summarize them.")
+    parser.add_argument('src', help="directory searched recursively for .xlsx runs")
+    parser.add_argument('-o', '--out', default=None, help="output directory (default: <src>_converted)")
+    parser.add_argument('-f', '--format', default='parquet', choices=FORMATS)
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--force', action='store_true', help="ignore the cache and convert everything")
+    args = parser.parse_args()
+
+    out = args.out or args.src.rstrip('/\\') + "_converted"
+    start = time.perf_counter()
+    entries, failed = convert_campaign(args.src, out, args.format, args.jobs, args.force)
+    print(f"{len(entries)} runs in {out} ({len(failed)} failed) in {time.perf_counter() - start:.1f} s; "
+          f"summaries in {os.path.join(out, SUMMARY_FILE)}")
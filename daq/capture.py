@@ -0,0 +1,195 @@
+import os
+import re
+import time
+import queue
+import threading
+from collections import deque
+import numpy as np
+from daq.export import export_chunks
+from daq.interlocks import InterlockEngine
+from daq.scheduler import RateClock, SKIP
+
+# CONFIG
+CAPTURE_PERIOD = 0.01    # s between reads of the fast sources
+PRE = 2.0                # s kept before the trigger
+POST = 5.0               # s recorded after it
+CAPTURE_DIR = "captures"
+CAPTURE_FORMAT = 'csv'   # any daq.export format; csv needs no extra packages
+
+# Signal triggers, in the interlock rule format (max / min / max_rate / hold per channel),
+# checked on the acquisition's samples. A capture re-arms them when it is written.
+TRIGGER_RULES = [
+    {'channel': "RPM", 'max_rate': 3000},
+    {'channel': "Thrust", 'max_rate': 200},
+]
+
+EVENT_DTYPE = np.dtype([('Offset', 'f8'), ('Event', 'U32')])
+
+
+class TriggerCapture:
+    """
+    Oscilloscope-style capture from the rig's fast sources. `sources`
+    ({channel: read()}, e.g. {'RPM': read_rpm_instant}) are polled every
+    CAPTURE_PERIOD on the capture's own thread into a preallocated ring
+    holding PRE + POST seconds; `streams` ({table: LoadCellStream}) already
+    keep their own high-rate ring and are cut to the same window. The full
+    sensor read and the run log keep their normal rate.
+
+    A control event (trigger(), from any thread) or a signal rule freezes
+    the window from PRE before the trigger to POST after it and writes it to
+    its own file on a worker thread: the polled channels as the main table,
+    each stream and the triggers ("Events") as side tables. Triggers during
+    a capture are listed in it instead of starting another.
+    """
+
+    def __init__(self, acquisition, sources, streams=None, rules=TRIGGER_RULES, pre=PRE, post=POST,
+                 period=CAPTURE_PERIOD, directory=CAPTURE_DIR, fmt=CAPTURE_FORMAT):
+        self.sources = dict(sources)
+        self.streams = dict(streams or {})
+        self.pre, self.post, self.period = pre, post, period
+        self.directory, self.fmt = directory, fmt
+        self.dtype = np.dtype([('Time', 'f8'), ('Offset', 'f8')] + [(name, 'f8') for name in self.sources])
+        capacity = int(np.ceil((pre + post) / period * 1.25)) + 16
+        self._values = np.full((capacity, len(self.sources)), np.nan)
+        self._times = np.full(capacity, -np.inf)   # time.monotonic(), as the streams use
+        self._count = 0
+        self._signals = InterlockEngine(rules) if rules else None
+        self._pending = deque()   # (time, cause) from trigger() and the rules, taken by the capture thread
+        self._active = None       # (trigger time, [(time, cause), ...]) while recording
+        self._writes = queue.Queue()
+        self.captures = []        # paths written
+        self.errors = []
+        self.read_errors = 0
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="capture-writer", daemon=True)
+        self._writer.start()
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        if self._signals is not None:
+            acquisition.add_hook(self._check_rules)
+
+    def trigger(self, cause):
+        """A control event happened (any thread)."""
+        self._pending.append((time.monotonic(), cause))
+
+    @property
+    def recording(self):
+        return self._active is not None
+
+    def _check_rules(self, timestamp, read_ns, sample):
+        # Acquisition hook; rules are re-armed by the capture thread once the capture is written
+        if self._active is None and not self._signals.tripped:
+            self._signals.check(timestamp, read_ns, sample)
+            if self._signals.tripped:
+                self._pending.append((time.monotonic(), self._signals.trip_reason))
+
+    def _run(self):
+        clock = RateClock(self.period, SKIP)
+        readers = list(self.sources.values())
+        while not self._stop.is_set():
+            self._stop.wait(clock.delay())
+            if not clock.due():
+                continue
+            i = self._count % len(self._times)
+            for c, read in enumerate(readers):
+                try:
+                    self._values[i, c] = read()
+                except Exception:
+                    self._values[i, c] = np.nan
+                    self.read_errors += 1
+            now = time.monotonic()
+            self._times[i] = now
+            self._count += 1
+
+            while self._pending:
+                when, cause = self._pending.popleft()
+                if self._active is None:
+                    self._active = (when, [])
+                self._active[1].append((when, cause))
+            if self._active is not None and now >= self._active[0] + self.post:
+                self._freeze()
+
+    def _freeze(self):
+        t0, events = self._active
+        self._active = None
+        keep = np.flatnonzero(self._times >= t0 - self.pre)
+        keep = keep[np.argsort(self._times[keep])]
+        streams = {}
+        for name, stream in self.streams.items():
+            times, values, _ = stream.since(0)
+            inside = times >= t0 - self.pre
+            streams[name] = (times[inside], values[inside])
+        # Copy now; the rings are overwritten while the file is written
+        self._writes.put((t0, events, self._times[keep], self._values[keep], streams))
+        if self._signals is not None:
+            self._signals.reset()
+
+    def _write_loop(self):
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            try:
+                self.captures.append(self._write(*item))
+            except Exception as e:
+                self.errors.append(e)
+
+    def _table(self, dtype, t0, wall, times, values, names):
+        table = np.empty(len(times), dtype=dtype)
+        table['Time'] = times + wall
+        table['Offset'] = times - t0
+        for c, name in enumerate(names):
+            table[name] = values[:, c]
+        return table
+
+    def _write(self, t0, events, times, values, streams):
+        wall = time.time() - time.monotonic()   # monotonic -> wall clock for the Time columns
+        table = self._table(self.dtype, t0, wall, times, values, list(self.sources))
+        extra = {}
+        for name, (stream_times, stream_values) in streams.items():
+            cells = [f"{name} {c + 1}" for c in range(stream_values.shape[1])]
+            dtype = np.dtype([('Time', 'f8'), ('Offset', 'f8')] + [(cell, 'f8') for cell in cells])
+            extra[name] = self._table(dtype, t0, wall, stream_times, stream_values, cells)
+        extra['Events'] = np.array([(when - t0, cause[:32]) for when, cause in events], dtype=EVENT_DTYPE)
+        name = re.sub(r'\W+', '_', events[0][1]).strip('_')
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(t0 + wall)) + f"_{int((t0 + wall) * 1000) % 1000:03d}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"capture_{stamp}_{name}.{self.fmt}")
+        export_chunks([table], self.dtype, path, self.fmt, extra_tables=extra)
+        return path
+
+    def stop(self):
+        """Write a capture still in progress (cut short) and wait for pending files."""
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        if self._active is not None:
+            self._freeze()
+        self._writes.put(None)
+        self._writer.join(timeout=10.0)
+
+
+# Standalone demo with a simulated fast tach and load cell stream: python -m daq.capture
+if __name__ == '__main__':
+    from daq.acquisition import Acquisition
+    from daq.channels import make_mock_reader
+    from daq.spectrum import SyntheticVibration
+
+    start = time.monotonic()
+    fake_rpm = lambda: 3000 + 1500 * np.tanh((time.monotonic() - start - 1.5) * 4)  # step at the trigger
+    acquisition = Acquisition(make_mock_reader(), 1.0)
+    capture = TriggerCapture(acquisition, {'RPM': fake_rpm}, streams={'Load Cell': SyntheticVibration(fs=80.0)},
+                             rules=[], pre=1.0, post=1.0)
+    acquisition.start()
+    time.sleep(1.5)
+    capture.trigger("throttle")
+    time.sleep(0.3)
+    capture.trigger("choke")   # within the same capture
+    time.sleep(1.2)
+    acquisition.stop()
+    capture.stop()
+    logged = len(acquisition.drain())
+    for path in capture.captures:
+        rows = sum(1 for _ in open(path)) - 1
+        print(f"{path}: {rows} rows at {CAPTURE_PERIOD * 1000:.0f} ms (run log got {logged} samples meanwhile)")
+    for e in capture.errors:
+        print(f"Capture failed: {e}")
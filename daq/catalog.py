@@ -0,0 +1,210 @@
+import os
+import time
+import socket
+import sqlite3
+import argparse
+from contextlib import closing
+from datetime import datetime, timedelta
+import numpy as np
+from daq.channels import NAMES
+
+# CONFIG
+CATALOG_FILE = "runs.sqlite"
+RUNS_DIR = "runs"               # where the dashboards save runs
+RIG_NAME = socket.gethostname()  # recorded with every run unless a rig name is given
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    path          TEXT UNIQUE NOT NULL,
+    rig           TEXT,
+    started       TEXT,     -- local time, 'YYYY-MM-DD HH:MM:SS' (SQLite date functions work on it)
+    duration_s    REAL,
+    rows          INTEGER,
+    throttle_min  REAL,
+    throttle_max  REAL,
+    format        TEXT,
+    compressed    INTEGER DEFAULT 0,
+    added         TEXT
+);
+CREATE TABLE IF NOT EXISTS stats (
+    run_id   INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    channel  TEXT NOT NULL,
+    valid    INTEGER,
+    mean     REAL,
+    std      REAL,
+    min      REAL,
+    max      REAL,
+    PRIMARY KEY (run_id, channel)
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS stats_channel_max ON stats(channel, max);
+"""
+
+STAT_FIELDS = ('valid', 'mean', 'std', 'min', 'max')
+
+
+def run_path(rig=RIG_NAME, fmt='xlsx', directory=RUNS_DIR, started=None):
+    """A new, unused file name for a run: runs/<rig>_<YYYYmmdd_HHMMSS>.<fmt>"""
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(started))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{rig}_{stamp}.{fmt}")
+    n = 2
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{rig}_{stamp}_{n}.{fmt}")
+        n += 1
+    return path
+
+
+def run_summary(columns):
+    """
+    Catalog entry for one run from its columns ({name: array}, 'Time' and
+    'Throttle' included): (run metadata, {channel: statistics}).
+    """
+    def finite(name):
+        column = np.asarray(columns[name], dtype=np.float64) if name in columns else np.empty(0)
+        return column[np.isfinite(column)]
+
+    times, throttles = finite('Time'), finite('Throttle')
+    meta = {
+        'rows': len(next(iter(columns.values()), ())),
+        'started': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(times.min())) if times.size else None,
+        'duration_s': round(float(times.max() - times.min()), 3) if times.size else None,
+        'throttle_min': float(throttles.min()) if throttles.size else None,
+        'throttle_max': float(throttles.max()) if throttles.size else None,
+    }
+    stats = {}
+    for name in NAMES:
+        if name not in columns:
+            continue
+        column = finite(name)
+        stats[name] = (int(column.size),) + ((float(column.mean()), float(column.std()),
+                                              float(column.min()), float(column.max()))
+                                             if column.size else (None,) * 4)
+    return meta, stats
+
+
+class RunCatalog:
+    """
+    Local index of recorded runs in SQLite: one row per run (file, rig, start,
+    duration, throttle range) plus per-channel summary statistics computed
+    when the run is added, so runs can be searched (find()) without opening
+    any data file. Every call opens its own connection, so rigs on other
+    threads or processes can add runs to the same catalog.
+    """
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        with closing(self._connect()) as db, db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10.0)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        return db
+
+    def add(self, path, columns, rig=RIG_NAME, compressed=False):
+        """Record a saved run from its columns (see run_summary); re-adding a path replaces its entry."""
+        meta, stats = run_summary(columns)
+        fmt = os.path.splitext(path)[1].lstrip('.').lower()
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM runs WHERE path = ?", (os.path.abspath(path),))
+            cursor = db.execute(
+                "INSERT INTO runs (path, rig, started, duration_s, rows, throttle_min, throttle_max,"
+                " format, compressed, added) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', 'localtime'))",
+                (os.path.abspath(path), rig, meta['started'], meta['duration_s'], meta['rows'],
+                 meta['throttle_min'], meta['throttle_max'], fmt, int(compressed)))
+            db.executemany(f"INSERT INTO stats (run_id, channel, {', '.join(STAT_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           [(cursor.lastrowid, name, *values) for name, values in stats.items()])
+            return cursor.lastrowid
+
+    def add_run_log(self, path, run_log, rig=RIG_NAME, compressed=False):
+        """Record a run just saved from a daq.storage.RunLog (statistics from the lossless log)."""
+        return self.add(path, {name: run_log.column(name) for name in run_log.dtype.names}, rig, compressed)
+
+    def add_chunks(self, path, chunks, rig=RIG_NAME, compressed=False):
+        """Record a run from the structured-array chunks it was saved from (e.g. a BackgroundExport's snapshot)."""
+        chunks = list(chunks)
+        columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0].dtype.names} if chunks else {}
+        return self.add(path, columns, rig, compressed)
+
+    def add_file(self, path, rig=RIG_NAME):
+        """Index an existing run file (any format daq.compare reads)."""
+        from daq.compare import read_columns
+        return self.add(path, read_columns(path, NAMES), rig)
+
+    def find(self, rig=None, since=None, until=None, above=None, below=None):
+        """
+        Runs matching every given condition, oldest first, as dicts.
+        since/until: 'YYYY-MM-DD[ HH:MM:SS]' bounds on the start time;
+        above/below: {channel: value} on the channel's maximum over the run,
+        e.g. find(since='2026-09-01', above={'RPM': 5000}).
+        """
+        joins, where, params = [], [], []
+        for n, (op, limits) in enumerate((('>', above or {}), ('<', below or {}))):
+            for m, (channel, value) in enumerate(limits.items()):
+                alias = f"s{n}_{m}"
+                joins.append(f"JOIN stats {alias} ON {alias}.run_id = runs.id "
+                             f"AND {alias}.channel = ? AND {alias}.max {op} ?")
+                params += [channel, value]
+        for clause, value in (("runs.rig = ?", rig), ("runs.started >= ?", since), ("runs.started < ?", until)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"SELECT runs.* FROM runs {' '.join(joins)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with closing(self._connect()) as db:
+            return [dict(row) for row in db.execute(sql + " ORDER BY runs.started", params)]
+
+    def stats(self, run_id):
+        """{channel: {valid, mean, std, min, max}} of one run."""
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT * FROM stats WHERE run_id = ?", (run_id,))
+            return {row['channel']: {field: row[field] for field in STAT_FIELDS} for row in rows}
+
+    def remove_missing(self):
+        """Drop entries whose file no longer exists; returns how many."""
+        with closing(self._connect()) as db, db:
+            gone = [(row['id'],) for row in db.execute("SELECT id, path FROM runs") if not os.path.exists(row['path'])]
+            db.executemany("DELETE FROM runs WHERE id = ?", gone)
+        return len(gone)
+
+
+def _limits(pairs):
+    limits = {}
+    for pair in pairs or []:
+        channel, _, value = pair.rpartition('=')
+        limits[channel] = float(value)
+    return limits
+
+
+# Usage: python -m daq.catalog [--add FILE ...] [--rig R] [--days N | --since DATE] [--above RPM=5000] [--below ...]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Search the run catalog (or add existing run files to it).")
+    parser.add_argument('--catalog', default=CATALOG_FILE)
+    parser.add_argument('--add', nargs='+', metavar='FILE', help="index these run files first")
+    parser.add_argument('--rig')
+    parser.add_argument('--days', type=float, help="runs started in the last N days")
+    parser.add_argument('--since', help="runs started on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="runs started before this date")
+    parser.add_argument('--above', nargs='+', metavar='CHANNEL=VALUE', help="channel maximum above a value")
+    parser.add_argument('--below', nargs='+', metavar='CHANNEL=VALUE', help="channel maximum below a value")
+    args = parser.parse_args()
+
+    catalog = RunCatalog(args.catalog)
+    for path in args.add or []:
+        catalog.add_file(path, args.rig or RIG_NAME)
+        print(f"Added {path}")
+    since = args.since
+    if args.days is not None:
+        since = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d %H:%M:%S")
+    start = time.perf_counter()
+    runs = catalog.find(args.rig, since, args.until, _limits(args.above), _limits(args.below))
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    for run in runs:
+        throttle = "-" if run['throttle_min'] is None else f"{run['throttle_min']:.0f}-{run['throttle_max']:.0f}"
+        print(f"{run['started']}  {run['rig'] or '-':<12} {run['duration_s'] or 0:>8.0f} s  "
+              f"throttle {throttle:<7}  {run['path']}")
+    print(f"{len(runs)} runs ({elapsed_ms:.1f} ms)")
@@ -0,0 +1,183 @@
+import time
+import random
+from collections import namedtuple
+import numpy as np
+from daq.profiler import PROFILER
+from daq.derived import DerivedChannels
+from daq.filters import FilterBank
+
+# One entry per logged channel. Adding a channel means adding one line here:
+#   name      column / key used in logs
+#   unit      engineering unit shown on the dashboard
+#   dtype     storage dtype for run history
+#   rate      nominal sample rate (Hz)
+#   label     dashboard caption
+#   slot      where the compact dashboard shows it: ('top', column), ('thrust',) or None
+#   source    (sensor reader, key in the dict it returns), ('derived', expression)
+#             or ('filter', source channel, chain spec)
+#   mock      (low, high) range for the mock reader (None for computed channels)
+Channel = namedtuple('Channel', 'name unit dtype rate label slot source mock')
+
+CHANNELS = [
+    Channel("Temperature",    "°C",    "float32", 1, "Temperature", ('top', 0), ('temp', 'target_temp'),       (15, 100)),
+    Channel("RPM",            "RPM",   "float32", 1, "RPM",         ('top', 1), ('rpm', 'rpm'),                (0, 6000)),
+    Channel("Load Cell 1",    "N",     "float32", 1, "Load Cell 1", None,       ('load_cells', 'Load Cell 1 (Raw)'), (-1000, 1000)),
+    Channel("Load Cell 2",    "N",     "float32", 1, "Load Cell 2", None,       ('load_cells', 'Load Cell 2 (Raw)'), (-1000, 1000)),
+    Channel("grams_per_min",  "g/min", "float32", 1, "Fuel Flow",   None,       ('flow', 'grams_per_min'),     (0, 2000)),
+    # Vibration from the high-rate load cell stream (daq.spectrum)
+    Channel("Vib RMS",        "N",     "float32", 1, "Vibration",   None,       ('vibration', 'rms'),          (0, 20)),
+    Channel("Vib Peak",       "Hz",    "float32", 1, "Vib Peak",    None,       ('vibration', 'peak_hz'),      (1, 20)),
+    Channel("Vib Low",        "N",     "float32", 1, "Vib 1-8 Hz",  None,       ('vibration', 'band_low'),     (0, 10)),
+    Channel("Vib Mid",        "N",     "float32", 1, "Vib 8-16 Hz", None,       ('vibration', 'band_mid'),     (0, 10)),
+    Channel("Vib High",       "N",     "float32", 1, "Vib 16+ Hz",  None,       ('vibration', 'band_high'),    (0, 10)),
+    Channel("Vib 1x",         "%",     "float32", 1, "Vib 1x RPM",  None,       ('vibration', 'order1'),       (0, 100)),
+    Channel("Vib 2x",         "%",     "float32", 1, "Vib 2x RPM",  None,       ('vibration', 'order2'),       (0, 100)),
+]
+
+# Constants usable by name in derived channel expressions
+CONSTANTS = {
+    'DENSITY': 871,        # fuel density, g/L (as in sensors/flow.py)
+}
+
+# Derived channels: computed from the channels above on every sample, then shown
+# and logged like any other channel. Expressions are NumPy arithmetic over
+# channel names (`backticks` for names with spaces) and CONSTANTS, plus the
+# functions in daq.derived.FUNCTIONS. Later entries may use earlier ones.
+#   (name, unit, dtype, label, slot, expression)
+DERIVED = [
+    # The thrust cell and the torque-arm cell, as the dashboard has always shown them
+    ("Thrust",         "N",     "float32", "Thrust",      ('thrust',), "`Load Cell 1`"),
+    ("Torque",         "N",     "float32", "Torque",      ('top', 2),  "`Load Cell 2`"),
+    ("liters_per_min", "L/min", "float32", "Fuel Flow",   ('top', 3),  "grams_per_min / DENSITY"),
+    ("fuel_per_rev",   "mg/rev","float32", "Fuel / Rev",  None,        "where(RPM > 0, grams_per_min * 1000 / RPM, nan)"),
+]
+
+# Filtered channels: a daq.filters chain run over another channel (measured or
+# derived) as samples arrive, using their real timestamps. Entries with the same
+# chain are filtered together as one vector.
+#   (name, unit, dtype, label, slot, source channel, chain)
+FILTERED = [
+    ("RPM accel",      "RPM/s", "float32", "RPM Accel",   None,        "RPM",
+     [('savgol', {'window': 9, 'order': 2, 'deriv': 1})]),
+    ("Temperature (Filtered)", "°C", "float32", "Temp Filtered", None, "Temperature",
+     [('median', {'window': 3}), ('savgol', {'window': 5, 'order': 1})]),
+    ("RPM (Filtered)", "RPM",   "float32", "RPM Filtered", None,       "RPM",
+     [('median', {'window': 3}), ('savgol', {'window': 5, 'order': 1})]),
+]
+
+N_BASE = len(CHANNELS)  # measured channels come first; derived, then filtered ones follow
+CHANNELS += [Channel(name, unit, dtype, 1, label, slot, ('derived', expr), None)
+             for name, unit, dtype, label, slot, expr in DERIVED]
+N_DERIVED = len(CHANNELS)
+CHANNELS += [Channel(name, unit, dtype, 1, label, slot, ('filter', source, chain), None)
+             for name, unit, dtype, label, slot, source, chain in FILTERED]
+
+NAMES = [c.name for c in CHANNELS]
+INDEX = {c.name: i for i, c in enumerate(CHANNELS)}
+N_CHANNELS = len(CHANNELS)
+
+DERIVATIONS = DerivedChannels([(INDEX[c.name], c.source[1]) for c in CHANNELS[N_BASE:N_DERIVED]],
+                              INDEX, dict(CONSTANTS, nan=np.nan))
+
+
+def new_filter_bank():
+    """Fresh filter state for one stream of samples (filters are stateful)."""
+    return FilterBank([(INDEX[c.source[1]], c.source[2]) for c in CHANNELS[N_DERIVED:]])
+
+
+_MOCK_LOW = np.array([c.mock[0] for c in CHANNELS[:N_BASE]], dtype=np.float64)
+_MOCK_SPAN = np.array([c.mock[1] - c.mock[0] for c in CHANNELS[:N_BASE]], dtype=np.float64)
+
+
+def new_sample():
+    """Empty sample record: one float64 per channel, NaN meaning 'missing'."""
+    return np.full(N_CHANNELS, np.nan)
+
+
+def make_mock_reader():
+    """A read_sensors() producing random values for every measured channel, with its own filter state."""
+    filters = new_filter_bank()
+
+    def read_mock_sample(out=None):
+        """Mocks reading all channels into a sample record."""
+        if out is None:
+            out = np.empty(N_CHANNELS)
+        out[:N_BASE] = _MOCK_LOW + _MOCK_SPAN * np.random.random(N_BASE)
+        np.round(out[:N_BASE], 2, out=out[:N_BASE])
+        DERIVATIONS.apply(out)
+        filters.step(out, time.monotonic(), out[N_DERIVED:])
+        return out
+
+    return read_mock_sample
+
+
+def make_reader(readers):
+    """
+    Build a read_sensors() for the real hardware.
+
+    `readers` maps each source name used in CHANNELS to the sensor function that
+    returns its dict, e.g. {'temp': read_temp, 'rpm': read_rpm, ...}. Each sensor
+    function is called once per sample and its values are written straight into
+    the record by channel position, then the derived and filtered channels
+    are computed.
+    """
+    filters = new_filter_bank()
+    plan = []  # (source name, reader, [(key, index), ...])
+    for source in dict.fromkeys(c.source[0] for c in CHANNELS[:N_BASE]):
+        fields = [(c.source[1], i) for i, c in enumerate(CHANNELS) if c.source[0] == source]
+        plan.append((f"read:{source}", readers[source], fields))
+
+    def read_sensors(out=None):
+        if out is None:
+            out = np.empty(N_CHANNELS)
+        for span_name, reader, fields in plan:
+            with PROFILER.span(span_name):
+                values = reader()
+            for key, idx in fields:
+                value = values.get(key)
+                # Sensor modules report problems as None or a status string
+                out[idx] = value if isinstance(value, (int, float)) else np.nan
+        with PROFILER.span("derive"):
+            DERIVATIONS.apply(out)
+        with PROFILER.span("filter_bank"):
+            filters.step(out, time.monotonic(), out[N_DERIVED:])
+        return out
+
+    return read_sensors
+
+
+def _column(table, name):
+    try:
+        return np.asarray(table[name], dtype=np.float64)
+    except (KeyError, ValueError):
+        return None
+
+
+def derive_table(table):
+    """
+    Recompute the derived and filtered channels of a recorded run in one
+    vectorized pass. `table` is anything indexed by channel name (structured
+    array, DataFrame); measured channels missing from it count as NaN, and
+    filtered channels need its 'Time' column. Filtered channels the table
+    already holds are taken as recorded. Returns {name: array}.
+    """
+    rows = len(table)
+    x = np.full((rows, N_CHANNELS), np.nan)
+    for i, name in enumerate(NAMES[:N_BASE]):
+        column = _column(table, name)
+        if column is not None:
+            x[:, i] = column
+    DERIVATIONS.apply(x)
+    recorded = {i: _column(table, NAMES[i]) for i in range(N_DERIVED, N_CHANNELS)}
+    t = _column(table, 'Time')
+    if all(column is not None for column in recorded.values()):
+        for i, column in recorded.items():
+            x[:, i] = column
+    elif t is not None and rows:
+        x[:, N_DERIVED:] = new_filter_bank().run(x, t)
+    return {name: x[:, i] for i, name in enumerate(NAMES) if i >= N_BASE}
+
+
+def as_dict(sample):
+    """Name -> value view of a sample record (for printing and debugging)."""
+    return dict(zip(NAMES, sample.tolist()))
@@ -0,0 +1,233 @@
+import os
+import argparse
+import numpy as np
+from daq.channels import derive_table
+from daq.compress import is_compressed, read_uniform_table
+from daq.export import export_chunks
+
+# CONFIG
+COMPARE_CHANNELS = ("RPM", "Thrust", "Temperature", "liters_per_min")
+Z95 = 1.96          # two-sided 95 % (normal; segments hold far more than 30 samples)
+STEP_PRE = 2.0      # s of data kept before each throttle step
+STEP_POST = 10.0    # s after it
+STEP_BIN = 0.25     # s; time-since-step grid
+
+
+def read_columns(path, names=COMPARE_CHANNELS):
+    """
+    Time, Throttle and the compared channels of one run, as float64 arrays.
+    Reads exported/converted runs (xlsx, csv, npz, parquet, feather);
+    compressed runs are resampled every GRID_PERIOD (daq.compress). Derived
+    channels the run predates are recomputed from its measured ones.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if is_compressed(path):
+        table = read_uniform_table(path)
+    elif ext == '.xlsx':
+        from daq.batch import read_sheet, sheet_names
+        sheets = sheet_names(path)
+        table = read_sheet(path, "Readings" if "Readings" in sheets else None)
+    elif ext == '.csv':
+        # Keep the header as written ("Load Cell 1"); genfromtxt would otherwise turn spaces into '_'
+        table = np.genfromtxt(path, delimiter=',', names=True, deletechars='', replace_space=' ', dtype='f8')
+    else:
+        from daq.batch import load_run
+        table = load_run(path)
+    fields = table.dtype.names if hasattr(table, 'dtype') and table.dtype.names else list(table.columns)
+    derived = derive_table(table)
+    columns = {}
+    for name in ('Time', 'Throttle') + tuple(names):
+        if name in fields:
+            columns[name] = np.asarray(table[name], dtype=np.float64)
+        elif name in derived:
+            columns[name] = derived[name]
+        else:
+            columns[name] = np.full(len(table), np.nan)
+    return columns
+
+
+def _grouped_moments(group, n_groups, x):
+    """Per-group count, mean, variance and lag-1 autocorrelation of x (NaN ignored)."""
+    valid = np.isfinite(x)
+    g, v = group[valid], x[valid]
+    n = np.bincount(g, minlength=n_groups).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(g, v, n_groups) / n
+        d = v - mean[g]
+        var = np.bincount(g, d * d, n_groups) / (n - 1)
+        # Consecutive valid samples of the same group
+        same = g[1:] == g[:-1]
+        lag = np.bincount(g[1:][same], (d[1:] * d[:-1])[same], n_groups)
+        rho = lag / np.bincount(g, d * d, n_groups)
+    return n, mean, var, np.nan_to_num(rho)
+
+
+def _effective_n(n, rho):
+    """Samples are autocorrelated at high rates; n_eff = n (1 - rho) / (1 + rho)."""
+    rho = np.clip(rho, 0.0, 0.99)
+    return np.maximum(1.0, n * (1 - rho) / (1 + rho))
+
+
+def throttle_stats(columns, names=COMPARE_CHANNELS):
+    """
+    Reduce one run to {throttle: (n, mean, standard error)} per channel,
+    each value an array over `names`.
+    """
+    throttle = columns['Throttle']
+    ok = np.isfinite(throttle)
+    keys, group = np.unique(throttle[ok], return_inverse=True)
+    out = {int(k): (np.zeros(len(names)), np.full(len(names), np.nan), np.full(len(names), np.nan))
+           for k in keys}
+    for c, name in enumerate(names):
+        n, mean, var, rho = _grouped_moments(group, len(keys), columns[name][ok])
+        with np.errstate(invalid='ignore'):
+            se = np.sqrt(var / _effective_n(n, rho))
+        for k, key in enumerate(keys):
+            stats = out[int(key)]
+            stats[0][c], stats[1][c], stats[2][c] = n[k], mean[k], se[k]
+    return out
+
+
+def step_stats(columns, names=COMPARE_CHANNELS, pre=STEP_PRE, post=STEP_POST, bin_width=STEP_BIN):
+    """
+    Reduce one run to {(from, to): (steps, n, mean, standard error)} on the
+    time-since-step grid; arrays are (bins, channels). Repeats of the same
+    step within the run are pooled.
+    """
+    time_, throttle = columns['Time'], columns['Throttle']
+    n_bins = int(round((pre + post) / bin_width))
+    values = np.column_stack([columns[name] for name in names])
+    acc = {}  # (from, to) -> [steps, count, sum, sum of squares]
+    for i in np.flatnonzero(np.diff(throttle) != 0) + 1:
+        if not (np.isfinite(throttle[i]) and np.isfinite(throttle[i - 1])):
+            continue
+        key = (int(throttle[i - 1]), int(throttle[i]))
+        if key not in acc:
+            acc[key] = [0] + [np.zeros((n_bins, len(names))) for _ in range(3)]
+        entry = acc[key]
+        lo, hi = np.searchsorted(time_, [time_[i] - pre, time_[i] + post])
+        b = ((time_[lo:hi] - time_[i] + pre) // bin_width).astype(np.intp)
+        keep = (b >= 0) & (b < n_bins)
+        b, x = b[keep], values[lo:hi][keep]
+        valid = np.isfinite(x)
+        x = np.where(valid, x, 0.0)
+        np.add.at(entry[1], b, valid)
+        np.add.at(entry[2], b, x)
+        np.add.at(entry[3], b, x * x)
+        entry[0] += 1
+
+    out = {}
+    for key, (steps, count, total, sq) in acc.items():
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            var = (sq - count * mean * mean) / (count - 1)
+            se = np.sqrt(np.maximum(var, 0) / count)
+        out[key] = (steps, count, mean, se)
+    return out
+
+
+def _channel_fields(names, fields=('mean', 'ci95', 'delta', 'delta ci95')):
+    return [(f"{name} {field}", 'f8') for name in names for field in fields]
+
+
+def _fill(row_or_rows, names, mean, se, base_mean, base_se):
+    """Write mean, CI and delta-vs-baseline (Welch, normal approximation) for every channel."""
+    with np.errstate(invalid='ignore'):
+        ci = Z95 * se
+        delta = mean - base_mean
+        delta_ci = Z95 * np.sqrt(se * se + base_se * base_se)
+    for c, name in enumerate(names):
+        row_or_rows[f"{name} mean"] = mean[..., c]
+        row_or_rows[f"{name} ci95"] = ci[..., c]
+        row_or_rows[f"{name} delta"] = delta[..., c]
+        row_or_rows[f"{name} delta ci95"] = delta_ci[..., c]
+
+
+def compare_runs(paths, names=COMPARE_CHANNELS, by=('throttle', 'step'), progress=print):
+    """
+    Compare runs against the first one (the baseline). Runs are read and
+    reduced one at a time, so memory depends on the longest run, not on the
+    number of runs. Returns {table name: structured array} for the report:
+    'Runs', 'By Throttle' and/or 'By Step'.
+    """
+    per_throttle, per_step, runs = [], [], []
+    for r, path in enumerate(paths):
+        columns = read_columns(path, names)
+        runs.append((r, os.path.basename(path), len(columns['Time'])))
+        if 'throttle' in by:
+            per_throttle.append(throttle_stats(columns, names))
+        if 'step' in by:
+            per_step.append(step_stats(columns, names))
+        del columns
+        progress(f"[{r + 1}/{len(paths)}] {path}")
+
+    tables = {'Runs': np.array(runs, dtype=[('Run', 'i4'), ('File', 'U128'), ('Rows', 'i8')])}
+    nan = np.full(len(names), np.nan)
+
+    if per_throttle:
+        dtype = [('Throttle', 'i2'), ('Run', 'i4'), ('Samples', 'i8')] + _channel_fields(names)
+        baseline = per_throttle[0]
+        rows = []
+        for throttle in sorted(set().union(*per_throttle)):
+            base_mean, base_se = baseline[throttle][1:] if throttle in baseline else (nan, nan)
+            for r, stats in enumerate(per_throttle):
+                if throttle not in stats:
+                    continue
+                n, mean, se = stats[throttle]
+                row = np.zeros((), dtype=dtype)
+                row['Throttle'], row['Run'], row['Samples'] = throttle, r, int(n.max())
+                _fill(row, names, mean, se, base_mean, base_se)
+                rows.append(row)
+        tables['By Throttle'] = np.array(rows, dtype=dtype)
+
+    if per_step:
+        n_bins = int(round((STEP_PRE + STEP_POST) / STEP_BIN))
+        offsets = -STEP_PRE + STEP_BIN * (np.arange(n_bins) + 0.5)
+        dtype = [('From', 'i2'), ('To', 'i2'), ('Run', 'i4'), ('Steps', 'i4'),
+                 ('Time Since Step', 'f8'), ('Samples', 'i8')] + _channel_fields(names)
+        baseline = per_step[0]
+        blocks = []
+        for key in sorted(set().union(*per_step)):
+            base = baseline.get(key)
+            base_mean = base[2] if base else np.full((n_bins, len(names)), np.nan)
+            base_se = base[3] if base else base_mean
+            for r, stats in enumerate(per_step):
+                if key not in stats:
+                    continue
+                steps, count, mean, se = stats[key]
+                block = np.zeros(n_bins, dtype=dtype)
+                block['From'], block['To'], block['Run'], block['Steps'] = key[0], key[1], r, steps
+                block['Time Since Step'] = offsets
+                block['Samples'] = count.max(axis=1)
+                _fill(block, names, mean, se, base_mean, base_se)
+                blocks.append(block)
+        tables['By Step'] = np.concatenate(blocks) if blocks else np.zeros(0, dtype=dtype)
+    return tables
+
+
+def write_report(tables, path):
+    """One report file; format from the extension. xlsx gets a sheet per table, others side files."""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    main = 'By Throttle' if 'By Throttle' in tables else 'By Step'
+    extra = {name: table for name, table in tables.items() if name != main}
+    return export_chunks([tables[main]], tables[main].dtype, path, fmt, extra_tables=extra, title=main)
+
+
+# Usage: python -m daq.compare baseline.xlsx other.npz ... [-o comparison.xlsx] [--by throttle|step]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare runs against the first (baseline) run.")
+    parser.add_argument('runs', nargs='+', help="exported or converted run files; the first is the baseline")
+    parser.add_argument('-o', '--out', default="comparison.xlsx", help="report file (.xlsx, .csv, .parquet, .feather)")
+    parser.add_argument('--by', choices=('throttle', 'step'), action='append',
+                        help="alignment (default: both)")
+    args = parser.parse_args()
+
+    tables = compare_runs(args.runs, by=tuple(args.by or ('throttle', 'step')))
+    write_report(tables, args.out)
+    if 'By Throttle' in tables:
+        t = tables['By Throttle']
+        print(f"\n{'Throttle':>8} {'Run':>4}" + "".join(f"{name + ' Δ':>22}" for name in COMPARE_CHANNELS))
+        for row in t[t['Run'] > 0]:
+            print(f"{row['Throttle']:>8} {row['Run']:>4}" + "".join(
+                f"{row[name + ' delta']:>12.2f} ±{row[name + ' delta ci95']:<8.2f}" for name in COMPARE_CHANNELS))
+    print(f"Report written to {args.out}")
@@ -0,0 +1,280 @@
+import os
+import numpy as np
+from daq.export import export_chunks, side_path
+
+# CONFIG
+METHOD = 'swing'     # 'swing' (swinging door, linear reconstruction) or 'deadband' (hold reconstruction)
+DEFAULT_BOUND = 0.0  # for columns not in BOUNDS: only points a straight line (or hold) can't reproduce are kept
+GRID_PERIOD = 1.0    # s; grid a compressed run is resampled on when read back for analysis (the steady-hold period)
+BOUNDS = {           # largest error allowed per column, in its unit
+    "Temperature": 0.25,
+    "RPM": 10.0,
+    "Load Cell 1": 0.5,
+    "Load Cell 2": 0.5,
+    "grams_per_min": 2.0,
+    "Vib RMS": 0.1,
+    "Vib Peak": 0.5,
+    "Vib Low": 0.1,
+    "Vib Mid": 0.1,
+    "Vib High": 0.1,
+    "Vib 1x": 2.0,
+    "Vib 2x": 2.0,
+    "Thrust": 1.0,
+    "Torque": 0.5,
+    "liters_per_min": 0.0025,
+    "fuel_per_rev": 0.05,
+    "RPM accel": 20.0,
+    "Temperature (Filtered)": 0.25,
+    "RPM (Filtered)": 10.0,
+}
+
+# Kept points of every column, in time order, and the column list with each error bound
+POINT_DTYPE = np.dtype([('Time', 'f8'), ('Channel', 'i2'), ('Value', 'f8')])
+CHANNEL_DTYPE = np.dtype([('Channel', 'i2'), ('Name', 'U32'), ('Method', 'U8'), ('Bound', 'f8')])
+
+
+class SwingingDoor:
+    """
+    Per-column lossy compression of a sample stream, vectorized across columns.
+
+    Swinging door keeps a point only when the straight line from the last
+    kept point to the newest sample would miss a sample in between by more
+    than `bound`, so linear interpolation between kept points reproduces
+    every dropped sample to within the bound.
+    Deadband keeps a point when it moves more than `bound` from the last kept
+    one (reconstructed by holding the last kept value). Kept points keep their
+    exact timestamps; a NaN run is kept at both ends.
+    """
+
+    def __init__(self, bounds, method=METHOD):
+        if method not in ('swing', 'deadband'):
+            raise ValueError(f"Unknown compression method: {method}")
+        self.bound = np.asarray(bounds, dtype=np.float64)
+        self.deadband = method == 'deadband'
+        n = len(self.bound)
+        self.anchor_t = np.zeros(n)
+        self.anchor_x = np.zeros(n)
+        self.prev_t = np.zeros(n)
+        self.prev_x = np.zeros(n)
+        self.prev_kept = np.ones(n, dtype=bool)
+        self.upper = np.full(n, np.inf)   # tightest door slopes seen from the anchor
+        self.lower = np.full(n, -np.inf)
+        self.started = False
+
+    def step(self, t, x):
+        """Feed one sample (time, column values); returns (columns, times, values) of the points it archives."""
+        x = np.asarray(x, dtype=np.float64)
+        if not self.started:
+            self.started = True
+            self._restart(np.ones(len(x), dtype=bool), t, x)
+            self.prev_t[:], self.prev_x[:] = t, x
+            return np.arange(len(x)), np.full(len(x), float(t)), x.copy()
+
+        missing = np.isnan(x)
+        gap = missing != np.isnan(self.prev_x)   # a NaN run starts or ends
+        live = ~gap & ~missing
+        if self.deadband:
+            keep_now = gap | (live & (np.abs(x - self.anchor_x) > self.bound))
+            keep_prev = gap & ~self.prev_kept
+            restart = keep_now
+        else:
+            # A line from the anchor to this sample must pass within the bound of every sample since
+            dt = np.maximum(t - self.anchor_t, 1e-9)
+            with np.errstate(invalid='ignore'):
+                slope = (x - self.anchor_x) / dt
+                closed = live & ((slope > self.upper) | (slope < self.lower))
+                opened = live & ~closed
+                self.upper[opened] = np.minimum(self.upper, (x + self.bound - self.anchor_x) / dt)[opened]
+                self.lower[opened] = np.maximum(self.lower, (x - self.bound - self.anchor_x) / dt)[opened]
+            # The door closed: the previous sample (the last line that fit) becomes the new anchor
+            dt_prev = np.maximum(t - self.prev_t[closed], 1e-9)
+            self.anchor_t[closed], self.anchor_x[closed] = self.prev_t[closed], self.prev_x[closed]
+            self.upper[closed] = (x[closed] + self.bound[closed] - self.prev_x[closed]) / dt_prev
+            self.lower[closed] = (x[closed] - self.bound[closed] - self.prev_x[closed]) / dt_prev
+            keep_prev = (closed | gap) & ~self.prev_kept
+            keep_now = gap
+            restart = gap
+
+        prev = np.flatnonzero(keep_prev)
+        now = np.flatnonzero(keep_now)
+        out = (np.concatenate([prev, now]),
+               np.concatenate([self.prev_t[prev], np.full(len(now), float(t))]),
+               np.concatenate([self.prev_x[prev], x[now]]))
+        self._restart(restart, t, x)
+        self.prev_kept = keep_now.copy()
+        self.prev_t[:], self.prev_x[:] = t, x
+        return out
+
+    def _restart(self, mask, t, x):
+        self.anchor_t[mask], self.anchor_x[mask] = t, x[mask]
+        self.upper[mask], self.lower[mask] = np.inf, -np.inf
+
+    def finish(self):
+        """Archive the last sample of every column not yet kept (end of the run)."""
+        last = np.flatnonzero(~self.prev_kept) if self.started else np.empty(0, dtype=int)
+        self.prev_kept[:] = True
+        return last, self.prev_t[last], self.prev_x[last]
+
+
+def compressed_columns(dtype):
+    """Columns that are compressed: every field except Time."""
+    return [name for name in dtype.names if name != 'Time']
+
+
+def channel_table(dtype, bounds=BOUNDS, method=METHOD):
+    """The 'Channels' side table: column index, name, method and error bound."""
+    names = compressed_columns(dtype)
+    return np.array([(i, name, method, bounds.get(name, DEFAULT_BOUND)) for i, name in enumerate(names)],
+                    dtype=CHANNEL_DTYPE)
+
+
+def _points(parts):
+    columns, times, values = (np.concatenate(p) for p in zip(*parts)) if parts else ([], [], [])
+    points = np.empty(len(times), dtype=POINT_DTYPE)
+    points['Time'], points['Channel'], points['Value'] = times, columns, values
+    return points
+
+
+def compress_chunks(chunks, dtype, bounds=BOUNDS, method=METHOD, progress=None):
+    """
+    Yield one POINT_DTYPE array per structured-array chunk of a run, then the
+    final points. `progress(rows_read)` is called after each chunk.
+    """
+    names = compressed_columns(dtype)
+    door = SwingingDoor([bounds.get(name, DEFAULT_BOUND) for name in names], method)
+    rows = 0
+    for chunk in chunks:
+        values = np.column_stack([chunk[name].astype(np.float64) for name in names])
+        yield _points([door.step(t, x) for t, x in zip(chunk['Time'].tolist(), values)])
+        rows += len(chunk)
+        if progress is not None:
+            progress(rows)
+    yield _points([door.finish()])
+
+
+def export_compressed(chunks, dtype, path, fmt, bounds=BOUNDS, method=METHOD,
+                      progress=None, cancel=None, extra_tables=None):
+    """
+    export_chunks for a compressed run: the main table ("Points") holds the
+    kept points, and the 'Channels' side table lists each column's error
+    bound. progress() counts rows of the run read, not points written.
+    """
+    tables = {'Channels': channel_table(dtype, bounds, method), **(extra_tables or {})}
+    return export_chunks(compress_chunks(chunks, dtype, bounds, method, progress), POINT_DTYPE, path, fmt,
+                         cancel=cancel, extra_tables=tables, title="Points")
+
+
+def _read_table(path, sheet):
+    """One table of a compressed run as {column: array}; strings (channel names) kept as such."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.xlsx':
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb[sheet].iter_rows(values_only=True)
+            header = [str(name) for name in next(rows, ())]
+            columns = list(zip(*rows)) or [()] * len(header)
+        finally:
+            wb.close()
+        return {name: np.array(column) for name, column in zip(header, columns)}
+    if sheet != "Points":
+        path = side_path(path, sheet)
+    if ext == '.csv':
+        table = np.atleast_1d(np.genfromtxt(path, delimiter=',', names=True, dtype=None,
+                                            encoding='utf-8', deletechars=''))
+        return {name: table[name] for name in table.dtype.names}
+    from daq.batch import load_run
+    frame = load_run(path)
+    return {name: frame[name].to_numpy() for name in frame.columns}
+
+
+def is_compressed(path):
+    """Whether a run file holds kept points (export_compressed) rather than samples."""
+    if os.path.splitext(path)[1].lower() == '.xlsx':
+        from daq.batch import sheet_names
+        sheets = sheet_names(path)
+        return "Points" in sheets and "Channels" in sheets
+    return os.path.exists(side_path(path, "Channels"))
+
+
+def read_compressed(path):
+    """(points, channels) of a compressed run file, as {column: array} tables."""
+    return _read_table(path, "Points"), _read_table(path, "Channels")
+
+
+def to_grid(points, channels, period, start=None, end=None):
+    """
+    Resample a compressed run onto a uniform time grid: {'Time': grid, name: values}.
+    Swinging-door columns are interpolated linearly between kept points,
+    deadband ones hold the last kept value; outside a column's kept range
+    it is NaN.
+    """
+    times = np.asarray(points['Time'], dtype=np.float64)
+    column = np.asarray(points['Channel'], dtype=np.int64)
+    values = np.asarray(points['Value'], dtype=np.float64)
+    start = times.min() if start is None else start
+    end = times.max() if end is None else end
+    grid = start + period * np.arange(int(np.floor((end - start) / period + 1e-9)) + 1)
+    out = {'Time': grid}
+    for index, name, method in zip(channels['Channel'], channels['Name'], channels['Method']):
+        mine = column == int(index)
+        t, x = times[mine], values[mine]
+        resampled = np.full(len(grid), np.nan)
+        inside = (grid >= t[0]) & (grid <= t[-1]) if len(t) else np.zeros(len(grid), dtype=bool)
+        if method == 'deadband':
+            resampled[inside] = x[np.searchsorted(t, grid[inside], side='right') - 1]
+        else:
+            resampled[inside] = np.interp(grid[inside], t, x)
+        out[str(name)] = resampled
+    return out
+
+
+def read_uniform(path, period=GRID_PERIOD):
+    """A compressed run file resampled every `period` s (see to_grid)."""
+    return to_grid(*read_compressed(path), period)
+
+
+def read_uniform_table(path, period=GRID_PERIOD):
+    """read_uniform as a float64 structured array, like a run read from its samples."""
+    grid = read_uniform(path, period)
+    table = np.empty(len(grid['Time']), dtype=[(name, 'f8') for name in grid])
+    for name, column in grid.items():
+        table[name] = column
+    return table
+
+
+# Compression of a simulated endurance hold: python -m daq.compress [hours]
+if __name__ == '__main__':
+    import sys
+    import time
+    import tempfile
+    from daq.storage import RECORD_DTYPE
+
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    rng = np.random.default_rng(0)
+    run = np.zeros(int(hours * 3600), dtype=RECORD_DTYPE)
+    run['Time'] = time.time() + np.arange(len(run))
+    run['Throttle'] = np.where(np.arange(len(run)) < len(run) // 2, 40, 60)   # one step mid-run
+    for name in compressed_columns(RECORD_DTYPE)[2:]:
+        level = np.where(run['Throttle'] == 40, 100.0, 150.0)
+        noise = rng.normal(0, BOUNDS.get(name, 0.01) / 4, len(run))   # steady hold: noise well inside the bound
+        run[name] = level + noise
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw, packed = os.path.join(tmp, "run.csv"), os.path.join(tmp, "run_compressed.csv")
+        export_chunks([run], RECORD_DTYPE, raw, 'csv')
+        start = time.perf_counter()
+        export_compressed([run], RECORD_DTYPE, packed, 'csv')
+        elapsed = time.perf_counter() - start
+        points, channels = read_compressed(packed)
+        grid = read_uniform(packed, 1.0)
+        size_raw, size_packed = os.path.getsize(raw), os.path.getsize(packed)
+
+    values = len(run) * len(channels['Name'])
+    print(f"{len(run)} samples x {len(channels['Name'])} columns: {len(points['Time'])} points kept "
+          f"({values / len(points['Time']):.0f}x fewer), csv {size_raw / 1e6:.2f} MB -> {size_packed / 1e6:.3f} MB "
+          f"({size_raw / size_packed:.0f}x), compressed in {elapsed:.2f} s")
+    n = min(len(grid['Time']), len(run))
+    worst = max((np.nanmax(np.abs(grid[name][:n] - run[name][:n].astype(np.float64))) / max(bound, 1e-12), name)
+                for name, bound in zip(channels['Name'], channels['Bound']) if bound > 0)
+    print(f"Worst reconstruction error on the 1 s grid: {worst[0]:.2f} x the bound ({worst[1]})")
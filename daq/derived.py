@@ -0,0 +1,107 @@
+import ast
+import re
+import numpy as np
+
+# Functions usable in expressions, all NumPy ufuncs so they work per sample and per batch
+FUNCTIONS = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'where': np.where, 'clip': np.clip,
+    'minimum': np.minimum, 'maximum': np.maximum, 'isnan': np.isnan,
+}
+
+_ALLOWED = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+    ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq, ast.BitAnd, ast.BitOr, ast.Invert,
+)
+
+_QUOTED = re.compile(r"`([^`]+)`")
+
+
+def identifier(name):
+    """Name a channel can be written as without backticks: 'Load Cell 1' -> Load_Cell_1"""
+    return re.sub(r"\W", "_", name)
+
+
+class _Resolve(ast.NodeTransformer):
+    """Rewrite names: channels -> x[..., i], constants -> literals, functions -> f_name."""
+
+    def __init__(self, index, constants, source):
+        self.index = index
+        self.constants = constants
+        self.source = source
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ValueError(f"Unsupported call in derived channel expression: {self.source}")
+        node.args = [self.visit(arg) for arg in node.args]
+        node.func = ast.copy_location(ast.Name(id=f"f_{node.func.id}", ctx=ast.Load()), node.func)
+        return node
+
+    def visit_Name(self, node):
+        if node.id in self.index:
+            sub = ast.Subscript(
+                value=ast.Name(id='x', ctx=ast.Load()),
+                slice=ast.Tuple(elts=[ast.Constant(Ellipsis), ast.Constant(self.index[node.id])], ctx=ast.Load()),
+                ctx=ast.Load())
+            return ast.copy_location(sub, node)
+        if node.id in self.constants:
+            return ast.copy_location(ast.Constant(float(self.constants[node.id])), node)
+        raise ValueError(f"Unknown name '{node.id}' in derived channel expression: {self.source}")
+
+
+def compile_expression(expr, index, constants=None):
+    """
+    Compile one expression over channels into a code object taking `x`, an
+    array whose last axis is the channel position. The same code evaluates a
+    single sample (shape (N,)) or a whole run (shape (rows, N)).
+
+    Channel names with spaces are written in backticks (`Load Cell 1`) or as
+    identifiers (Load_Cell_1). `constants` maps extra names to numbers.
+    """
+    constants = constants or {}
+    names = {}
+    for name, i in index.items():
+        names[name] = i
+        names[identifier(name)] = i
+    source = _QUOTED.sub(lambda m: identifier(m.group(1)), expr)
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid derived channel expression: {expr} ({e.msg})") from None
+    for node in ast.walk(tree):
+        # and/or, `a if c else b` and chained comparisons need one truth value, which an array has not
+        if isinstance(node, (ast.BoolOp, ast.IfExp)) or (isinstance(node, ast.Compare) and len(node.ops) > 1):
+            raise ValueError(f"Conditionals in derived channel expressions must be elementwise: use "
+                             f"where(cond, a, b) and &, | on comparisons in parentheses: {expr}")
+        if not isinstance(node, _ALLOWED):
+            raise ValueError(f"Unsupported syntax '{type(node).__name__}' in derived channel expression: {expr}")
+    tree = ast.fix_missing_locations(_Resolve(names, constants, expr).visit(tree))
+    return compile(tree, f"<derived: {expr}>", 'eval')
+
+
+class DerivedChannels:
+    """
+    Evaluates derived channels in place, in definition order, so a derived
+    channel may use ones defined before it. Non-finite results (e.g. division
+    by zero RPM) become NaN, the usual 'missing' marker.
+    """
+
+    def __init__(self, definitions, index, constants=None):
+        # definitions: [(target channel position, expression), ...]
+        self._compiled = [(target, compile_expression(expr, index, constants)) for target, expr in definitions]
+        self.targets = [target for target, _ in definitions]
+        self._env = {'__builtins__': {}, **{f"f_{name}": f for name, f in FUNCTIONS.items()}}
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def apply(self, x):
+        """Fill the derived positions of `x` (one sample or a (rows, N) batch); returns x."""
+        env = dict(self._env, x=x)
+        with np.errstate(all='ignore'):
+            for target, code in self._compiled:
+                value = np.asarray(eval(code, env), dtype=np.float64)
+                x[..., target] = np.where(np.isfinite(value), value, np.nan)
+        return x
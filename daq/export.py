@@ -0,0 +1,211 @@
+import os
+import threading
+import numpy as np
+
+# Formats offered by the dashboard; extension doubles as the format name
+FORMATS = ('xlsx', 'csv', 'parquet', 'feather')
+
+
+def _text_format(dtype):
+    """printf format that round-trips each field without float32 noise (e.g. 898.05, not 898.049988)."""
+    if np.issubdtype(dtype, np.integer):
+        return '%d'
+    if np.issubdtype(dtype, np.str_):
+        return '%s'
+    return '%.7g' if dtype.itemsize <= 4 else '%.17g'
+
+
+def _python_column(column):
+    """Column as Python scalars; float32 goes through its shortest decimal form."""
+    if column.dtype == np.float32:
+        return np.char.mod('%.7g', column).astype(np.float64).tolist()
+    return column.tolist()
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _xlsx_writer(path, dtype, extra_tables, title="Readings"):
+    # Write-only workbooks stream rows to disk instead of building the sheet in memory
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(list(dtype.names))
+
+    def append_rows(sheet, chunk):
+        columns = [_python_column(chunk[name]) for name in chunk.dtype.names]
+        for row in zip(*columns):
+            sheet.append(row)
+
+    def close():
+        # Extra tables (e.g. the segment index) go on their own sheets
+        for name, table in extra_tables.items():
+            sheet = wb.create_sheet(name)
+            sheet.append(list(table.dtype.names))
+            append_rows(sheet, table)
+        wb.save(path)
+
+    def abort():
+        # Nothing reaches `path` before save(): finish the streamed sheet's temp file and skip the workbook
+        ws.close()
+
+    return lambda chunk: append_rows(ws, chunk), close, abort
+
+
+def _csv_writer(path, dtype, extra_tables):
+    f = open(path, 'w', newline='')
+    f.write(",".join(dtype.names) + "\n")
+    fmt = ",".join(_text_format(dtype[name]) for name in dtype.names)
+
+    def write(chunk):
+        np.savetxt(f, chunk, fmt=fmt)
+
+    return write, f.close, f.close
+
+
+def _arrow_table(chunk, dtype):
+    import pyarrow as pa
+    return pa.table({name: chunk[name] for name in dtype.names})
+
+
+def _parquet_writer(path, dtype, extra_tables):
+    import pyarrow.parquet as pq
+    state = {}
+
+    def write(chunk):
+        table = _arrow_table(chunk, dtype)
+        if 'writer' not in state:
+            state['writer'] = pq.ParquetWriter(path, table.schema)
+        state['writer'].write_table(table)
+
+    def close():
+        if 'writer' in state:
+            state['writer'].close()
+
+    return write, close, close
+
+
+def _feather_writer(path, dtype, extra_tables):
+    # Feather v2 is the Arrow IPC file format, which can be written batch by batch
+    import pyarrow as pa
+    state = {}
+
+    def write(chunk):
+        table = _arrow_table(chunk, dtype)
+        if 'writer' not in state:
+            state['writer'] = pa.ipc.new_file(path, table.schema)
+        state['writer'].write_table(table)
+
+    def close():
+        if 'writer' in state:
+            state['writer'].close()
+
+    return write, close, close
+
+
+_WRITERS = {
+    'xlsx': _xlsx_writer, 'csv': _csv_writer,
+    'parquet': _parquet_writer, 'feather': _feather_writer,
+}
+
+
+def side_path(path, name):
+    """File name for an extra table in formats without sheets: run.csv -> run_segments.csv"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{name.lower()}{ext}"
+
+
+def export_chunks(chunks, dtype, path, fmt, progress=None, cancel=None, extra_tables=None, title=None):
+    """
+    Write a sequence of structured-array chunks to `path` in the given format.
+    `progress(rows_written)` is called after each chunk; if `cancel` (an Event)
+    gets set, the partial file is removed and ExportCancelled is raised.
+    `extra_tables` ({name: structured array}) become extra sheets in xlsx and
+    side files (see side_path) in the other formats. `title` names the main
+    xlsx sheet (default "Readings").
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    extra_tables = extra_tables or {}
+    options = {'title': title} if fmt == 'xlsx' and title else {}
+    write, close, abort = _WRITERS[fmt](path, dtype, extra_tables, **options)
+    rows = 0
+    try:
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            write(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
+        close()
+    except BaseException:
+        try:
+            abort()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    if fmt != 'xlsx':
+        for name, table in extra_tables.items():
+            export_chunks([table], table.dtype, side_path(path, name), fmt)
+    return rows
+
+
+class BackgroundExport:
+    """
+    Runs export_chunks on a worker thread. The GUI polls `rows_written`,
+    `done`, `error` and `cancelled` from its own loop; nothing here touches Tk.
+    With `compress` (per-column error bounds, see daq.compress) the run is
+    written as swinging-door compressed points instead.
+    """
+
+    def __init__(self, run_log, path, fmt, extra_tables=None, compress=None):
+        # Snapshot the chunk views now so rows logged later are not half-included
+        self.chunks = list(run_log.chunks())
+        self.dtype = run_log.dtype
+        self.total_rows = len(run_log)
+        self.extra_tables = {'Segments': run_log.segments.to_array(), **(extra_tables or {})}
+        self.path = path
+        self.fmt = fmt
+        self.compress = compress
+        self.rows_written = 0
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def fraction(self):
+        return self.rows_written / self.total_rows if self.total_rows else 1.0
+
+    def _progress(self, rows):
+        self.rows_written = rows
+
+    def _run(self):
+        try:
+            if self.compress is not None:
+                from daq.compress import export_compressed
+                export_compressed(self.chunks, self.dtype, self.path, self.fmt, self.compress,
+                                  progress=self._progress, cancel=self._cancel,
+                                  extra_tables=self.extra_tables)
+            else:
+                export_chunks(self.chunks, self.dtype, self.path, self.fmt,
+                              progress=self._progress, cancel=self._cancel,
+                              extra_tables=self.extra_tables)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
@@ -0,0 +1,312 @@
+import warnings
+import numpy as np
+
+# Every stage filters a vector of channels at once:
+#   step(x, t)   one sample, x of shape (channels,), t its time in seconds
+#   run(X, T)    a whole recording, X of shape (rows, channels), T of shape (rows,)
+# NaN (missing reading) passes through as NaN and leaves the stage's state alone.
+
+
+class Ema:
+    """
+    Exponential moving average. With `tau` (s) the weight follows the actual
+    sample spacing, which keeps the response fixed under adaptive sampling;
+    with `alpha` it is a fixed per-sample weight.
+    """
+
+    def __init__(self, n, alpha=None, tau=None):
+        if (alpha is None) == (tau is None):
+            raise ValueError("Ema needs exactly one of alpha or tau")
+        self.alpha, self.tau = alpha, tau
+        self.y = np.full(n, np.nan)
+        self.t = None
+
+    def step(self, x, t=None):
+        if self.tau is not None and self.t is not None and t is not None:
+            a = 1.0 - np.exp(-(t - self.t) / self.tau)
+        else:
+            a = self.alpha if self.alpha is not None else 1.0
+        self.t = t
+        y = np.where(np.isnan(self.y), x, self.y + a * (x - self.y))
+        self.y = np.where(np.isnan(x), self.y, y)
+        return np.where(np.isnan(x), np.nan, self.y)
+
+    def run(self, X, T=None):
+        return _run_rows(self, X, T)
+
+
+class Biquad:
+    """Second-order IIR section (transposed direct form II), e.g. Biquad.lowpass(...)."""
+
+    def __init__(self, n, b, a):
+        a0 = a[0]
+        self.b = np.asarray(b, dtype=np.float64) / a0
+        self.a = np.asarray(a, dtype=np.float64) / a0
+        self.z1 = np.zeros(n)
+        self.z2 = np.zeros(n)
+        self.primed = np.zeros(n, dtype=bool)
+
+    @classmethod
+    def lowpass(cls, n, cutoff, fs, q=0.7071):
+        """Butterworth-style low-pass (RBJ cookbook); designed for a nominal sample rate fs."""
+        w0 = 2 * np.pi * cutoff / fs
+        alpha = np.sin(w0) / (2 * q)
+        cw = np.cos(w0)
+        b = ((1 - cw) / 2, 1 - cw, (1 - cw) / 2)
+        a = (1 + alpha, -2 * cw, 1 - alpha)
+        return cls(n, b, a)
+
+    def step(self, x, t=None):
+        ok = ~np.isnan(x)
+        b0, b1, b2 = self.b
+        _, a1, a2 = self.a
+        # Start each channel from steady state at its first value instead of from zero
+        start = ok & ~self.primed
+        if start.any():
+            dc = x[start]
+            self.z1[start] = dc * (b1 + b2 - a1 - a2)
+            self.z2[start] = dc * (b2 - a2)
+            self.primed |= start
+        xv = np.where(ok, x, 0.0)
+        y = b0 * xv + self.z1
+        self.z1 = np.where(ok, b1 * xv - a1 * y + self.z2, self.z1)
+        self.z2 = np.where(ok, b2 * xv - a2 * y, self.z2)
+        return np.where(ok, y, np.nan)
+
+    def run(self, X, T=None):
+        return _run_rows(self, X, T)
+
+
+class _Window:
+    """Ring of the last `window` samples of every channel."""
+
+    def __init__(self, n, window):
+        self.window = window
+        self.buf = np.full((window, n), np.nan)
+        self.times = np.full(window, np.nan)
+        self.i = 0
+
+    def push(self, x, t):
+        self.buf[self.i % self.window] = x
+        self.times[self.i % self.window] = np.nan if t is None else t
+        self.i += 1
+
+    def ordered(self):
+        """(times, samples) oldest first, only the filled part."""
+        k = min(self.i, self.window)
+        idx = (np.arange(self.i - k, self.i)) % self.window
+        return self.times[idx], self.buf[idx]
+
+
+class Median:
+    """Running median over the last `window` samples; removes spikes without smearing steps."""
+
+    def __init__(self, n, window=5):
+        self.ring = _Window(n, window)
+
+    def step(self, x, t=None):
+        self.ring.push(x, t)
+        _, buf = self.ring.ordered()
+        if not np.isnan(buf).any():
+            out = np.median(buf, axis=0)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns are expected
+                out = np.nanmedian(buf, axis=0)
+        return np.where(np.isnan(x), np.nan, out)
+
+    def run(self, X, T=None):
+        w = self.ring.window
+        padded = np.vstack([np.full((w - 1, X.shape[1]), np.nan), X])  # short windows at the start, like step()
+        windows = np.lib.stride_tricks.sliding_window_view(padded, w, axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if np.isnan(X).any():
+                out = np.nanmedian(windows, axis=-1)
+            else:   # full windows need no NaN handling, which is much faster
+                out = np.median(windows, axis=-1)
+                out[:w - 1] = np.nanmedian(windows[:w - 1], axis=-1)
+        return np.where(np.isnan(X), np.nan, out)
+
+
+class SavGol:
+    """
+    Savitzky–Golay: least-squares polynomial of `order` over the last `window`
+    samples, evaluated at the newest one (causal). deriv=1 gives the slope in
+    units per second, deriv=2 the curvature. The fit uses the real sample
+    times, so it stays correct when the sample rate changes; one fit serves
+    all channels, so the cost does not grow with the channel count.
+    """
+
+    def __init__(self, n, window=9, order=2, deriv=0):
+        if order >= window:
+            raise ValueError("SavGol order must be below the window length")
+        if deriv > order:
+            raise ValueError("SavGol derivative order exceeds the polynomial order")
+        self.order, self.deriv = order, deriv
+        self.ring = _Window(n, window)
+        self._cached = (None, None, None)  # (normalized offsets, scale, weights)
+
+    def _weights(self, times):
+        """Row vector w so that w @ samples is the fit (or its derivative) at the newest time, or None if the times can't carry the fit."""
+        if np.count_nonzero(np.diff(times)) < self.order:
+            return None   # repeated timestamps: fewer distinct points than coefficients
+        dt = times - times[-1]
+        scale = np.max(np.abs(dt)) or 1.0   # keep the Vandermonde matrix well conditioned
+        s = dt / scale
+        cached_s, cached_scale, cached_w = self._cached
+        # Steady sampling gives the same normalized offsets; only the scale changes
+        if cached_s is not None and len(cached_s) == len(s) and np.max(np.abs(s - cached_s)) < 1e-3:
+            return cached_w * (cached_scale / scale) ** self.deriv
+        V = np.vander(s, self.order + 1, increasing=True)
+        try:
+            coef = np.linalg.solve(V.T @ V, V.T)  # normal equations; tiny and well conditioned after scaling
+        except np.linalg.LinAlgError:
+            return None
+        w = coef[self.deriv] * np.prod(np.arange(1, self.deriv + 1)) / scale ** self.deriv
+        self._cached = (s, scale, w)
+        return w
+
+    def step(self, x, t=None):
+        self.ring.push(x, t)
+        times, buf = self.ring.ordered()
+        if len(times) <= self.order or np.isnan(times).any():
+            return np.full_like(x, np.nan) if self.deriv else x
+        w = self._weights(times)
+        if w is None:
+            return np.full_like(x, np.nan)
+        valid = ~np.isnan(buf).any(axis=0)
+        out = w @ np.where(np.isnan(buf), 0.0, buf)
+        return np.where(valid, out, np.nan)
+
+    def run(self, X, T=None):
+        """
+        Whole-recording version of step(): every full window is fitted at once
+        (one batched solve of the normal equations), the first window - 1 rows
+        go through step() as they would live.
+        """
+        w = self.ring.window
+        head = min(len(X), w - 1)
+        out = np.empty((len(X), X.shape[1]))
+        for r in range(head):
+            out[r] = self.step(X[r], None if T is None else T[r])
+        if len(X) <= head:
+            return out
+        if T is None:
+            out[head:] = np.nan
+            return out
+        times = np.lib.stride_tricks.sliding_window_view(np.asarray(T, dtype=np.float64), w)
+        windows = np.lib.stride_tricks.sliding_window_view(X, w, axis=0)   # (rows, channels, window)
+        dt = times - times[:, -1:]
+        scale = np.max(np.abs(dt), axis=1, keepdims=True)
+        # Windows with NaN or too few distinct times can't be fitted; they give NaN, as in step()
+        bad = np.isnan(dt).any(axis=1) | (np.count_nonzero(np.diff(times, axis=1), axis=1) < self.order)
+        scale[bad | (scale[:, 0] == 0)] = 1.0
+        s = np.where(bad[:, None], np.linspace(-1, 0, w), dt / scale)
+        powers = np.empty(s.shape + (2 * self.order + 1,))          # s^k per window sample
+        powers[:, :, 0] = 1.0
+        for k in range(1, powers.shape[2]):
+            powers[:, :, k] = powers[:, :, k - 1] * s
+        sums = powers.sum(axis=1)
+        p = np.arange(self.order + 1)
+        M = sums[:, p[:, None] + p[None, :]]                          # V^T V per window
+        e = np.zeros((len(M), self.order + 1, 1))
+        e[:, self.deriv] = 1.0
+        z = np.linalg.solve(M, e)[:, :, 0]                            # M symmetric: row `deriv` of M^-1
+        weights = np.einsum('rj,rij->ri', z, powers[:, :, :self.order + 1])
+        weights *= np.prod(np.arange(1, self.deriv + 1)) / scale ** self.deriv
+        fitted = np.einsum('ri,rci->rc', weights, windows)
+        fitted[bad] = np.nan
+        out[head:] = fitted
+        # Leave the ring as step() would, so live filtering can continue from here
+        for r in range(len(X) - w, len(X)):
+            self.ring.push(X[r], T[r])
+        return out
+
+
+class OutlierReject:
+    """
+    Holds the last accepted value and accepts a new one only if it moved less
+    than max(min_abs, rel * |accepted|); otherwise the accepted value repeats.
+    """
+
+    def __init__(self, n, min_abs=15.0, rel=0.15):
+        self.min_abs, self.rel = min_abs, rel
+        self.y = np.full(n, np.nan)
+
+    def step(self, x, t=None):
+        threshold = np.maximum(self.min_abs, self.rel * np.abs(self.y))
+        accept = np.isnan(self.y) | (np.abs(x - self.y) < threshold)
+        self.y = np.where(accept & ~np.isnan(x), x, self.y)
+        return np.where(np.isnan(x), np.nan, self.y)
+
+    def run(self, X, T=None):
+        return _run_rows(self, X, T)
+
+
+def _run_rows(stage, X, T):
+    """Recursive stages run row by row, each row still vectorized across channels."""
+    out = np.empty_like(X, dtype=np.float64)
+    for r in range(len(X)):
+        out[r] = stage.step(X[r], None if T is None else T[r])
+    return out
+
+
+STAGES = {
+    'ema': Ema,
+    'lowpass': Biquad.lowpass,
+    'median': Median,
+    'savgol': SavGol,
+    'outlier': OutlierReject,
+}
+
+
+class FilterChain:
+    """Stages applied in order to the same set of channels, e.g. [('median', {'window': 3}), ('ema', {'tau': 0.5})]."""
+
+    def __init__(self, n, spec):
+        self.spec = spec
+        self.stages = [STAGES[kind](n, **params) for kind, params in spec]
+
+    def step(self, x, t=None):
+        for stage in self.stages:
+            x = stage.step(x, t)
+        return x
+
+    def run(self, X, T=None):
+        for stage in self.stages:
+            X = stage.run(X, T)
+        return X
+
+
+class FilterBank:
+    """
+    Filters many outputs from one input vector. `outputs` is a list of
+    (source index, chain spec). Outputs with the same spec share one chain
+    that processes all their sources as a single vector, so adding channels
+    with an existing configuration costs no extra Python work.
+    """
+
+    def __init__(self, outputs):
+        self.n_outputs = len(outputs)
+        groups = {}
+        for out_index, (source, spec) in enumerate(outputs):
+            key = repr(spec)
+            groups.setdefault(key, (spec, [], []))
+            groups[key][1].append(source)
+            groups[key][2].append(out_index)
+        self.groups = [(FilterChain(len(sources), spec), np.array(sources), np.array(targets))
+                       for spec, sources, targets in groups.values()]
+
+    def step(self, sample, t=None, out=None):
+        if out is None:
+            out = np.empty(self.n_outputs)
+        for chain, sources, targets in self.groups:
+            out[targets] = chain.step(sample[sources], t)
+        return out
+
+    def run(self, X, T=None):
+        out = np.empty((len(X), self.n_outputs))
+        for chain, sources, targets in self.groups:
+            out[:, targets] = chain.run(X[:, sources], T)
+        return out
@@ -0,0 +1,132 @@
+import threading
+from daq.profiler import PROFILER
+from daq.scheduler import RateClock, SKIP
+
+# CONFIG
+CONTROL_HZ = 20             # governor loop rate
+KP = 0.004                  # degrees per RPM of error
+KI = 0.008                  # degrees per RPM·s
+KD = 0.0                    # degrees per RPM/s (on measurement)
+ANGLE_MIN = 40              # throttle servo range used by the dashboard slider
+ANGLE_MAX = 120
+SLEW_LIMIT = 30             # max throttle movement, degrees per second
+
+
+class PID:
+    """
+    PID with derivative on measurement and conditional-integration anti-windup:
+    the integral only moves when doing so doesn't push a saturated output further.
+    """
+
+    def __init__(self, kp, ki, kd, out_min, out_max):
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.out_min, self.out_max = out_min, out_max
+        self.reset()
+
+    def reset(self, output=0.0):
+        """Start from `output` so enabling the loop doesn't bump the actuator."""
+        self.integral = output
+        self._last_measurement = None
+
+    def update(self, setpoint, measurement, dt):
+        error = setpoint - measurement
+        derivative = 0.0
+        if self._last_measurement is not None and dt > 0:
+            derivative = -(measurement - self._last_measurement) / dt
+        self._last_measurement = measurement
+
+        integral = self.integral + self.ki * error * dt
+        output = self.kp * error + integral + self.kd * derivative
+        if output > self.out_max:
+            output = self.out_max
+            if error < 0:
+                self.integral = integral
+        elif output < self.out_min:
+            output = self.out_min
+            if error > 0:
+                self.integral = integral
+        else:
+            self.integral = integral
+        return output
+
+
+class RpmGovernor:
+    """
+    Closed-loop RPM hold. Runs a PID at CONTROL_HZ on its own thread, reading
+    RPM from `rpm_source()` and driving the throttle through `set_angle(angle)`,
+    with the output slew-limited. `inhibit()` returning True (e.g. an interlock
+    trip) disengages the loop immediately. Each write checks inhibit() again
+    under `lock` (pass InterlockEngine.lock), so it cannot land after a cut.
+    """
+
+    def __init__(self, rpm_source, set_angle, inhibit=lambda: False, lock=None, rate_hz=CONTROL_HZ,
+                 kp=KP, ki=KI, kd=KD, angle_min=ANGLE_MIN, angle_max=ANGLE_MAX, slew_limit=SLEW_LIMIT):
+        self.rpm_source = rpm_source
+        self.set_angle = set_angle
+        self.inhibit = inhibit
+        self.lock = lock if lock is not None else threading.Lock()
+        self.period = 1.0 / rate_hz
+        self.pid = PID(kp, ki, kd, angle_min, angle_max)
+        self.slew_limit = slew_limit
+        self.setpoint = 0.0
+        self.output = None          # last commanded angle
+        self.rpm = None             # last measured RPM
+        self.engaged = False
+        self.clock = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rpm-governor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.engaged = False
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def engage(self, setpoint, current_angle):
+        """Start holding `setpoint`, taking over bumplessly from `current_angle`."""
+        self.setpoint = setpoint
+        self.output = current_angle
+        self.pid.reset(current_angle)
+        self.engaged = True
+
+    def disengage(self):
+        self.engaged = False
+
+    def timing(self):
+        """Control-loop deadline statistics (cycles, missed, jitter)."""
+        return self.clock.stats.summary() if self.clock else {}
+
+    def _run(self):
+        self.clock = RateClock(self.period, SKIP)
+        while not self._stop.is_set():
+            self._stop.wait(self.clock.delay())
+            if not self.clock.due():
+                continue
+            if not self.engaged:
+                continue
+            if self.inhibit():
+                self.engaged = False
+                continue
+            with PROFILER.span("governor"):
+                self._step()
+
+    def _step(self):
+        rpm = self.rpm_source()
+        if rpm is None:
+            return
+        self.rpm = rpm
+        target = self.pid.update(self.setpoint, rpm, self.period)
+        max_step = self.slew_limit * self.period
+        angle = min(max(target, self.output - max_step), self.output + max_step)
+        if angle != target:
+            # Slew-limited: pull the integral back to what was actually commanded
+            self.pid.integral += angle - target
+        self.output = angle
+        with self.lock:
+            if self.inhibit():
+                self.engaged = False
+                return
+            self.set_angle(angle)
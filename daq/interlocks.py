@@ -0,0 +1,153 @@
+import time
+import threading
+import numpy as np
+from daq.channels import INDEX, N_CHANNELS
+from daq.profiler import PROFILER, Histogram
+
+# Default limits. Each rule watches one channel:
+#   max / min   absolute limits in channel units
+#   max_rate    limit on |d(value)/dt| in channel units per second
+#   hold        consecutive violating samples needed to trip (debounce)
+DEFAULT_RULES = [
+    {'channel': "Temperature", 'max': 150},
+    {'channel': "Temperature", 'max_rate': 100},
+    {'channel': "RPM", 'max': 6500},
+    {'channel': "RPM", 'max_rate': 10000},
+]
+
+# Rates are taken over at least this many seconds so sensor noise at high
+# sample rates doesn't look like a surge
+RATE_WINDOW = 0.05
+
+_LEVEL, _RATE = 0, 1
+
+
+class InterlockEngine:
+    """
+    Evaluates limit and rate-of-change rules on every sample, on the
+    acquisition thread. All rules are checked at once as NumPy vectors, so the
+    cost per sample does not depend on the GUI and barely on the rule count.
+    On a trip the configured actions (e.g. cut_throttle, close_throttle) run
+    immediately and the latency from sensor read to action is recorded.
+    `tripped` is set before the actions run, and they run under `lock`;
+    other writers to the same actuators (the RPM governor) take that lock and
+    check `tripped` first, so nothing can reopen the throttle after a cut.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, actions=()):
+        self.rules = list(rules)
+        self.actions = list(actions)
+        n = len(self.rules)
+        self._channel = np.empty(n, dtype=np.intp)
+        self._kind = np.empty(n, dtype=np.int8)
+        self._low = np.full(n, -np.inf)
+        self._high = np.full(n, np.inf)
+        self._hold = np.ones(n, dtype=np.int32)
+        for r, rule in enumerate(self.rules):
+            self._channel[r] = INDEX[rule['channel']]
+            self._hold[r] = rule.get('hold', 1)
+            if 'max_rate' in rule:
+                self._kind[r] = _RATE
+                self._high[r] = rule['max_rate']
+            else:
+                self._kind[r] = _LEVEL
+                self._low[r] = rule.get('min', -np.inf)
+                self._high[r] = rule.get('max', np.inf)
+        self._is_rate = self._kind == _RATE
+        self.latency = Histogram()  # read-to-action time of every trip (ns)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear a latched trip (operator restart)."""
+        self._streak = np.zeros(len(self.rules), dtype=np.int32)
+        self._ref_sample = None
+        self._ref_time = None
+        self.tripped = False
+        self.trip_reason = None
+        self.trip_time = None
+
+    def check(self, timestamp, read_ns, sample):
+        """Acquisition hook: evaluate all rules against one sample."""
+        if self.tripped:
+            return
+        values = sample[self._channel]
+        if self._ref_time is None:
+            self._ref_sample, self._ref_time = sample, timestamp
+            values = np.where(self._is_rate, np.nan, values)
+        elif timestamp - self._ref_time >= RATE_WINDOW:
+            rates = np.abs(values - self._ref_sample[self._channel]) / (timestamp - self._ref_time)
+            values = np.where(self._is_rate, rates, values)
+            self._ref_sample, self._ref_time = sample, timestamp
+        else:
+            values = np.where(self._is_rate, np.nan, values)
+
+        # NaN (missing reading) compares False, so it never trips or extends a streak
+        violated = (values > self._high) | (values < self._low)
+        self._streak = np.where(violated, self._streak + 1, 0)
+        fired = np.flatnonzero(self._streak >= self._hold)
+        if fired.size:
+            self._trip(int(fired[0]), float(values[fired[0]]), timestamp, read_ns)
+
+    def _trip(self, r, value, timestamp, read_ns):
+        rule = self.rules[r]
+        if self._is_rate[r]:
+            what = f"rate {value:.1f}/s > {rule['max_rate']}"
+        elif value > self._high[r]:
+            what = f"{value:.1f} > {rule['max']}"
+        else:
+            what = f"{value:.1f} < {rule['min']}"
+        with self.lock:
+            self.trip_reason = f"{rule['channel']} {what}"
+            self.trip_time = timestamp
+            self.tripped = True
+            for action in self.actions:
+                try:
+                    action()
+                except Exception as e:
+                    print(f"Interlock action {getattr(action, '__name__', action)} failed: {e}")
+        latency_ns = time.perf_counter_ns() - read_ns
+        self.latency.add(latency_ns)
+        PROFILER.record("interlock_latency", latency_ns)
+
+
+# Standalone benchmark: reaction time against simulated sensor streams
+if __name__ == '__main__':
+    from daq.acquisition import Acquisition
+
+    PERIOD = 0.001   # 1 kHz simulated acquisition
+    TRIALS = 200
+
+    def simulated_stream(trip_at):
+        """Steady engine at 90 °C / 5000 RPM that over-temps from sample `trip_at` on."""
+        state = {'n': 0}
+        base = np.zeros(N_CHANNELS)
+        base[INDEX["Temperature"]] = 90.0
+        base[INDEX["RPM"]] = 5000.0
+
+        def read():
+            state['n'] += 1
+            sample = base + np.random.normal(0, 0.5, N_CHANNELS)
+            if state['n'] >= trip_at:
+                sample[INDEX["Temperature"]] = 160.0
+            return sample
+        return read, state
+
+    latency = Histogram()
+    late_samples = []
+    for trial in range(TRIALS):
+        trip_at = np.random.randint(5, 50)
+        read, state = simulated_stream(trip_at)
+        engine = InterlockEngine(actions=[lambda: late_samples.append(state['n'] - trip_at)])
+        acq = Acquisition(read, PERIOD)
+        acq.add_hook(engine.check)
+        acq.start()
+        while not engine.tripped:
+            time.sleep(PERIOD)
+        acq.stop()
+        latency.merge(engine.latency)
+
+    print(f"{TRIALS} over-temperature trips at {1 / PERIOD:.0f} Hz simulated acquisition")
+    print(f"read-to-action latency: p50 {latency.percentile(0.5) / 1e3:.1f} µs, "
+          f"p99 {latency.percentile(0.99) / 1e3:.1f} µs, max {latency.max_ns / 1e3:.1f} µs")
+    print(f"samples after first violating sample: max {max(late_samples)}")
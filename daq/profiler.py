@@ -0,0 +1,133 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# CONFIG
+# Log-spaced bucket upper bounds from 1 µs to ~30 s (4 buckets per decade)
+BUCKET_BOUNDS_NS = [int(1000 * 10 ** (i / 4)) for i in range(30)]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram. Only ever written by one thread."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        self.counts[bisect_left(BUCKET_BOUNDS_NS, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, q):
+        """Upper bucket bound (ns) below which fraction q of samples fall."""
+        if self.count == 0:
+            return 0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(BUCKET_BOUNDS_NS[i], self.max_ns) if i < len(BUCKET_BOUNDS_NS) else self.max_ns
+        return self.max_ns
+
+
+class Profiler:
+    """
+    Collects per-stage timings. Each thread writes into its own set of
+    histograms, so recording never takes a lock; snapshot() merges them.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._all = []              # every thread's dict of histograms
+        self._register = threading.Lock()  # only taken once per new thread
+
+    def _histograms(self):
+        hists = getattr(self._local, 'hists', None)
+        if hists is None:
+            hists = self._local.hists = {}
+            with self._register:
+                self._all.append(hists)
+        return hists
+
+    def record(self, name, ns):
+        """Record one duration in nanoseconds under the given stage name."""
+        if not self.enabled:
+            return
+        hists = self._histograms()
+        hist = hists.get(name)
+        if hist is None:
+            hist = hists[name] = Histogram()
+        hist.add(ns)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block: `with PROFILER.span('read:temp'): ...`"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+
+    def snapshot(self):
+        """Merge all threads and return {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        merged = {}
+        with self._register:
+            thread_hists = list(self._all)
+        for hists in thread_hists:
+            for name, hist in list(hists.items()):
+                merged.setdefault(name, Histogram()).merge(hist)
+
+        stats = {}
+        for name in sorted(merged):
+            hist = merged[name]
+            stats[name] = {
+                'count': hist.count,
+                'mean_ms': hist.total_ns / hist.count / 1e6 if hist.count else 0.0,
+                'p50_ms': hist.percentile(0.50) / 1e6,
+                'p95_ms': hist.percentile(0.95) / 1e6,
+                'p99_ms': hist.percentile(0.99) / 1e6,
+                'max_ms': hist.max_ns / 1e6,
+            }
+        return stats
+
+    def format_table(self):
+        """Render the snapshot as a fixed-width text table (used by the overlay)."""
+        lines = [f"{'stage':<18}{'n':>7}{'mean':>9}{'p95':>9}{'max':>9}  ms"]
+        for name, s in self.snapshot().items():
+            lines.append(f"{name:<18}{s['count']:>7}{s['mean_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write the snapshot as CSV."""
+        with open(path, 'w') as f:
+            f.write("stage,count,mean_ms,p50_ms,p95_ms,p99_ms,max_ms\n")
+            for name, s in self.snapshot().items():
+                f.write(f"{name},{s['count']},{s['mean_ms']:.4f},{s['p50_ms']:.4f},"
+                        f"{s['p95_ms']:.4f},{s['p99_ms']:.4f},{s['max_ms']:.4f}\n")
+
+    def reset(self):
+        with self._register:
+            for hists in self._all:
+                hists.clear()
+
+
+# Shared instance used across the GUI and sensor pipeline
+PROFILER = Profiler()
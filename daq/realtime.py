@@ -0,0 +1,127 @@
+import os
+import gc
+import sys
+import ctypes
+import ctypes.util
+from contextlib import contextmanager
+
+# CONFIG
+RT_PRIORITY = 50     # SCHED_FIFO priority (1-99); above most kernel threads' defaults, below watchdogs
+RT_CPUS = None       # CPUs to pin the acquisition thread to; None = the last CPU
+# Process-wide, so off unless asked for (they also affect Tk, the web server and every other thread)
+LOCK_MEMORY = False      # mlockall() so page faults can't stall a read
+SWITCH_INTERVAL = None   # s, e.g. 0.0005: how long another Python thread (Tk) may hold the GIL (default 5 ms)
+
+_MCL_CURRENT, _MCL_FUTURE = 1, 2
+
+
+def _libc():
+    return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+def _mlockall():
+    if _libc().mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+
+def enable_realtime(priority=RT_PRIORITY, cpus=RT_CPUS, lock_memory=LOCK_MEMORY,
+                    switch_interval=SWITCH_INTERVAL):
+    """
+    Give the calling thread real-time treatment: SCHED_FIFO priority and CPU
+    affinity, for that thread only. Locked memory and a shorter GIL switch
+    interval (so a busy GUI thread hands the interpreter back sooner) apply
+    to the whole process and are opt-in; disable_realtime() undoes them.
+    Each step is tried on its own; one that is not permitted (no root /
+    CAP_SYS_NICE, RLIMIT_RTPRIO, non-Linux) is skipped. Returns {step:
+    applied value or error text}.
+    """
+    status = {}
+    if switch_interval:
+        status['previous_switch_interval'] = sys.getswitchinterval()
+        sys.setswitchinterval(switch_interval)
+        status['switch_interval'] = switch_interval
+    try:
+        # pid 0 is the calling thread on Linux, so only acquisition is affected
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        status['priority'] = f"SCHED_FIFO {priority}"
+    except (AttributeError, OSError) as e:
+        status['priority'] = f"unavailable ({e})"
+    try:
+        if cpus is None:
+            cpus = {max(os.sched_getaffinity(0))}
+        os.sched_setaffinity(0, cpus)
+        status['affinity'] = sorted(cpus)
+    except (AttributeError, OSError, ValueError) as e:
+        status['affinity'] = f"unavailable ({e})"
+    if lock_memory:
+        try:
+            _mlockall()
+            status['mlock'] = "locked"
+        except (AttributeError, OSError, TypeError) as e:
+            status['mlock'] = f"unavailable ({e})"
+    return status
+
+
+def disable_realtime(status):
+    """Undo the process-wide settings enable_realtime() applied (from its returned status)."""
+    if 'previous_switch_interval' in status:
+        sys.setswitchinterval(status['previous_switch_interval'])
+    if status.get('mlock') == "locked":
+        try:
+            _libc().munlockall()
+        except (AttributeError, OSError, TypeError):
+            pass
+
+
+@contextmanager
+def gc_paused():
+    """
+    Keep the cyclic GC out of a critical section. Collections are held off
+    only for its duration (GC is process-wide), so they run in the slack
+    between samples instead of in the middle of a bit-banged read.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+# Standalone benchmark: wakeup latency with and without real-time mode, under load
+if __name__ == '__main__':
+    import time
+    import threading
+    import multiprocessing as mp
+    from daq.acquisition import Acquisition
+    from daq.channels import make_mock_reader
+
+    PERIOD = 0.001   # 1 kHz
+    SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+
+    def load(stop):
+        """CPU hog that also churns the allocator so the GC has work to do."""
+        junk = []
+        while not stop.is_set():
+            junk.append([{} for _ in range(50)])
+            if len(junk) > 200:
+                junk.clear()
+
+    # One hog per CPU in other processes, plus one thread standing in for Tk
+    stop = mp.Event()
+    hogs = [mp.Process(target=load, args=(stop,), daemon=True) for _ in range(os.cpu_count() or 1)]
+    hogs.append(threading.Thread(target=load, args=(stop,), daemon=True))
+    for t in hogs:
+        t.start()
+
+    for realtime in (False, True):
+        acq = Acquisition(make_mock_reader(), PERIOD, realtime=realtime).start()
+        time.sleep(SECONDS)
+        acq.stop()
+        mode = "real-time" if realtime else "normal"
+        print(f"{mode}: {acq.realtime_status or ''}")
+        for name, hist in (("wakeup latency", acq.wakeup_latency), ("period jitter", acq.jitter)):
+            print(f"  {name:<15} p50 {hist.percentile(0.5) / 1000:8.1f} µs  p99 {hist.percentile(0.99) / 1000:8.1f} µs"
+                  f"  max {hist.max_ns / 1000:8.1f} µs  ({hist.count} samples)")
+    stop.set()
@@ -0,0 +1,166 @@
+import time
+import multiprocessing as mp
+from daq.acquisition import Acquisition
+from daq.catalog import RunCatalog, run_path, CATALOG_FILE
+from daq.channels import make_reader, make_mock_reader
+from daq.export import export_chunks
+from daq.interlocks import InterlockEngine, DEFAULT_RULES
+from daq.storage import RunLog
+
+THREAD, PROCESS = 'thread', 'process'
+
+
+class Rig:
+    """
+    One test stand: its own sensor reader, acquisition thread, interlocks and
+    run log. Nothing is shared between rigs, so several can run side by side.
+
+    `build_readers()` returns the {source: read function} dict for make_reader,
+    built from driver instances wired to this stand's pins (None = mock data).
+    `build_actions()` returns the interlock actions (e.g. that stand's ESC cut).
+    Both are called in start(), in the thread or process that runs the rig, so
+    hardware is opened where it is used.
+    """
+
+    def __init__(self, name, build_readers=None, period=0.2, rules=DEFAULT_RULES,
+                 build_actions=None, fmt='xlsx', realtime=False, catalog=CATALOG_FILE):
+        self.name = name
+        self.build_readers = build_readers
+        self.build_actions = build_actions
+        self.period = period
+        self.rules = rules
+        self.fmt = fmt
+        self.realtime = realtime
+        self.catalog = catalog  # run catalog file the saved run is added to (None = don't)
+        self.path = None        # file of the saved run, chosen when it is written
+        self.throttle = 0
+        self.choke = True
+        self.active = True
+        self.run_log = RunLog()
+        self.interlocks = None
+        self.acquisition = None
+
+    def start(self):
+        if self.build_readers is None:
+            read_sensors = make_mock_reader()
+        else:
+            read_sensors = make_reader(self.build_readers())
+        actions = self.build_actions() if self.build_actions is not None else []
+        self.interlocks = InterlockEngine(self.rules, actions)
+        self.acquisition = Acquisition(read_sensors, self.period, realtime=self.realtime,
+                                       name=f"acquisition-{self.name}")
+        self.acquisition.add_hook(self.interlocks.check)
+        self.acquisition.add_hook(self._log)
+        self.acquisition.start()
+        return self
+
+    def _log(self, timestamp, read_ns, sample):
+        # Runs on this rig's acquisition thread, the only writer of its run log
+        self.run_log.append(timestamp, self.throttle, sample, self.choke, self.active)
+
+    def set_throttle(self, throttle):
+        self.throttle = throttle
+
+    def stop(self, export=True):
+        """Stop acquisition and write the run to a new file (see daq.catalog.run_path) and the catalog."""
+        if self.acquisition is not None:
+            self.acquisition.stop()
+        if export and len(self.run_log):
+            self.path = run_path(rig=self.name, fmt=self.fmt)
+            export_chunks(self.run_log.chunks(), self.run_log.dtype, self.path, self.fmt,
+                          extra_tables={'Segments': self.run_log.segments.to_array()})
+            if self.catalog is not None:
+                RunCatalog(self.catalog).add_run_log(self.path, self.run_log, rig=self.name)
+        return self.status()
+
+    def status(self):
+        acq = self.acquisition
+        return {
+            'rig': self.name,
+            'rows': len(self.run_log),
+            'path': self.path,
+            'tripped': self.interlocks.trip_reason if self.interlocks else None,
+            'read_errors': acq.error_count if acq else 0,
+            'deadlines': acq.clock.stats.summary() if acq else None,
+        }
+
+
+def _rig_process(rig, commands, results):
+    """Process entry point: run one rig until told to stop, then report its status."""
+    rig.start()
+    while True:
+        cmd, value = commands.get()
+        if cmd == 'throttle':
+            rig.set_throttle(value)
+        elif cmd == 'stop':
+            break
+    results.put(rig.stop())
+
+
+class RigManager:
+    """
+    Runs several rigs at once from one controller.
+
+    THREAD mode keeps every rig in this process (cheap, fine while sensor reads
+    are I/O bound). PROCESS mode gives each rig its own interpreter so rigs do
+    not share the GIL and spread across cores; build_readers/build_actions must
+    then be top-level functions so they can be pickled.
+    """
+
+    def __init__(self, mode=THREAD):
+        if mode not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown rig mode: {mode}")
+        self.mode = mode
+        self.rigs = {}
+        self._procs = {}
+
+    def add(self, rig):
+        if rig.name in self.rigs:
+            raise ValueError(f"Duplicate rig name: {rig.name}")
+        self.rigs[rig.name] = rig
+        return rig
+
+    def start(self):
+        for name, rig in self.rigs.items():
+            if self.mode == THREAD:
+                rig.start()
+            else:
+                commands, results = mp.Queue(), mp.Queue()
+                proc = mp.Process(target=_rig_process, args=(rig, commands, results),
+                                  name=f"rig-{name}", daemon=True)
+                proc.start()
+                self._procs[name] = (proc, commands, results)
+        return self
+
+    def set_throttle(self, name, throttle):
+        if self.mode == THREAD:
+            self.rigs[name].set_throttle(throttle)
+        else:
+            self._procs[name][1].put(('throttle', throttle))
+
+    def stop(self):
+        """Stop and export every rig; returns {name: status}."""
+        if self.mode == THREAD:
+            return {name: rig.stop() for name, rig in self.rigs.items()}
+        for proc, commands, _ in self._procs.values():
+            commands.put(('stop', None))
+        statuses = {}
+        for name, (proc, _, results) in self._procs.items():
+            statuses[name] = results.get()
+            proc.join()
+        self._procs.clear()
+        return statuses
+
+
+# Standalone demo: two mock stands in parallel
+if __name__ == '__main__':
+    import sys
+    manager = RigManager(sys.argv[1] if len(sys.argv) > 1 else THREAD)
+    manager.add(Rig("stand_a", period=0.01, fmt='csv'))
+    manager.add(Rig("stand_b", period=0.01, fmt='csv'))
+    manager.start()
+    time.sleep(1.0)
+    manager.set_throttle("stand_a", 50)
+    time.sleep(1.0)
+    for status in manager.stop().values():
+        print(status)
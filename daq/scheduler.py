@@ -0,0 +1,149 @@
+import time
+import math
+
+# Policies for deadlines that have already passed when we get to run
+SKIP = 'skip'          # drop missed ticks and realign to the next grid point
+CATCH_UP = 'catch_up'  # run missed ticks back to back (bounded by max_catch_up)
+
+
+class DeadlineStats:
+    """Missed-deadline count and lateness/jitter statistics for one channel."""
+
+    def __init__(self):
+        self.cycles = 0
+        self.missed = 0
+        self.max_late = 0.0
+        # Welford running mean/variance of lateness (seconds past deadline)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, late):
+        self.cycles += 1
+        delta = late - self._mean
+        self._mean += delta / self.cycles
+        self._m2 += delta * (late - self._mean)
+        if late > self.max_late:
+            self.max_late = late
+
+    @property
+    def mean_late(self):
+        return self._mean
+
+    @property
+    def jitter(self):
+        """Standard deviation of lateness in seconds."""
+        return math.sqrt(self._m2 / self.cycles) if self.cycles > 1 else 0.0
+
+    def summary(self):
+        return {
+            'cycles': self.cycles, 'missed': self.missed,
+            'mean_late_ms': self._mean * 1e3, 'jitter_ms': self.jitter * 1e3,
+            'max_late_ms': self.max_late * 1e3,
+        }
+
+
+class RateClock:
+    """
+    Absolute-deadline clock on time.monotonic(). Deadlines are t0 + k*period,
+    so the work time of a cycle never pushes later cycles back.
+    """
+
+    def __init__(self, period, policy=SKIP, max_catch_up=3, start=None):
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.period = period
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.next_deadline = time.monotonic() if start is None else start
+        self.stats = DeadlineStats()
+
+    def set_period(self, period, now=None):
+        """Change the rate; the new grid starts from the next deadline."""
+        self.period = period
+        now = time.monotonic() if now is None else now
+        self.next_deadline = min(self.next_deadline, now + period)
+
+    def due(self, now=None):
+        """
+        Return how many ticks to run now (0 if the next deadline is still ahead)
+        and advance the deadline accordingly.
+        """
+        now = time.monotonic() if now is None else now
+        if now < self.next_deadline:
+            return 0
+
+        late = now - self.next_deadline
+        behind = int(late // self.period)  # whole periods already missed
+        self.stats.add(late)
+
+        if behind == 0:
+            self.next_deadline += self.period
+            return 1
+
+        self.stats.missed += behind
+        if self.policy == CATCH_UP:
+            runs = min(behind, self.max_catch_up) + 1
+        else:
+            runs = 1
+        self.next_deadline += (behind + 1) * self.period
+        return runs
+
+    def delay(self, now=None):
+        """Seconds until the next deadline (never negative)."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.next_deadline - now)
+
+    def sleep(self):
+        """Block until the next deadline; for use on worker threads."""
+        d = self.delay()
+        if d > 0:
+            time.sleep(d)
+
+
+class TkScheduler:
+    """Runs named callbacks at fixed rates from the Tk event loop."""
+
+    def __init__(self, root):
+        self.root = root
+        self.channels = {}
+        self._after_id = None
+
+    def add(self, name, period, callback, policy=SKIP, max_catch_up=3):
+        self.channels[name] = (RateClock(period, policy, max_catch_up), callback)
+        self._reschedule()
+
+    def set_period(self, name, period):
+        self.channels[name][0].set_period(period)
+        self._reschedule()
+
+    def stats(self):
+        return {name: clock.stats.summary() for name, (clock, _) in self.channels.items()}
+
+    def start(self):
+        """Re-arm after stop(); deadlines restart from now so the pause isn't counted as missed."""
+        now = time.monotonic()
+        for clock, _ in self.channels.values():
+            clock.next_deadline = now
+        self._reschedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        for clock, callback in list(self.channels.values()):
+            for _ in range(clock.due()):
+                callback()
+        self._reschedule()
+
+    def _reschedule(self):
+        if not self.channels:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        now = time.monotonic()
+        delay = min(clock.delay(now) for clock, _ in self.channels.values())
+        # Round up so we never wake just before the deadline and spin
+        self._after_id = self.root.after(int(math.ceil(delay * 1000)), self._tick)
@@ -0,0 +1,123 @@
+import numpy as np
+from daq.channels import NAMES, N_CHANNELS
+
+# Per-channel statistics kept for every segment
+SEGMENT_STATS = ('mean', 'std', 'min', 'max')
+
+SEGMENT_DTYPE = np.dtype(
+    [('Segment', 'i4'), ('Start Row', 'i8'), ('End Row', 'i8'),
+     ('Start Time', 'f8'), ('End Time', 'f8'),
+     ('Throttle', 'i2'), ('Choke', 'i1'), ('Active', 'i1'), ('Samples', 'i8')]
+    + [(f"{name} {stat}", 'f8') for name in NAMES for stat in SEGMENT_STATS]
+)
+
+
+class SegmentIndex:
+    """
+    Splits a run into segments of constant (throttle, choke, active) state.
+    Keeps row boundaries and running per-channel statistics for each segment,
+    plus hash indexes so "all segments at throttle 85" is a dict lookup.
+    """
+
+    def __init__(self, n_channels=N_CHANNELS):
+        self.n_channels = n_channels
+        self.clear()
+
+    def clear(self):
+        # Per segment: [start_row, end_row, start_time, end_time, throttle, choke, active]
+        self._bounds = []
+        # Per segment running stats (Welford), one array per channel set; NaN (missing) samples are skipped
+        self._count = []
+        self._valid = []
+        self._mean = []
+        self._m2 = []
+        self._min = []
+        self._max = []
+        self._by_key = {}
+        self._by_throttle = {}
+        self.current_key = None
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def add(self, row, timestamp, key, sample):
+        """
+        Account for one logged sample. `key` is (throttle, choke, active).
+        Returns True when the sample opened a new segment.
+        """
+        key = (int(key[0]), bool(key[1]), bool(key[2]))
+        new_segment = key != self.current_key
+        if new_segment:
+            seg = len(self._bounds)
+            throttle, choke, active = key
+            self._bounds.append([row, row + 1, timestamp, timestamp, throttle, int(choke), int(active)])
+            self._count.append(0)
+            self._valid.append(np.zeros(self.n_channels, dtype=np.int64))
+            self._mean.append(np.zeros(self.n_channels))
+            self._m2.append(np.zeros(self.n_channels))
+            self._min.append(np.full(self.n_channels, np.inf))
+            self._max.append(np.full(self.n_channels, -np.inf))
+            self._by_key.setdefault(key, []).append(seg)
+            self._by_throttle.setdefault(throttle, []).append(seg)
+            self.current_key = key
+
+        bounds = self._bounds[-1]
+        bounds[1] = row + 1
+        bounds[3] = timestamp
+
+        self._count[-1] += 1
+        valid = np.isfinite(sample)
+        n = self._valid[-1]
+        n += valid
+        mean, m2 = self._mean[-1], self._m2[-1]
+        delta = np.where(valid, sample - mean, 0.0)
+        mean += delta / np.maximum(n, 1)
+        m2 += np.where(valid, delta * (sample - mean), 0.0)
+        np.fmin(self._min[-1], sample, out=self._min[-1])
+        np.fmax(self._max[-1], sample, out=self._max[-1])
+        return new_segment
+
+    def lookup(self, throttle=None, choke=None, active=None):
+        """Segment ids matching the given state; unspecified fields match anything."""
+        if choke is not None and active is not None and throttle is not None:
+            return list(self._by_key.get((int(throttle), bool(choke), bool(active)), []))
+        if throttle is not None:
+            ids = self._by_throttle.get(int(throttle), [])
+        else:
+            ids = range(len(self._bounds))
+        return [s for s in ids
+                if (choke is None or self._bounds[s][5] == int(choke))
+                and (active is None or self._bounds[s][6] == int(active))]
+
+    def row_ranges(self, throttle=None, choke=None, active=None):
+        """(start_row, end_row) pairs of the matching segments, end exclusive."""
+        return [tuple(self._bounds[s][:2]) for s in self.lookup(throttle, choke, active)]
+
+    def summary(self, seg):
+        """Boundaries, state and per-channel statistics of one segment."""
+        start, end, t0, t1, throttle, choke, active = self._bounds[seg]
+        seen = self._valid[seg] > 0   # channels with at least one non-NaN sample; the rest report NaN
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self._m2[seg] / self._valid[seg])
+        return {
+            'segment': seg, 'start_row': start, 'end_row': end, 'start_time': t0, 'end_time': t1,
+            'throttle': throttle, 'choke': bool(choke), 'active': bool(active), 'samples': self._count[seg],
+            'mean': np.where(seen, self._mean[seg], np.nan), 'std': std,
+            'min': np.where(seen, self._min[seg], np.nan), 'max': np.where(seen, self._max[seg], np.nan),
+        }
+
+    def to_array(self):
+        """Whole index as a structured array (one row per segment) for export."""
+        out = np.zeros(len(self._bounds), dtype=SEGMENT_DTYPE)
+        for seg in range(len(self._bounds)):
+            s = self.summary(seg)
+            row = out[seg]
+            row['Segment'] = seg
+            row['Start Row'], row['End Row'] = s['start_row'], s['end_row']
+            row['Start Time'], row['End Time'] = s['start_time'], s['end_time']
+            row['Throttle'], row['Choke'], row['Active'] = s['throttle'], s['choke'], s['active']
+            row['Samples'] = s['samples']
+            for stat in SEGMENT_STATS:
+                for i, name in enumerate(NAMES):
+                    row[f"{name} {stat}"] = s[stat][i]
+        return out
@@ -0,0 +1,186 @@
+import time
+import numpy as np
+from daq.channels import CHANNELS, INDEX
+
+# CONFIG
+SEGMENT = 128        # samples per FFT segment (3.2 s at 40 SPS)
+OVERLAP = 0.5        # fraction shared by consecutive segments
+AVERAGE = 8          # newest segments averaged into the reported spectrum (Welch)
+BANDS = {            # Hz; clamped to the stream's Nyquist frequency (half its measured rate) at run time
+    'band_low': (1.0, 8.0),
+    'band_mid': (8.0, 16.0),
+    'band_high': (16.0, 40.0),
+}
+ORDER_WIDTH = 0.75   # Hz either side of an engine order counted as that order
+MIN_HZ = 1.0         # below this is drift (fuel burn, thermal), not vibration
+FS_SMOOTHING = 0.1   # EMA weight for the measured conversion rate
+
+# Keys of read() and the channels they fill (source ('vibration', key) in daq.channels)
+KEYS = ('rms', 'peak_hz', *BANDS, 'order1', 'order2')
+
+
+class WelchSpectrum:
+    """
+    Streaming Welch power spectrum. New samples go into a preallocated buffer;
+    every complete segment (hop = SEGMENT * (1 - OVERLAP)) is detrended,
+    Hann-windowed and transformed in one batched rfft. The spectrum is the mean
+    of the newest AVERAGE segment periodograms, kept in a ring.
+    """
+
+    def __init__(self, segment=SEGMENT, overlap=OVERLAP, average=AVERAGE):
+        self.segment = segment
+        self.hop = max(1, int(segment * (1 - overlap)))
+        self.window = np.hanning(segment)
+        self._norm = (self.window ** 2).sum()
+        self._offsets = np.arange(segment)
+        self._buf = np.zeros(4 * segment)
+        self._fill = 0
+        self._periodograms = np.zeros((average, segment // 2 + 1))
+        self.segments = 0  # periodograms computed so far
+
+    def push(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        while len(x):
+            n = min(len(x), len(self._buf) - self._fill)
+            self._buf[self._fill:self._fill + n] = x[:n]
+            self._fill += n
+            x = x[n:]
+            self._process()
+
+    def _process(self):
+        count = (self._fill - self.segment) // self.hop + 1
+        if count <= 0:
+            return
+        segs = self._buf[(np.arange(count) * self.hop)[:, None] + self._offsets]
+        segs = segs - segs.mean(axis=1, keepdims=True)
+        power = np.abs(np.fft.rfft(segs * self.window, axis=1)) ** 2 / self._norm
+        average = len(self._periodograms)
+        for row in power[-average:]:
+            self._periodograms[self.segments % average] = row
+            self.segments += 1
+        consumed = count * self.hop
+        keep = self._fill - consumed
+        self._buf[:keep] = self._buf[consumed:self._fill]
+        self._fill = keep
+
+    def psd(self, fs):
+        """(frequencies Hz, one-sided power spectral density in units²/Hz), or None before the first segment."""
+        if not self.segments:
+            return None
+        p = self._periodograms[:min(self.segments, len(self._periodograms))].mean(axis=0) / fs
+        p[1:-1] *= 2  # one-sided: fold the negative frequencies in
+        return np.fft.rfftfreq(self.segment, 1.0 / fs), p
+
+
+def aliased(f, fs):
+    """Where a tone at f Hz lands in the 0..fs/2 spectrum of a signal sampled at fs."""
+    return np.abs((f + fs / 2) % fs - fs / 2)
+
+
+class SpectrumMonitor:
+    """
+    Vibration channels from a high-rate load cell stream (sensors.load_cell.
+    LoadCellStream, or SyntheticVibration for mock runs). read() runs as the
+    'vibration' sensor reader: it takes the conversions since its last call,
+    sums the cells (the thrust axis), updates the Welch spectrum and returns
+    total and band RMS (N), the dominant frequency, and the share of power
+    at the first and second engine orders from `rpm()`. Engine orders above
+    the Nyquist frequency are tracked at their aliased frequency; bands are
+    cut at it, and one wholly above it reads None.
+    `latest` holds (freqs, psd) for the dashboard, replaced whole.
+    """
+
+    def __init__(self, source, rpm=None, segment=SEGMENT, overlap=OVERLAP, average=AVERAGE):
+        self.source = source
+        self.rpm = rpm
+        self.welch = WelchSpectrum(segment, overlap, average)
+        self.fs = None
+        self.latest = None
+        self._cursor = 0
+
+    def read(self):
+        times, values, self._cursor = self.source.since(self._cursor)
+        if len(times) > 1:
+            fs = 1.0 / np.median(np.diff(times))
+            self.fs = fs if self.fs is None else self.fs + FS_SMOOTHING * (fs - self.fs)
+        x = values.sum(axis=1)
+        self.welch.push(x[np.isfinite(x)])
+        result = self.welch.psd(self.fs) if self.fs else None
+        if result is None:
+            return dict.fromkeys(KEYS)
+        freqs, psd = result
+        self.latest = result
+        df = freqs[1]
+        ac = freqs >= MIN_HZ
+        total = psd[ac].sum() * df
+        data = {
+            'rms': round(float(np.sqrt(total)), 3),
+            'peak_hz': round(float(freqs[ac][np.argmax(psd[ac])]), 2),
+        }
+        nyquist = self.fs / 2
+        for key, (lo, hi) in BANDS.items():
+            if lo >= nyquist:
+                data[key] = None   # the stream can't resolve this band
+                continue
+            # Up to and including the Nyquist bin when the band reaches it
+            band = (freqs >= lo) & ((freqs < hi) if hi < nyquist else (freqs <= nyquist))
+            data[key] = round(float(np.sqrt(psd[band].sum() * df)), 3)
+        rpm = self.rpm() if self.rpm is not None else None
+        for order, key in ((1, 'order1'), (2, 'order2')):
+            if not rpm or rpm <= 0 or total <= 0:
+                data[key] = 0.0
+                continue
+            near = ac & (np.abs(freqs - aliased(order * rpm / 60.0, self.fs)) <= ORDER_WIDTH)
+            data[key] = round(float(psd[near].sum() * df / total * 100), 1)
+        return data
+
+
+class SyntheticVibration:
+    """
+    Stand-in for LoadCellStream in mock runs: an engine at `rpm` with
+    imbalance at the first order, a weaker second order and sensor noise,
+    sampled at `fs` in real time.
+    """
+
+    def __init__(self, fs=40.0, rpm=1500.0, cells=2):
+        self.fs, self.rpm, self.cells = fs, rpm, cells
+        self._start = time.monotonic()
+        self._rng = np.random.default_rng()
+
+    def since(self, cursor):
+        end = int((time.monotonic() - self._start) * self.fs)
+        n = np.arange(max(cursor, end - 4096), end)
+        t = n / self.fs
+        f1 = self.rpm / 60.0
+        x = 3.0 * np.sin(2 * np.pi * f1 * t) + 1.0 * np.sin(2 * np.pi * 2 * f1 * t + 0.5)
+        values = x[:, None] / self.cells + self._rng.normal(0, 0.5, (len(n), self.cells))
+        return self._start + t, values, end
+
+
+def with_vibration(read_sensors, monitor):
+    """Wrap a sample reader so the vibration channels come from `monitor` (mock setups)."""
+    fields = [(c.source[1], INDEX[c.name]) for c in CHANNELS if c.source[0] == 'vibration']
+
+    def read(out=None):
+        out = read_sensors(out)
+        values = monitor.read()
+        for key, idx in fields:
+            value = values.get(key)
+            out[idx] = np.nan if value is None else value
+        return out
+
+    return read
+
+
+# Standalone check against the synthetic stream: python -m daq.spectrum
+if __name__ == '__main__':
+    source = SyntheticVibration()
+    monitor = SpectrumMonitor(source, rpm=lambda: source.rpm)
+    for _ in range(8):
+        time.sleep(1.0)
+        start = time.perf_counter_ns()
+        data = monitor.read()
+        cost_us = (time.perf_counter_ns() - start) / 1e3
+        print(f"{data}  ({cost_us:.0f} µs, fs {monitor.fs:.1f} Hz)" if monitor.fs else data)
+    print(f"Expected at {source.fs:.0f} SPS: first order {source.rpm / 60:.1f} Hz seen at "
+          f"{aliased(source.rpm / 60, source.fs):.1f} Hz, second order at {aliased(2 * source.rpm / 60, source.fs):.1f} Hz")
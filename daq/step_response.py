@@ -0,0 +1,316 @@
+import os
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+import numpy as np
+from daq.channels import INDEX
+from daq.export import export_chunks
+
+# CONFIG
+RESPONSE_CHANNELS = ("RPM", "Thrust", "grams_per_min")
+PRE = 2.0            # s before the step used for the starting level
+POST = 10.0          # s after the step fitted (less if the next step comes first)
+MERGE = 0.5          # s; setpoint changes closer than this (a slider drag) are one step
+SETTLE_BAND = 0.05   # settled once within ±5 % of the step size for good
+MIN_SAMPLES = 8      # after the step; fewer and the step is skipped
+RISE = (0.1, 0.9)    # rise time between these fractions of the step
+MIN_R2 = 0.5         # below this the channel showed no clear response; timings are left NaN
+
+# Parameter grids; each is searched once coarsely, then finely around the best point
+GRID_DELAY = 20      # points from 0 to MAX_DELAY
+MAX_DELAY = 2.0      # s
+GRID_TAU = 30        # time constants, log-spaced from 20 ms to the window length
+GRID_WN = 24         # natural frequencies, log-spaced over the window
+GRID_ZETA = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.97])
+REFINE = 7           # points per parameter in the fine pass
+CHUNK = 4_000_000    # max candidate x sample evaluations held at once
+
+STEP_DTYPE = np.dtype([
+    ('Time', 'f8'), ('From', 'i2'), ('To', 'i2'), ('Channel', 'U32'), ('Model', 'U8'),
+    ('Samples', 'i4'), ('Initial', 'f8'), ('Final', 'f8'), ('Gain', 'f8'),
+    ('Delay', 'f8'), ('Rise Time', 'f8'), ('Overshoot %', 'f8'), ('Settling Time', 'f8'),
+    ('Time Constant', 'f8'), ('Damping', 'f8'), ('Natural Freq', 'f8'), ('R2', 'f8'),
+])
+
+
+def _first_order(s, tau):
+    return 1.0 - np.exp(-s / tau)
+
+
+def _second_order(s, wn, zeta):
+    """Unit step response of an underdamped second-order system."""
+    wd = wn * np.sqrt(1.0 - zeta * zeta)
+    return 1.0 - np.exp(-zeta * wn * s) * (np.cos(wd * s) + zeta * wn / wd * np.sin(wd * s))
+
+
+MODELS = {
+    # name: (shape(s, *params), number of parameters besides delay)
+    'first': (_first_order, 1),
+    'second': (_second_order, 2),
+}
+
+
+def _solve(shape, t, y, delays, params):
+    """
+    Least squares for every candidate at once. For fixed delay and shape
+    parameters the model y = initial + gain * g(t) is linear, so each
+    candidate's best (initial, gain) and residual come in closed form.
+    Returns (sse, initial, gain) arrays over the candidates.
+    """
+    yc = y - y.mean()
+    syy = yc @ yc
+    n_cand = len(delays)
+    sse, initial, gain = np.empty(n_cand), np.empty(n_cand), np.empty(n_cand)
+    step = max(1, CHUNK // len(t))
+    for lo in range(0, n_cand, step):
+        hi = min(n_cand, lo + step)
+        s = np.maximum(t[None, :] - delays[lo:hi, None], 0.0)
+        g = shape(s, *(p[lo:hi, None] for p in params))
+        g_mean = g.mean(axis=1)
+        gc = g - g_mean[:, None]
+        sgg = np.einsum('ij,ij->i', gc, gc)
+        sgy = gc @ yc
+        with np.errstate(invalid='ignore', divide='ignore'):
+            b = np.where(sgg > 0, sgy / sgg, 0.0)
+        sse[lo:hi] = syy - b * sgy
+        gain[lo:hi] = b
+        initial[lo:hi] = y.mean() - b * g_mean
+    return sse, initial, gain
+
+
+def _grid_fit(model, t, y, window):
+    """Coarse grid then a fine grid around its best point. Returns (sse, initial, gain, delay, *params)."""
+    shape, n_params = MODELS[model]
+    max_delay = min(MAX_DELAY, 0.5 * window)
+    axes = [np.linspace(0.0, max_delay, GRID_DELAY)]
+    if model == 'first':
+        axes.append(np.geomspace(0.02, window, GRID_TAU))
+    else:
+        axes.append(np.geomspace(np.pi / window, 2 * np.pi * 10, GRID_WN))
+        axes.append(GRID_ZETA)
+
+    for refine in (False, True):
+        if refine:
+            fine = []
+            for axis, value in zip(axes, best):
+                i = int(np.argmin(np.abs(axis - value)))
+                lo, hi = axis[max(i - 1, 0)], axis[min(i + 1, len(axis) - 1)]
+                fine.append(np.linspace(lo, hi, REFINE))
+            axes = fine
+        mesh = [m.ravel() for m in np.meshgrid(*axes, indexing='ij')]
+        sse, initial, gain = _solve(shape, t, y, mesh[0], mesh[1:])
+        k = int(np.nanargmin(sse))
+        best = [m[k] for m in mesh]
+    return (sse[k], initial[k], gain[k], *best)
+
+
+def _metrics(model, delay, params, window):
+    """Delay, rise, overshoot and settling of the fitted unit response, in s and %."""
+    shape = MODELS[model][0]
+    s = np.linspace(0.0, window, 4001)
+    g = shape(np.maximum(s - delay, 0.0), *params)
+    rise_lo, rise_hi = (s[np.argmax(g >= f)] if (g >= f).any() else np.nan for f in RISE)
+    outside = np.flatnonzero(np.abs(g - 1.0) > SETTLE_BAND)
+    if not outside.size:
+        settling = 0.0
+    elif outside[-1] == len(s) - 1:
+        settling = np.nan  # still outside the band when the window ends
+    else:
+        settling = s[outside[-1] + 1]
+    return rise_hi - rise_lo, max(0.0, float(g.max()) - 1.0) * 100, settling
+
+
+def fit_step(t, y, t0, end):
+    """
+    Fit one channel's response to a step at t0. `t`, `y` cover PRE before the
+    step up to `end`. Both models are fitted and the one with the lower AIC
+    kept. Returns a dict of STEP_DTYPE fields, or None if too few samples.
+    """
+    ok = np.isfinite(t) & np.isfinite(y) & (t <= end)
+    t, y = t[ok] - t0, y[ok]
+    window = end - t0
+    if np.count_nonzero(t >= 0) < MIN_SAMPLES or window <= 0:
+        return None
+    pre = t < 0
+    y0 = y[pre].mean() if pre.any() else np.nan
+
+    best = None
+    for model in MODELS:
+        sse, initial, gain, delay, *params = _grid_fit(model, t, y, window)
+        n, k = len(t), 3 + len(params)
+        aic = n * np.log(max(sse, 1e-12) / n) + 2 * k
+        if best is None or aic < best[0]:
+            best = (aic, model, sse, initial, gain, delay, params)
+
+    _, model, sse, initial, gain, delay, params = best
+    rise, overshoot, settling = _metrics(model, delay, params, window)
+    sst = np.sum((y - y.mean()) ** 2)
+    r2 = 1.0 - sse / sst if sst > 0 else np.nan
+    if not r2 >= MIN_R2:
+        model, delay, rise, overshoot, settling = 'none', np.nan, np.nan, np.nan, np.nan
+        params = [np.nan, np.nan]
+    return {
+        'Model': model, 'Samples': int(np.count_nonzero(t >= 0)),
+        'Initial': y0 if np.isfinite(y0) else initial, 'Final': initial + gain, 'Gain': gain,
+        'Delay': delay, 'Rise Time': rise, 'Overshoot %': overshoot, 'Settling Time': settling,
+        'Time Constant': params[0] if model == 'first' else np.nan,
+        'Natural Freq': params[0] if model == 'second' else np.nan,
+        'Damping': params[1] if model == 'second' else np.nan,
+        'R2': r2,
+    }
+
+
+def find_steps(time_, throttle, merge=MERGE):
+    """(index, from, to) of each setpoint change; changes within `merge` s of the last are one step."""
+    steps = []
+    for i in np.flatnonzero(np.diff(throttle) != 0) + 1:
+        if not (np.isfinite(throttle[i]) and np.isfinite(throttle[i - 1])):
+            continue
+        if steps and time_[i] - time_[steps[-1][0]] < merge:
+            steps[-1] = (steps[-1][0], steps[-1][1], int(throttle[i]))
+        else:
+            steps.append((i, int(throttle[i - 1]), int(throttle[i])))
+    return [s for s in steps if s[1] != s[2]]
+
+
+def analyze_steps(columns, names=RESPONSE_CHANNELS, pre=PRE, post=POST):
+    """Every step of one run ({'Time', 'Throttle', channel: array}) as a STEP_DTYPE array."""
+    time_, throttle = columns['Time'], columns['Throttle']
+    steps = find_steps(time_, throttle)
+    rows = []
+    for n, (i, old, new) in enumerate(steps):
+        t0 = time_[i]
+        end = t0 + post
+        if n + 1 < len(steps):
+            end = min(end, time_[steps[n + 1][0]])
+        lo, hi = np.searchsorted(time_, [t0 - pre, end], side='right')
+        for name in names:
+            fit = fit_step(time_[lo:hi], columns[name][lo:hi], t0, end)
+            if fit is not None:
+                rows.append(dict(fit, Time=t0, From=old, To=new, Channel=name))
+    return to_table(rows)
+
+
+def to_table(rows):
+    table = np.zeros(len(rows), dtype=STEP_DTYPE)
+    for r, row in enumerate(rows):
+        for field, value in row.items():
+            table[r][field] = value
+    return table
+
+
+class StepResponseMonitor:
+    """
+    Live step analysis. An acquisition hook keeps recent samples of the
+    response channels in a ring; setpoint() (any thread) marks throttle
+    changes. POST seconds after a step, or at the next step, its window is
+    fitted on a worker thread and appended to `results`; `on_result(row)`
+    is called there too, so it must not touch Tk.
+    """
+
+    def __init__(self, acquisition, setpoint=None, names=RESPONSE_CHANNELS, pre=PRE, post=POST,
+                 capacity=8192, on_result=None):
+        self.names = names
+        self.pre, self.post = pre, post
+        self.on_result = on_result
+        self._index = np.array([INDEX[name] for name in names])
+        self._times = np.full(capacity, -np.inf)
+        self._values = np.full((capacity, len(names)), np.nan)
+        self._count = 0
+        self._setpoint = setpoint
+        self._pending = deque()  # (time, setpoint) from setpoint()
+        self._step = None        # [t0, from, to, last change] while collecting
+        self.results = []
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="step-response", daemon=True)
+        self._worker.start()
+        acquisition.add_hook(self._on_sample)
+
+    def setpoint(self, value):
+        self._pending.append((time.time(), value))
+
+    def _on_sample(self, timestamp, read_ns, sample):
+        i = self._count % len(self._times)
+        self._times[i] = timestamp
+        self._values[i] = sample[self._index]
+        self._count += 1
+
+        while self._pending:
+            when, value = self._pending.popleft()
+            step = self._step
+            if step is not None and when - step[3] < MERGE:
+                step[2], step[3] = value, when
+            elif value != self._setpoint and self._setpoint is not None:
+                if step is not None:
+                    self._finish(when)
+                self._step = [when, self._setpoint, value, when]
+            self._setpoint = value
+        if self._step is not None and timestamp >= self._step[0] + self.post:
+            self._finish(timestamp)
+
+    def _finish(self, end):
+        t0, old, new, _ = self._step
+        self._step = None
+        if old == new:
+            return
+        keep = np.flatnonzero(self._times >= t0 - self.pre)
+        keep = keep[np.argsort(self._times[keep])]
+        self._jobs.put((t0, old, new, end, self._times[keep], self._values[keep]))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            t0, old, new, end, times, values = job
+            for c, name in enumerate(self.names):
+                fit = fit_step(times, values[:, c], t0, end)
+                if fit is None:
+                    continue
+                row = dict(fit, Time=t0, From=old, To=new, Channel=name)
+                self.results.append(row)
+                if self.on_result is not None:
+                    self.on_result(row)
+
+    def table(self):
+        return to_table(list(self.results))
+
+    def stop(self):
+        """Fit a step still being collected and wait for the worker."""
+        if self._step is not None:
+            self._finish(self._times[(self._count - 1) % len(self._times)])
+        self._jobs.put(None)
+        self._worker.join(timeout=30.0)
+
+
+def describe(row):
+    """One-line summary of a result row."""
+    if row['Model'] == 'none':
+        return f"{row['From']}->{row['To']}° {row['Channel']}: no clear response (R² {row['R2']:.2f})"
+    return (f"{row['From']}->{row['To']}° {row['Channel']}: {row['Model']} order, "
+            f"delay {row['Delay']:.2f} s, rise {row['Rise Time']:.2f} s, "
+            f"overshoot {row['Overshoot %']:.0f} %, settling {row['Settling Time']:.2f} s (R² {row['R2']:.2f})")
+
+
+# Batch over recorded runs: python -m daq.step_response run.xlsx [run2.npz ...] [-o steps.csv]
+if __name__ == '__main__':
+    from daq.compare import read_columns
+
+    parser = argparse.ArgumentParser(description="Fit throttle step responses in recorded runs.")
+    parser.add_argument('runs', nargs='+', help="exported or converted run files")
+    parser.add_argument('-o', '--out', default="step_response.csv", help="result table (.csv, .xlsx, ...)")
+    args = parser.parse_args()
+
+    tables = []
+    for path in args.runs:
+        start = time.perf_counter()
+        table = analyze_steps(read_columns(path, RESPONSE_CHANNELS))
+        print(f"{path}: {len(table)} step fits in {time.perf_counter() - start:.2f} s")
+        for row in table:
+            print("  " + describe(row))
+        tables.append(table)
+    result = np.concatenate(tables) if tables else to_table([])
+    export_chunks([result], STEP_DTYPE, args.out, os.path.splitext(args.out)[1].lstrip('.').lower())
+    print(f"Results written to {args.out}")
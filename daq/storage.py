@@ -0,0 +1,99 @@
+import numpy as np
+from daq.channels import CHANNELS
+from daq.segments import SegmentIndex
+
+# CONFIG
+CHUNK_ROWS = 4096   # rows preallocated per chunk (~100 KB at the default channel set)
+
+# Record layout for one logged sample: time, throttle, segment, then every channel at its own dtype
+RECORD_DTYPE = np.dtype(
+    [('Time', 'f8'), ('Throttle', 'i2'), ('Segment', 'i4')] + [(c.name, c.dtype) for c in CHANNELS]
+)
+COLUMNS = list(RECORD_DTYPE.names)
+
+
+class RunLog:
+    """
+    Run history as a list of preallocated NumPy structured-array chunks.
+    Appending writes into the current chunk; a new chunk is allocated only
+    when it fills, so memory grows by CHUNK_ROWS at a time. Rows are also
+    split into segments of constant throttle/choke/cut state (see SegmentIndex).
+    """
+
+    def __init__(self, chunk_rows=CHUNK_ROWS, dtype=RECORD_DTYPE):
+        self.chunk_rows = chunk_rows
+        self.dtype = dtype
+        self._chunks = []
+        self._fill = chunk_rows  # forces a chunk allocation on first append
+        self._count = 0
+        self.segments = SegmentIndex()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return len(self._chunks) * self.chunk_rows * self.dtype.itemsize
+
+    def append(self, timestamp, throttle, sample, choke=True, active=True):
+        """
+        Store one sample record (channel values by position).
+        Returns True when the sample starts a new segment.
+        """
+        new_segment = self.segments.add(self._count, timestamp, (throttle, choke, active), sample)
+        if self._fill == self.chunk_rows:
+            self._chunks.append(np.empty(self.chunk_rows, dtype=self.dtype))
+            self._fill = 0
+        self._chunks[-1][self._fill] = (timestamp, throttle, len(self.segments) - 1, *sample.tolist())
+        self._fill += 1
+        self._count += 1
+        return new_segment
+
+    def chunks(self):
+        """Yield filled views of each chunk, oldest first (no copying)."""
+        for chunk in self._chunks[:-1]:
+            yield chunk
+        if self._chunks:
+            yield self._chunks[-1][:self._fill]
+
+    def to_array(self):
+        """Concatenate the whole run into one structured array."""
+        if not self._chunks:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(list(self.chunks()))
+
+    def rows(self, start, end):
+        """Rows [start, end) as one structured array, touching only the chunks involved."""
+        end = min(end, self._count)
+        if start >= end:
+            return np.empty(0, dtype=self.dtype)
+        first, last = start // self.chunk_rows, (end - 1) // self.chunk_rows
+        parts = []
+        for c in range(first, last + 1):
+            lo = start - c * self.chunk_rows if c == first else 0
+            hi = end - c * self.chunk_rows if c == last else self.chunk_rows
+            parts.append(self._chunks[c][lo:hi])
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+    def segment_rows(self, throttle=None, choke=None, active=None):
+        """All samples of the segments matching the given state, via the segment index."""
+        parts = [self.rows(start, end) for start, end in self.segments.row_ranges(throttle, choke, active)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=self.dtype)
+
+    def column(self, name):
+        """One column for the whole run as a contiguous array."""
+        if not self._chunks:
+            return np.empty(0, dtype=self.dtype[name])
+        return np.concatenate([chunk[name] for chunk in self.chunks()])
+
+    def to_dataframe(self):
+        """Build a DataFrame column by column straight from the arrays."""
+        import pandas as pd
+        data = self.to_array()
+        return pd.DataFrame({name: data[name] for name in self.dtype.names})
+
+    def clear(self):
+        self._chunks = []
+        self._fill = self.chunk_rows
+        self._count = 0
+        self.segments.clear()
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import math
+from collections import namedtuple
+import numpy as np
+
+# CONFIG
+TUNING_FILE = "tuning.json"
+COUNTS = (1, 2, 4, 8)     # averaging counts measured during characterization
+REPEATS = 8               # reads per count
+UTILIZATION = 0.8         # share of the cycle period the tuned sensors may use
+MAX_COUNT = 64
+TACH_STEP = 0.05          # s; tach windows are chosen in multiples of this
+
+# One adjustable sensor:
+#   read(n)    one reading averaged over n conversions (or n window steps)
+#   apply(n)   make the driver use n from now on
+#   model      None to measure, or (overhead s, s per count, noise at n=1, noise exponent)
+#   min_count  smallest count allowed; 0 means the sensor has a non-blocking fallback
+#              (e.g. the tach's instant RPM) used when not even n=1 fits the cycle
+Tunable = namedtuple('Tunable', 'read apply model min_count', defaults=(1,))
+
+
+def measure(read, counts=COUNTS, repeats=REPEATS):
+    """
+    Time and repeat read(n) for each count. Returns {n: (mean latency s, std of readings)};
+    failed reads (False/None/NaN) are left out of the noise.
+    """
+    results = {}
+    for n in counts:
+        values, elapsed = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            value = read(n)
+            elapsed.append(time.perf_counter() - start)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                values.append(value)
+        std = float(np.std(values, ddof=1)) if len(values) > 1 else float('nan')
+        results[n] = (float(np.mean(elapsed)), std)
+    return results
+
+
+def fit_model(results):
+    """
+    Fit latency = overhead + per_count * n and noise = sigma1 / sqrt(n)
+    (independent conversions averaged). Returns (overhead, per_count, sigma1, 0.5).
+    """
+    counts = np.array(sorted(results), dtype=float)
+    latency = np.array([results[n][0] for n in sorted(results)])
+    noise = np.array([results[n][1] for n in sorted(results)])
+    if len(counts) > 1:
+        per_count, overhead = np.polyfit(counts, latency, 1)
+    else:
+        per_count, overhead = latency[0] / counts[0], 0.0
+    scaled = noise * np.sqrt(counts)
+    sigma1 = float(np.nanmedian(scaled)) if np.isfinite(scaled).any() else 0.0
+    return (max(0.0, float(overhead)), max(1e-6, float(per_count)), sigma1, 0.5)
+
+
+def tach_model(ppr, step=TACH_STEP):
+    """Pulse counting: the window is the latency, one-pulse quantization the noise."""
+    q = 60.0 / (ppr * step)                   # RPM per pulse for a one-step window
+    return (0.0, step, q / math.sqrt(12), 1.0)  # noise falls as 1/n
+
+
+def _latency(model, n):
+    return model[0] + model[1] * n if n else 0.0
+
+
+def _variance(model, n):
+    """Noise variance relative to n=1, so sensors in different units compare."""
+    if n == 0:
+        return math.inf   # the fallback: taken only when nothing else fits
+    return 0.0 if model[2] == 0 else n ** (-2 * model[3])
+
+
+def _noise(model, n):
+    return None if n == 0 else model[2] * n ** -model[3]
+
+
+def allocate(models, budget, max_count=MAX_COUNT, min_counts=None):
+    """
+    Choose counts {name: n} minimizing the summed relative noise variance with
+    the summed latency within `budget` seconds. Greedy on the best variance
+    reduction per extra second, which is optimal for these convex curves.
+    Every sensor gets at least its min_counts entry (default 1), even if that
+    alone overruns the budget.
+    """
+    min_counts = min_counts or {}
+    counts = {name: min_counts.get(name, 1) for name in models}
+    spent = sum(_latency(m, counts[name]) for name, m in models.items())
+    while True:
+        best, best_gain = None, 0.0
+        for name, m in models.items():
+            n = counts[name]
+            step = _latency(m, n + 1) - _latency(m, n)   # the first count also pays the overhead
+            if n >= max_count or spent + step > budget:
+                continue
+            gain = (_variance(m, n) - _variance(m, n + 1)) / step
+            if gain > best_gain:
+                best, best_gain = name, gain
+        if best is None:
+            return counts
+        spent += _latency(models[best], counts[best] + 1) - _latency(models[best], counts[best])
+        counts[best] += 1
+
+
+def tune(tunables, period, utilization=UTILIZATION, path=TUNING_FILE, fixed_cost=0.0):
+    """
+    Characterize each tunable sensor, choose counts for the given cycle period
+    and apply them. `fixed_cost` is the time (s) taken by the untuned readers.
+    The result is saved to `path` (None to skip) and returned.
+    """
+    models, measurements = {}, {}
+    for name, t in tunables.items():
+        if t.model is not None:
+            models[name] = t.model
+        else:
+            measurements[name] = measure(t.read)
+            models[name] = fit_model(measurements[name])
+    budget = max(0.0, period * utilization - fixed_cost)
+    counts = allocate(models, budget, min_counts={name: t.min_count for name, t in tunables.items()})
+    for name, n in counts.items():
+        tunables[name].apply(n)
+
+    result = {
+        'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'period': period,
+        'budget': budget,
+        'counts': counts,
+        'cycle_time': sum(_latency(models[name], n) for name, n in counts.items()) + fixed_cost,
+        'noise': {name: _noise(models[name], n) for name, n in counts.items()},
+        'models': {name: dict(zip(('overhead', 'per_count', 'sigma1', 'exponent'), m)) for name, m in models.items()},
+        'measurements': {name: {str(n): r for n, r in res.items()} for name, res in measurements.items()},
+    }
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+def load_tuning(path=TUNING_FILE, period=None):
+    """Saved tuning, or None if there is none (or it was made for another period)."""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if period is not None and not math.isclose(saved.get('period', -1), period):
+        return None
+    return saved
+
+
+def tune_or_load(tunables, period, path=TUNING_FILE, **kwargs):
+    """Apply the saved counts for this period, characterizing the sensors first if needed."""
+    saved = load_tuning(path, period)
+    if saved is None or set(saved['counts']) != set(tunables):
+        return tune(tunables, period, path=path, **kwargs)
+    for name, n in saved['counts'].items():
+        tunables[name].apply(n)
+    return saved
+
+
+class PeriodTuning:
+    """
+    Counts tuned for every sampling period the rig uses (e.g. AdaptiveRate's
+    fast and base periods), each loaded from or saved to its own file.
+    apply(period) switches to the counts of the longest tuned period that
+    still fits, so a faster rate never runs the slow rate's reads. The
+    sensors are characterized once and the models reused for each period.
+    """
+
+    def __init__(self, tunables, periods, path=TUNING_FILE, **kwargs):
+        self.tunables = tunables
+        self.counts = {}
+        self.period = None
+        for period in sorted(set(periods)):
+            result = tune_or_load(tunables, period, path=period_path(path, period), **kwargs)
+            self.counts[period] = result['counts']
+            models = result['models']
+            tunables = {name: t._replace(model=tuple(models[name].values())) if name in models else t
+                        for name, t in tunables.items()}
+        self.period = max(self.counts)   # tune_or_load applied each in turn; the slowest is in effect
+
+    def apply(self, period):
+        fitting = [p for p in self.counts if p <= period * (1 + 1e-9)]
+        tuned = max(fitting) if fitting else min(self.counts)
+        if tuned != self.period:
+            self.period = tuned
+            for name, n in self.counts[tuned].items():
+                self.tunables[name].apply(n)
+
+
+def period_path(path, period):
+    """Tuning file for one period: tuning.json -> tuning_0.05s.json"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{period:g}s{ext}"
+
+
+def hardware_tunables(flow=None, load_cells=None, tach=None):
+    """Tunables for the rig's HX711 scales and tachometer (defaults: the sensors modules' instances)."""
+    if flow is None:
+        from sensors.flow import default_sensor
+        flow = default_sensor()
+    if load_cells is None:
+        from sensors.load_cell import default_sensor
+        load_cells = default_sensor()
+    if tach is None:
+        from sensors.rpm import default_sensor
+        tach = default_sensor()
+
+    def hx711(sensor):
+        return Tunable(read=lambda n: sensor.hx.get_weight_mean(readings=n),
+                       apply=lambda n: setattr(sensor, 'readings', n), model=None)
+
+    tunables = {'flow': hx711(flow)}
+    # A streaming scale (LoadCellStream) takes single conversions; its averaging count is unused
+    if load_cells.stream is None:
+        for i, cell in enumerate(load_cells.cells, start=1):
+            tunables[f"load_cell_{i}"] = hx711(cell)
+    # n=0: no counting window fits the cycle, so read the instant RPM instead of blocking
+    tunables['rpm'] = Tunable(read=None, apply=lambda n: setattr(tach, 'duration', n * TACH_STEP),
+                              model=tach_model(tach.ppr), min_count=0)
+    return tunables
+
+
+# Characterize the rig on demand: python -m daq.tuning <period s>
+if __name__ == '__main__':
+    import sys
+    period = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    result = tune(hardware_tunables(), period, path=period_path(TUNING_FILE, period))
+    print(f"Tuned for a {period} s cycle (budget {result['budget']:.3f} s, "
+          f"expected {result['cycle_time']:.3f} s):")
+    for name, n in result['counts'].items():
+        noise = result['noise'][name]
+        print(f"  {name:<12} n={n:<3} " + ("instant read" if noise is None else f"noise {noise:.3g}"))
+    print(f"Saved to {period_path(TUNING_FILE, period)}")
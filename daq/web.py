@@ -0,0 +1,231 @@
+import json
+import queue
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from daq.channels import CHANNELS
+from daq.scheduler import RateClock
+
+# CONFIG
+FRAME_HZ = 10          # frames per second sent to browsers, whatever the acquisition rate
+CLIENT_BACKLOG = 20    # frames buffered per client; a slow client loses the oldest
+KEEPALIVE = 15.0       # s between SSE comments on an idle stream
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>Engine Dashboard</title>
+<style>
+ body { font-family: sans-serif; background: #f4f6f8; margin: 1em; }
+ h1 { font-size: 1.2em; color: #003366; }
+ #status { padding: .4em; margin-bottom: .8em; background: #d4edda; }
+ #status.trip { background: #f8d7da; font-weight: bold; }
+ #tiles { display: grid; grid-template-columns: repeat(auto-fill, minmax(11em, 1fr)); gap: .6em; }
+ .tile { background: white; border: 2px solid #333; padding: .5em; text-align: center; }
+ .label { font-size: .8em; color: #555; }
+ .value { font-size: 1.8em; font-weight: bold; color: #003366; }
+</style></head>
+<body>
+<h1>Engine Control Panel Dashboard</h1>
+<div id="status">Connecting...</div>
+<div id="tiles"></div>
+<script>
+fetch('/channels').then(r => r.json()).then(channels => {
+  const tiles = document.getElementById('tiles'), values = [];
+  for (const ch of channels) {
+    const tile = document.createElement('div');
+    tile.className = 'tile';
+    tile.innerHTML = `<div class="label">${ch.label} (${ch.unit})</div><div class="value">-</div>`;
+    tiles.appendChild(tile);
+    values.push(tile.querySelector('.value'));
+  }
+  const status = document.getElementById('status');
+  const events = new EventSource('/events');
+  events.onmessage = e => {
+    const frame = JSON.parse(e.data);
+    frame.values.forEach((v, i) => values[i].textContent = v === null ? '-' : v.toFixed(2));
+    const s = frame.status || {};
+    status.className = s.tripped ? 'trip' : '';
+    status.textContent = s.tripped ? `INTERLOCK TRIP: ${s.tripped}`
+      : `Live ${new Date(frame.t * 1000).toLocaleTimeString()}` + (s.throttle !== undefined ? ` - throttle ${s.throttle}°` : '');
+  };
+  events.onerror = () => { status.className = 'trip'; status.textContent = 'Disconnected, retrying...'; };
+});
+</script>
+</body></html>
+"""
+
+
+class Broadcaster:
+    """Fans each encoded frame out to every subscribed client queue."""
+
+    def __init__(self, backlog=CLIENT_BACKLOG):
+        self.backlog = backlog
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.backlog)
+        with self._lock:
+            self._clients.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._clients.discard(q)
+
+    def publish(self, frame):
+        with self._lock:
+            clients = list(self._clients)
+        for q in clients:
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                # Slow client: drop its oldest frame rather than hold anyone up
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                q.put_nowait(frame)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "EngineDashboard/1.0"
+
+    def log_message(self, format, *args):
+        pass  # no per-request console output
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        live = self.server.live
+        if self.path == "/":
+            self._send(PAGE.encode(), "text/html; charset=utf-8")
+        elif self.path == "/channels":
+            self._send(live.channels_json, "application/json")
+        elif self.path == "/events":
+            self._stream(live)
+        else:
+            self.send_error(404)
+
+    def _stream(self, live):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        q = live.broadcaster.subscribe()
+        try:
+            if live.last_frame is not None:
+                self.wfile.write(live.last_frame)
+                self.wfile.flush()
+            while not live.stopped.is_set():
+                try:
+                    frame = q.get(timeout=KEEPALIVE)
+                except queue.Empty:
+                    frame = b": keepalive\n\n"
+                self.wfile.write(frame)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            live.broadcaster.unsubscribe(q)
+
+
+class LiveServer:
+    """
+    Optional browser dashboard. An acquisition hook keeps the newest sample;
+    a publisher thread encodes it at FRAME_HZ as one server-sent event and
+    hands the same bytes to every connected client. Everything runs on its
+    own threads, so viewers add no work to the Tk loop.
+
+    `status()` (optional) returns extra JSON-able fields for each frame; it
+    runs on the publisher thread, so it must not touch Tk variables.
+    """
+
+    def __init__(self, acquisition, host="0.0.0.0", port=8080, frame_hz=FRAME_HZ, status=None):
+        self.status = status
+        self.frame_hz = frame_hz
+        self.broadcaster = Broadcaster()
+        self.channels_json = json.dumps(
+            [{'name': c.name, 'label': c.label, 'unit': c.unit} for c in CHANNELS]).encode()
+        self.last_frame = None
+        self.frames_sent = 0
+        self.stopped = threading.Event()
+        self._latest = None
+        self._published = None
+        acquisition.add_hook(self._on_sample)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.live = self
+        self._threads = [
+            threading.Thread(target=self.httpd.serve_forever, name="web-http", daemon=True),
+            threading.Thread(target=self._publish_loop, name="web-publish", daemon=True),
+        ]
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _on_sample(self, timestamp, read_ns, sample):
+        # Acquisition thread: just keep a reference, decimation happens at publish time
+        self._latest = (timestamp, sample)
+
+    def encode(self, timestamp, sample):
+        values = [None if v != v else round(v, 3) for v in sample.tolist()]
+        frame = {'t': timestamp, 'values': values}
+        if self.status is not None:
+            frame['status'] = self.status()
+        return f"data: {json.dumps(frame)}\n\n".encode()
+
+    def _publish_loop(self):
+        clock = RateClock(1.0 / self.frame_hz)
+        while not self.stopped.wait(clock.delay()):
+            if not clock.due():
+                continue
+            latest = self._latest
+            if latest is None or latest is self._published:
+                continue
+            self._published = latest
+            self.last_frame = self.encode(*latest)
+            if len(self.broadcaster):
+                self.broadcaster.publish(self.last_frame)
+                self.frames_sent += 1
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# Standalone demo against mock data: python -m daq.web [port], then open http://localhost:<port>/
+if __name__ == '__main__':
+    import sys
+    import time
+    from daq.acquisition import Acquisition
+    from daq.channels import make_mock_reader
+
+    acquisition = Acquisition(make_mock_reader(), 0.01)
+    live = LiveServer(acquisition, port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080).start()
+    acquisition.start()
+    print(f"Serving {live.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"{len(live.broadcaster)} clients, {live.frames_sent} frames sent")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        acquisition.stop()
+        live.stop()
@@ -1,56 +1,114 @@
-import numpy as np
-import pandas as pd
-from collections import deque
-import random
+import time
+_LAUNCH_NS = time.perf_counter_ns()
 import tkinter as tk
 from tkinter import ttk
-from ttkbootstrap import Style, Toplevel, utility
-import time
-from PIL import Image, ImageTk
+from daq.profiler import PROFILER
+with PROFILER.span("import:ttkbootstrap"):
+    from ttkbootstrap import Style, Toplevel, Window
+
+# --- Fast First Frame ---
+# Put the themed window on screen before the heavy imports below; on a Pi they take seconds.
+# PIL is only needed for the logo and is loaded after the dashboard is up;
+# pandas is only imported by the export path.
+if __name__ == "__main__":
+    root = Window(themename='flatly')
+    root.title("Engine Control Panel Dashboard")
+    root.geometry("1000x550")
+    splash = ttk.Label(root, text="Loading dashboard...", font=('Inter', 14, 'bold'), foreground='#003366')
+    splash.pack(expand=True)
+    root.update()
+    PROFILER.record("startup:first_frame", time.perf_counter_ns() - _LAUNCH_NS)
+
+with PROFILER.span("import:numpy"):
+    import numpy as np
+with PROFILER.span("import:daq"):
+    from daq.scheduler import TkScheduler, SKIP
+    from daq.channels import CHANNELS, N_CHANNELS, N_BASE, INDEX, make_mock_reader, make_reader
+    from daq.storage import RunLog
+    from daq.export import BackgroundExport, FORMATS
+    from daq.catalog import RunCatalog, run_path
+    from daq.acquisition import Acquisition
+    from daq.adaptive import AdaptiveRate, THRESHOLDS, FAST_PERIOD
+    from daq.capture import TriggerCapture, TRIGGER_RULES
+    from daq.step_response import StepResponseMonitor, describe
+    from daq.spectrum import SpectrumMonitor, SyntheticVibration, with_vibration
+    from daq.interlocks import InterlockEngine
+    from daq.governor import RpmGovernor
+    from daq.web import LiveServer
 
 # Sensor Imports
-#from sensors.ESC import cut_throttle, restart_throttle
-#from sensors.servos import set_servo_angle, toggle_choke
+#from sensors.ESC import arm_esc, cut_throttle, restart_throttle
+#from sensors.servos import set_servo_angle, toggle_choke, close_throttle, SERVO1_PIN
 #from sensors.temp import read_temp
-#from sensors.rpm import read_rpm
+#from sensors.rpm import read_rpm, read_rpm_instant
 #from sensors.load_cell import read_load_cells
 #from sensors.flow import read_flow
 
 # --- Mock Sensor Functions ---
-def read_sensors():
-    """Mocks reading all sensor values."""
-    sensor_values = {
-        # Temperature between 15°C and 100°C
-        "Temperature": round(random.uniform(15, 100), 2),
-        # RPM between 0 and 6000 rpm
-        "RPM": random.randint(0, 6000),
-        # Load cells produce forces, say between -1000 and 1000 N
-        "Load Cell 1": round(random.uniform(-1000, 1000), 2),
-        "Load Cell 2": round(random.uniform(-1000, 1000), 2),
-        # Flow sensors: 0–2000 g/min and 0–20 L/min
-        "grams_per_min": round(random.uniform(0, 2000), 2),
-        "liters_per_min": round(random.uniform(0, 20), 2)
-    }
-    return sensor_values
+# Samples are fixed-layout float64 records indexed by position in daq.channels.CHANNELS
+read_sensors = make_mock_reader()
+
+# Vibration spectrum of the thrust axis (mock: a synthetic 1500 RPM engine)
+VIBRATION = SpectrumMonitor(SyntheticVibration(), rpm=lambda: 1500.0)
+read_sensors = with_vibration(read_sensors, VIBRATION)
+
+# Interlock actions, run on the acquisition thread when a limit trips
+INTERLOCK_ACTIONS = []
+
+# Channel rates that speed up sampling (mock data is pure noise, so only control events do)
+ADAPTIVE_THRESHOLDS = {}
+
+# Sensor averaging per sampling period, switched with the adaptive rate (daq.tuning.PeriodTuning; None = fixed)
+RATE_TUNING = None
+
+# Real-time priority for the acquisition thread (see daq.realtime); needs root or CAP_SYS_NICE
+REALTIME_ACQUISITION = False
+
+# Pre/post-trigger high-rate captures around control events (None = off):
+# TriggerCapture arguments naming the fast sources, streams and signal rules
+CAPTURE = None
+
+# RPM governor feedback and actuator (mock: RPM from the latest sample, no servo)
+GOVERNOR_RPM_SOURCE = None
+GOVERNOR_ACTUATOR = lambda angle: None
 
 # Read all sensor values (real implementation)
 '''
-def read_sensors():
-    temp_dict = read_temp()
-    rpm_dict = read_rpm()
-    load_cell_dict = read_load_cells()
-    flow_dict = read_flow()
-
-    return {
-        "Temperature": temp_dict['target_temp'],
-        "RPM": rpm_dict['rpm'],
-        "Load Cell 1": load_cell_dict['Load Cell 1 (Raw)'],
-        "Load Cell 2": load_cell_dict['Load Cell 2 (Raw)'],
-        "grams_per_min": flow_dict['grams_per_min'],
-        "liters_per_min": flow_dict['liters_per_min']
-    }
+# Start pigpiod and arm the ESC up front, so an interlock cut never connects or waits
+arm_esc()
+# Vibration channels from the load cells' full conversion rate (daq.spectrum)
+from sensors.load_cell import default_sensor as default_load_cells, LoadCellStream
+from sensors.rpm import read_rpm_instant
+LOAD_CELL_STREAM = LoadCellStream(default_load_cells()).start()
+VIBRATION = SpectrumMonitor(LOAD_CELL_STREAM, rpm=read_rpm_instant)
+read_sensors = make_reader({
+    'temp': read_temp, 'rpm': read_rpm,
+    'load_cells': read_load_cells, 'flow': read_flow,
+    'vibration': VIBRATION.read,
+})
+INTERLOCK_ACTIONS = [cut_throttle, close_throttle]
+ADAPTIVE_THRESHOLDS = THRESHOLDS
+REALTIME_ACQUISITION = True
+CAPTURE = {'sources': {'RPM': read_rpm_instant}, 'streams': {'Load Cells': LOAD_CELL_STREAM},
+           'rules': TRIGGER_RULES}
+# Averaging counts for the 1 s cycle and the adaptive fast one, measured on first run
+# (python -m daq.tuning <period> to redo); the slow counts apply until the rate changes
+from daq.tuning import PeriodTuning, hardware_tunables
+RATE_TUNING = PeriodTuning(hardware_tunables(), periods=(FAST_PERIOD, 1.0))
+GOVERNOR_RPM_SOURCE = read_rpm_instant
+GOVERNOR_ACTUATOR = lambda angle: set_servo_angle(SERVO1_PIN, angle, quiet=True, wait=False)
 '''
 
+# Browser dashboard for viewers on the local network (None = off), e.g. 8080
+WEB_DASHBOARD_PORT = None
+
+# Lossy compression of the saved run for long endurance logs (None = off), e.g.
+# daq.compress.BOUNDS: per-channel error bounds, read back with daq.compress.read_uniform
+COMPRESS_LOG = None
+
+# Header spectrum view (px)
+SPECTRUM_SIZE = (240, 36)
+
 # --- GUI Implementation ---
 class SensorGUI:
     def __init__(self, root):
@@ -72,56 +130,82 @@ class SensorGUI:
         self.throttle_var = tk.DoubleVar(value=90.0)
         self.percent_text = tk.StringVar(value=f"{int(self.throttle_var.get())}°")
 
-        self.sensor_data = {
-            "Temperature": deque(maxlen=20), "RPM": deque(maxlen=20),
-            "Load Cell 1": deque(maxlen=20), "Load Cell 2": deque(maxlen=20),
-            'grams_per_min': deque(maxlen=20), 'liters_per_min': deque(maxlen=20)
-        }
+        # Recent samples as a ring of records (rows) by channel position (columns)
+        self.history_len = 20
+        self.sensor_data = np.full((self.history_len, N_CHANNELS), np.nan)
+        self.sensor_count = 0
         self.moving_avg_window = 5
         self.wait_time_after_choke = 5  # cycles to wait after choke engagement
         self.after_delay = 1000  # 1 second poll time
         self.waiting_for_readings = 0
-        self._excel_buffer = []
-
-        self.display_widgets = {} 
+        self.run_log = RunLog()  # chunked structured arrays, exported on close
+        self.export_format = tk.StringVar(value='xlsx')
+        self.rpm_target = tk.IntVar(value=4000)
+        self.governor_text = tk.StringVar(value="Hold RPM: Off")
+        self.export = None  # BackgroundExport while saving
+        self._last_poll_ns = None  # for measuring root.after drift
+
+        # Widgets per channel position; None for channels that are logged but not shown
+        self.display_widgets = [
+            {'current': tk.StringVar(value="0"), 'avg': tk.StringVar(value=""), 'unit': ch.unit}
+            if ch.slot else None
+            for ch in CHANNELS
+        ]
+        self._displayed = [i for i, w in enumerate(self.display_widgets) if w is not None]
         self.control_widgets = {}
-        
-        self.display_widgets['Load Cell 1'] = {
-            'current': tk.StringVar(value=f"0"), 'avg': tk.StringVar(value=""), 'unit': "N"
-        }
-
-        self.display_widgets['Temperature'] = {
-            'current': tk.StringVar(value=f"0"), 'avg': tk.StringVar(value=""), 'unit': "°C"
-        }
-        self.display_widgets['RPM'] = {
-            'current': tk.StringVar(value=f"0"), 'avg': tk.StringVar(value=""), 'unit': "RPM"
-        }
-        self.display_widgets['Load Cell 2'] = {
-            'current': tk.StringVar(value=f"0"), 'avg': tk.StringVar(value=""), 'unit': "N"
-        }
-        self.display_widgets['liters_per_min'] = {
-            'current': tk.StringVar(value=f"0"), 'avg': tk.StringVar(value=""), 'unit': "L/min"
-        }
 
         # --- Build Layout ---
         self.create_layout()
         
+        # --- Start Acquisition ---
+        # Sensors are read on their own thread; interlocks see every sample there,
+        # whatever the GUI is doing
+        self.interlocks = InterlockEngine(actions=INTERLOCK_ACTIONS)
+        self.acquisition = Acquisition(read_sensors, self.after_delay / 1000, realtime=REALTIME_ACQUISITION)
+        self.acquisition.add_hook(self.interlocks.check)
+        # Fast sampling through transients and control actions, slow during steady holds
+        self.adaptive = AdaptiveRate(self.acquisition, ADAPTIVE_THRESHOLDS, base_period=self.after_delay / 1000,
+                                     on_period=RATE_TUNING.apply if RATE_TUNING is not None else None)
+        self.acquisition.add_hook(self.adaptive.check)
+        self.interlocks.actions.append(lambda: self.adaptive.event("interlock"))
+        # Oscilloscope-style captures: a high-rate ring frozen around each control event
+        self.capture = None
+        if CAPTURE is not None:
+            self.capture = TriggerCapture(self.acquisition, **CAPTURE)
+            self.interlocks.actions.append(lambda: self.capture.trigger("interlock"))
+        # Delay, rise, overshoot and settling of each throttle step, fitted off the Tk thread
+        self.steps = StepResponseMonitor(self.acquisition, setpoint=int(self.throttle_var.get()),
+                                         on_result=lambda row: print(describe(row)))
+        # Optional live view in browsers; served and encoded off the Tk thread
+        self.web = None
+        if WEB_DASHBOARD_PORT:
+            self.web = LiveServer(self.acquisition, port=WEB_DASHBOARD_PORT, status=self._web_status).start()
+            print(f"Live dashboard at {self.web.url}")
+        self.acquisition.start()
+
+        # Closed-loop RPM hold on its own thread; an interlock trip or a cut disengages it
+        self.governor = RpmGovernor(
+            GOVERNOR_RPM_SOURCE or self._latest_rpm, GOVERNOR_ACTUATOR,
+            inhibit=lambda: self.interlocks.tripped or not self.sensor_active,
+            lock=self.interlocks.lock).start()
+
         # --- Start Polling ---
-        self.root.after(0, self.poll_sensors)
+        # Fixed-rate on absolute deadlines so the dashboard keeps pace with acquisition
+        self.scheduler = TkScheduler(self.root)
+        self.scheduler.add('poll', self.after_delay / 1000, self.poll_sensors, policy=SKIP)
         self.root.protocol("WM_DELETE_WINDOW", self.save_data_and_close)
         
         # Initialize indicator colors (Cut/Restart starts ready/green)
         self.update_cut_restart_indicators() 
 
-    def create_indicator_block(self, parent, data_key, label_text, unit, row, col):
+        # Profiler overlay (F2 toggles)
+        self.profiler_overlay = None
+        self.root.bind('<F2>', self.toggle_profiler_overlay)
+
+    def create_indicator_block(self, parent, index, row, col):
         """Creates one of the four top bordered display blocks with current and avg data."""
-        
-        key_map = {
-            "Temperature": "Temperature", "RPM": "RPM",
-            "Torque": "Load Cell 2",
-            "Fuel Flow": "liters_per_min"
-        }
-        key = key_map.get(label_text, data_key)
+        channel = CHANNELS[index]
+        label_text, unit = channel.label, channel.unit
 
         BLOCK_WIDTH = 150 
         BLOCK_HEIGHT = 85 
@@ -132,7 +216,7 @@ class SensorGUI:
         # Crucial step: stop the frame from shrinking/expanding to its contents
         block_frame.grid_propagate(False) 
         
-        current_value_text = self.display_widgets[key]['current']
+        current_value_text = self.display_widgets[index]['current']
         
         # FIXED WIDTH for the main value label to prevent overflow, anchor center for safety
         value_label = ttk.Label(
@@ -140,7 +224,8 @@ class SensorGUI:
             padding=(0, 2), foreground='#003366', anchor='center', width=10) # Fixed width 
         value_label.pack(fill='x', expand=True, pady=(3, 0))
         
-        avg_value_text = tk.StringVar(value="Avg: 0")
+        avg_value_text = self.display_widgets[index]['avg']
+        avg_value_text.set("Avg: 0")
         avg_label = ttk.Label(
             block_frame, textvariable=avg_value_text, font=('Inter', 9, 'normal'),
             padding=(0, 2), foreground='#777', anchor='center')
@@ -151,11 +236,22 @@ class SensorGUI:
             foreground='#555'
         ).grid(row=row+1, column=col, pady=(0, 5))
 
-        self.display_widgets[key] = {
-            'current': current_value_text, 'avg': avg_value_text, 'unit': unit
-        }
         return block_frame
 
+    def _load_logo(self):
+        """Loads PIL and the header logo after the first dashboard frame is drawn."""
+        try:
+            with PROFILER.span("import:PIL"):
+                from PIL import Image, ImageTk
+            logo_image = Image.open("logo.png")
+            logo_image = logo_image.resize((35, 35), Image.Resampling.LANCZOS)
+            self.logo_photo = ImageTk.PhotoImage(logo_image)
+            
+            logo_label = ttk.Label(self.header_frame, image=self.logo_photo)
+            logo_label.pack(side='left', padx=(15, 8), before=self.title_label)
+        except Exception as e:
+            print(f"Logo error: {e}")
+
     def create_circular_indicator(self, parent, color, tag, initial_state=True):
         """Creates a circular canvas indicator and returns the canvas and the circle item ID."""
         size = 30
@@ -196,19 +292,16 @@ class SensorGUI:
         self.header_frame = ttk.Frame(self.root, padding=(15, 3))
         self.header_frame.pack(fill='x', pady=(3, 5))
         
-        try:
-            logo_image = Image.open("logo.png")
-            logo_image = logo_image.resize((35, 35), Image.Resampling.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_image)
-            
-            logo_label = ttk.Label(self.header_frame, image=self.logo_photo)
-            logo_label.pack(side='left', padx=(15, 8))
-        except Exception as e:
-            print(f"Logo error: {e}")
-        
-        # Title alongside logo
-        ttk.Label(self.header_frame, text="Engine Control Panel Dashboard", 
-                 font=('Inter', 14, 'bold'), foreground='#003366').pack(side='left')
+        # Title alongside logo (the logo itself is added once the dashboard is up)
+        self.title_label = ttk.Label(self.header_frame, text="Engine Control Panel Dashboard", 
+                 font=('Inter', 14, 'bold'), foreground='#003366')
+        self.title_label.pack(side='left')
+        self.root.after(50, self._load_logo)
+
+        # Live vibration spectrum of the thrust axis (daq.spectrum), redrawn each poll
+        self.spectrum_canvas = tk.Canvas(self.header_frame, width=SPECTRUM_SIZE[0], height=SPECTRUM_SIZE[1],
+                                         bg='white', highlightthickness=0)
+        self.spectrum_canvas.pack(side='right')
 
         # 1. Top Indicators Frame
         self.top_grid_frame = ttk.Frame(self.root, padding=5)
@@ -216,14 +309,9 @@ class SensorGUI:
         self.top_grid_frame.columnconfigure((0, 1, 2, 3), weight=1)
         self.top_grid_frame.rowconfigure((0, 1), weight=1)
 
-        sensors_config = [
-            ("Temperature", "Temperature", "°C", 0, 0), ("RPM", "RPM", "RPM", 0, 1),
-            ("Load Cell 2", "Torque", "N", 0, 2),
-            ("liters_per_min", "Fuel Flow", "L/min", 0, 3)
-        ]
-        
-        for key, label, unit, r, c in sensors_config:
-            self.create_indicator_block(self.top_grid_frame, key, label, unit, r, c)
+        for index, channel in enumerate(CHANNELS):
+            if channel.slot and channel.slot[0] == 'top':
+                self.create_indicator_block(self.top_grid_frame, index, 0, channel.slot[1])
 
         # 2. Center Controls Frame
         self.center_frame = ttk.Frame(self.root, padding=5)
@@ -236,7 +324,7 @@ class SensorGUI:
             self.center_frame, "Choke", self.toggle_choke, self.choke_text, 'choke'
         )
 
-        # 2b. Central Thrust Value Display (Load Cell 1)
+        # 2b. Central Thrust Value Display (derived Thrust channel)
         THRUST_WIDTH = 180
         THRUST_HEIGHT = 160
         
@@ -245,10 +333,13 @@ class SensorGUI:
         self.thrust_frame.pack(side='left', padx=25, pady=5, fill='both', expand=True)
         self.thrust_frame.pack_propagate(False) # Crucial step for pack geometry
 
-        ttk.Label(self.thrust_frame, text="Thrust (N)", font=('Inter', 12, 'bold'), foreground='#333').pack(pady=(0, 3))
+        thrust_index = next(i for i, ch in enumerate(CHANNELS) if ch.slot == ('thrust',))
+        thrust_channel = CHANNELS[thrust_index]
+        ttk.Label(self.thrust_frame, text=f"{thrust_channel.label} ({thrust_channel.unit})",
+                  font=('Inter', 12, 'bold'), foreground='#333').pack(pady=(0, 3))
         
-        # Use the StringVar created in __init__ for Load Cell 1 
-        thrust_text_var = self.display_widgets['Load Cell 1']['current']
+        # Use the StringVar created in __init__ for the thrust channel
+        thrust_text_var = self.display_widgets[thrust_index]['current']
 
         self.thrust_value_label = ttk.Label(
             self.thrust_frame, textvariable=thrust_text_var, font=('Inter', 26, 'bold'), 
@@ -287,11 +378,24 @@ class SensorGUI:
 
         ttk.Button(self.slider_frame, text="➕", command=self.increment_throttle, bootstyle='dark', width=5).pack(side='left', padx=8, ipady=3)
         
-        # 5. Save Button
+        # 5. Save Button and export format
+        self.save_frame = ttk.Frame(self.root)
+        self.save_frame.pack(pady=(3, 5))
+        ttk.Spinbox(
+            self.save_frame, from_=0, to=8000, increment=100, textvariable=self.rpm_target, width=6
+        ).pack(side='left', padx=(0, 4))
         ttk.Button(
-            self.root, text="Save Data and Exit", command=self.save_data_and_close, 
+            self.save_frame, textvariable=self.governor_text, command=self.toggle_governor,
+            bootstyle='info-outline', width=16
+        ).pack(side='left', padx=(0, 20), ipady=8)
+        ttk.Combobox(
+            self.save_frame, textvariable=self.export_format, values=FORMATS,
+            state='readonly', width=8
+        ).pack(side='left', padx=8)
+        ttk.Button(
+            self.save_frame, text="Save Data and Exit", command=self.save_data_and_close, 
             style='Control.TButton', bootstyle='light', width=20
-        ).pack(pady=(3, 5), ipadx=15, ipady=8)
+        ).pack(side='left', ipadx=15, ipady=8)
 
     def create_custom_slider(self):
         """Creates a custom canvas-based slider with a vertical bar handle for better touchscreen use."""
@@ -475,6 +579,21 @@ class SensorGUI:
             self.on_throttle_change()
 
     # --- Utility Methods ---
+
+    def toggle_profiler_overlay(self, event=None):
+        """Shows or hides the per-stage timing table on top of the dashboard."""
+        if self.profiler_overlay is not None:
+            self.profiler_overlay.destroy()
+            self.profiler_overlay = None
+            return
+        self.profiler_overlay = tk.Label(
+            self.root, text=PROFILER.format_table(), font=('Courier', 9), justify='left',
+            anchor='nw', bg='#111', fg='#7CFC00', padx=8, pady=6)
+        self.profiler_overlay.place(relx=1.0, rely=0.0, anchor='ne')
+
+    def _refresh_profiler_overlay(self):
+        if self.profiler_overlay is not None:
+            self.profiler_overlay.config(text=PROFILER.format_table())
     
     def show_modal(self, title, message, style='info', size=(300, 150), button_text="OK", command=None):
         """Displays a simple modal message."""
@@ -493,34 +612,77 @@ class SensorGUI:
             pass
         
     def clear_data(self):
-        """Clears all sensor data deques, the Excel buffer, and resets GUI labels."""
-        for key in self.sensor_data:
-            self.sensor_data[key].clear()
-            if key in self.display_widgets:
-                widget_data = self.display_widgets[key]
-                unit = widget_data['unit']
-                widget_data['current'].set(f"0")
-                widget_data['avg'].set(f"Avg: 0")
+        """Resets the live moving-average view and GUI labels; the run log keeps everything."""
+        self.sensor_data.fill(np.nan)
+        self.sensor_count = 0
+        for index in self._displayed:
+            widget_data = self.display_widgets[index]
+            widget_data['current'].set("0")
+            widget_data['avg'].set("Avg: 0")
         
     # --- Control Handlers ---
 
     def on_throttle_change(self, event=None):
-        """Updates throttle angle display and clears all accumulated data."""
+        """Updates throttle angle display; the next sample starts a new log segment."""
         throttle_value = int(self.throttle_var.get())
         angle_text = f"{throttle_value}°"
+        # Manual throttle input always takes over from the governor
+        if self.governor.engaged:
+            self.governor.disengage()
+            self.governor_text.set("Hold RPM: Off")
         self.update_servo_angle(throttle_value)
+        self._control_event("throttle")
+        self.steps.setpoint(throttle_value)
         
         self.percent_text.set(angle_text) 
-        
-        # LOGIC: As required by the original logic, changing the throttle setting MUST clear the data.
-        self.clear_data()
     
+    def _control_event(self, name):
+        """Sample fast around a control action and capture its transient."""
+        self.adaptive.event(name)
+        if self.capture is not None:
+            self.capture.trigger(name)
+
     def update_servo_angle(self, angle=None):
         if angle is None:
             angle = int(self.throttle_var.get())
 
         #set_servo_angle(18, angle)
 
+    def toggle_governor(self):
+        """Engages or releases closed-loop RPM hold at the target in the spinbox."""
+        if self.governor.engaged:
+            self.governor.disengage()
+            self.governor_text.set("Hold RPM: Off")
+            return
+        if self.interlocks.tripped or not self.sensor_active:
+            self.status_label_text.set("Engine cut: restart before holding RPM.")
+            self.status_label.config(style='Danger.TLabel')
+            return
+        try:
+            target = float(self.rpm_target.get())
+        except tk.TclError:
+            return
+        self.governor.engage(target, self.throttle_var.get())
+        self._control_event("governor")
+        self.governor_text.set(f"Hold RPM: {int(target)}")
+
+    def _latest_rpm(self):
+        """RPM from the most recent acquisition sample (mock governor feedback)."""
+        timestamp, sample = self.acquisition.latest
+        return None if sample is None else float(sample[INDEX["RPM"]])
+
+    def _sync_governor_display(self):
+        """Mirror the governor's throttle output on the slider."""
+        if self.governor.engaged:
+            angle = self.governor.output
+            self.throttle_var.set(angle)
+            self.percent_text.set(f"{int(angle)}°")
+            if getattr(self, 'slider_initialized', False):
+                self._update_handle_position(self._value_to_x(angle))
+        elif self.governor_text.get() != "Hold RPM: Off":
+            # Released by an interlock trip or a cut
+            self.governor_text.set("Hold RPM: Off")
+
     def increment_throttle(self):
         new_value = min(120, self.throttle_var.get() + 1)
         self.throttle_var.set(new_value)
@@ -551,6 +713,7 @@ class SensorGUI:
         """Toggles the choke state and manages the initial delay."""
         current_state = self.choke_state.get()
         self.choke_state.set(not current_state)
+        self._control_event("choke")
         self.update_choke_indicators()
 
         if self.choke_state.get():
@@ -560,10 +723,9 @@ class SensorGUI:
             self.status_label_text.set(f"Choke OPEN. Starting {self.wait_time_after_choke}s delay...")
             self.status_label.config(style='Danger.TLabel')
         else:
-            # Choke is now CLOSED (OFF) - clear data, set button text to "Choke: Closed"
+            # Choke is now CLOSED (OFF) - set button text to "Choke: Closed"
             self.choke_text.set("Choke: Closed")
-            self.clear_data()
-            self.status_label_text.set("Choke CLOSED. Data Cleared.")
+            self.status_label_text.set("Choke CLOSED.")
             self.status_label.config(style='Success.TLabel')
 
     def update_cut_restart_indicators(self):
@@ -579,14 +741,16 @@ class SensorGUI:
         red_canvas.itemconfig(red_id, fill='gray' if is_active else 'red')
         
     def toggle_cut_restart(self):
-        """Toggles the engine active state, manages polling and data clearing."""
+        """Toggles the engine active state and manages polling."""
         
         # LOGIC FIX: Invert the state
         self.sensor_active = not self.sensor_active
         self.update_cut_restart_indicators()
+        self._control_event("restart" if self.sensor_active else "cut")
 
         if self.sensor_active:
-            # Engine is now ACTIVE (Restarted)
+            # Engine is now ACTIVE (Restarted); operator restart also clears a latched interlock
+            self.interlocks.reset()
             self.cut_restart_text.set("State: Cut") 
             #restart_throttle()
             self.status_label_text.set("Engine Restarted. Sensor Polling Active.")
@@ -595,17 +759,50 @@ class SensorGUI:
             # Engine is now INACTIVE (Cut)
             self.cut_restart_text.set("State: Restart") 
             #cut_throttle()
-            self.clear_data()
-            self.status_label_text.set("Engine Cut. Sensor Polling Paused. Data Cleared.")
+            self.status_label_text.set("Engine Cut. Sensor Polling Paused.")
             self.status_label.config(style='Danger.TLabel')
 
+    def _draw_spectrum(self):
+        """Log-scaled bars of the latest vibration spectrum, with the dominant frequency."""
+        latest = VIBRATION.latest
+        if latest is None:
+            return
+        freqs, psd = latest
+        width, height = SPECTRUM_SIZE
+        canvas = self.spectrum_canvas
+        canvas.delete('all')
+        level = np.log10(psd[1:] + 1e-12)
+        level = (level - level.min()) / max(np.ptp(level), 1e-9)
+        step = width / len(level)
+        for i, v in enumerate(level):
+            canvas.create_rectangle(i * step, height - v * (height - 2), (i + 1) * step, height,
+                                    fill='#003366', width=0)
+        canvas.create_text(width - 2, 1, anchor='ne', font=('Inter', 7), fill='red',
+                           text=f"peak {freqs[1:][np.argmax(psd[1:])]:.1f} Hz")
+
     # --- Polling Logic ---
 
     def poll_sensors(self):
         """Polls sensors, handles choke delay, and updates GUI."""
         if not self.root.winfo_exists():
             return
-            
+
+        # Time between polls beyond the requested period is scheduling lateness
+        now_ns = time.perf_counter_ns()
+        if self._last_poll_ns is not None:
+            PROFILER.record("after_drift", max(0, now_ns - self._last_poll_ns - self.after_delay * 1_000_000))
+        self._last_poll_ns = now_ns
+
+        # The interlock already cut the engine on the acquisition thread; reflect it here
+        if self.interlocks.tripped and self.sensor_active:
+            self.sensor_active = False
+            self.update_cut_restart_indicators()
+            self.cut_restart_text.set("State: Restart")
+            self.status_label_text.set(f"INTERLOCK TRIP: {self.interlocks.trip_reason}. Engine cut.")
+            self.status_label.config(style='Danger.TLabel')
+
+        samples = self.acquisition.drain()
+        self._draw_spectrum()
         should_poll = False
 
         if self.sensor_active:
@@ -624,81 +821,173 @@ class SensorGUI:
                 # Choke is CLOSED: Poll sensors immediately
                 should_poll = False
 
-        if should_poll:
-            values = read_sensors()
-            if not values or any(v is None for v in values.values()):
+        if should_poll and samples:
+            if any(np.isnan(values[:N_BASE]).any() for _, values in samples):
                 self.status_label_text.set("Sensor missing, skipping cycle...")
                 # If a reading fails, re-enforce the delay if the choke is open, 
                 # to prevent rapid logging of bad data.
                 if self.choke_state.get():
                     self.waiting_for_readings = self.wait_time_after_choke
             else:
-                self._process_and_update_values(values)
-                self.status_label_text.set(f"Sampling Active.")
+                for timestamp, values in samples:
+                    self._process_and_update_values(values, timestamp)
+                missed = self.scheduler.stats()['poll']['missed']
+                status = f"Sampling Active. Segment {len(self.run_log.segments)} ({self.run_log.segments.current_key[0]}°)."
+                self.status_label_text.set(f"{status} Missed deadlines: {missed}" if missed else status)
                 self.status_label.config(style='Success.TLabel')
-        elif not self.sensor_active:
+        elif not self.sensor_active and not self.interlocks.tripped:
             # Update status if engine is cut
             self.status_label_text.set("Engine CUT. Polling Paused.")
             self.status_label.config(style='Danger.TLabel')
         
         # If the status was updated by the choke delay, don't overwrite it here.
-        
-        self.root.after(self.after_delay, self.poll_sensors)
 
-    def _process_and_update_values(self, sensor_values):
-        """Updates internal deques and GUI labels based on new sensor data."""
-        timestamp = time.time()
-        excel_row = {'Time': timestamp, 'Throttle': int(self.throttle_var.get())}
-        
-        for key, value in sensor_values.items():
-            self.sensor_data[key].append(value)
-            excel_row[key] = value
+        self._sync_governor_display()
+        self._refresh_profiler_overlay()
 
-            if key in self.display_widgets:
-                widget_data = self.display_widgets[key]
-                unit = widget_data['unit']
-                
-                widget_data['current'].set(f"{value:.2f}")
+    def _process_and_update_values(self, sensor_values, timestamp):
+        """Logs the sample, updates the moving averages and GUI labels."""
 
-                latest_readings = list(self.sensor_data[key])
-                if len(latest_readings) >= self.moving_avg_window:
-                    avg_value = np.mean(latest_readings[-self.moving_avg_window:])
-                    widget_data['avg'].set(f"Avg: {avg_value:.2f}")
-        
-        self._excel_buffer.append(excel_row)
+        with PROFILER.span("log"):
+            new_segment = self.run_log.append(
+                timestamp, int(self.throttle_var.get()), sensor_values,
+                choke=self.choke_state.get(), active=self.sensor_active)
+        if new_segment:
+            # Averages only make sense within one throttle/choke/cut setting
+            self.clear_data()
+
+        with PROFILER.span("filter"):
+            self.sensor_data[self.sensor_count % self.history_len] = sensor_values
+            self.sensor_count += 1
+            averages = None
+            if self.sensor_count >= self.moving_avg_window:
+                rows = np.arange(self.sensor_count - self.moving_avg_window, self.sensor_count) % self.history_len
+                averages = self.sensor_data[rows].mean(axis=0)
+
+        with PROFILER.span("gui_update"):
+            for index in self._displayed:
+                widget_data = self.display_widgets[index]
+                widget_data['current'].set(f"{sensor_values[index]:.2f}")
+                if averages is not None:
+                    widget_data['avg'].set(f"Avg: {averages[index]:.2f}")
 
     # --- Exit Logic ---
 
     def save_data_and_close(self):
-        """Attempts to save accumulated data to Excel and then closes the application."""
-        if self._excel_buffer:
+        """Starts saving accumulated data on a worker thread; the app closes when it finishes."""
+        if self.export is not None:
+            return  # already saving
+        self.scheduler.stop()
+        if not len(self.run_log):
+            self._close()
+            return
+
+        fmt = self.export_format.get()
+        filename = run_path(fmt=fmt)  # a new file per run, indexed in the run catalog once saved
+        self.status_label_text.set(f"Saving data to {filename}...")
+        self.status_label.config(style='Warning.TLabel')
+
+        self._export_start_ns = time.perf_counter_ns()
+        steps = self.steps.table()
+        self.export = BackgroundExport(self.run_log, filename, fmt,
+                                       extra_tables={'Step Response': steps} if len(steps) else None,
+                                       compress=COMPRESS_LOG).start()
+        self._show_export_progress(filename)
+        self.root.after(100, self._poll_export)
+
+    def _show_export_progress(self, filename):
+        """Small non-blocking window with a progress bar and a Cancel button."""
+        self.export_window = Toplevel(title="Saving", parent=self.root, size=(360, 150))
+        self.export_window.place_window_center()
+        self.export_progress_text = tk.StringVar(value=f"Saving to {filename}...")
+        ttk.Label(self.export_window, textvariable=self.export_progress_text, padding=(20, 10)).pack()
+        self.export_progress = ttk.Progressbar(
+            self.export_window, maximum=self.export.total_rows, length=300, bootstyle='info')
+        self.export_progress.pack(pady=5)
+        ttk.Button(self.export_window, text="Cancel", command=self.export.cancel, bootstyle='danger').pack(pady=5)
+        self.export_window.protocol("WM_DELETE_WINDOW", self.export.cancel)
+
+    def _poll_export(self):
+        """Tracks the background export from the Tk loop and finishes up when it is done."""
+        export = self.export
+        if not export.done.is_set():
+            self.export_progress.config(value=export.rows_written)
+            self.export_progress_text.set(f"Saved {export.rows_written} of {export.total_rows} readings...")
+            self.root.after(100, self._poll_export)
+            return
+
+        PROFILER.record("export", time.perf_counter_ns() - self._export_start_ns)
+        self.export_window.destroy()
+        self.export = None
+
+        if export.cancelled:
+            # Back to the dashboard; nothing was written
+            self.status_label_text.set("Save cancelled. Sampling resumed.")
+            self.status_label.config(style='Danger.TLabel')
+            self.scheduler.start()
+            return
+
+        if isinstance(export.error, ImportError):
+            self.show_modal("Dependency Error", f"Cannot save data as {export.fmt}. Missing package: {export.error.name}.", style='danger', size=(400, 200))
+        elif export.error is not None:
+            self.show_modal("File Error", f"Failed to save data to {export.path}. Error: {export.error}", style='danger', size=(400, 200))
+        else:
             try:
-                # Update UI to prevent perceived freeze during file write
-                self.status_label_text.set("Saving data to Excel...")
-                self.status_label.config(style='Warning.TLabel') 
-                self.root.update()
-
-                df = pd.DataFrame(self._excel_buffer)
-                filename = "sensor_readings.xlsx"
-                
-                with pd.ExcelWriter(filename, engine="openpyxl") as writer:
-                    df.to_excel(writer, index=False, sheet_name="Readings")
-                
-                # Confirmation modal
-                self.show_modal("Save Complete", f"Saved {len(df)} readings to {filename}.", style='success', size=(300, 150))
-
-            except (ImportError, ModuleNotFoundError):
-                self.show_modal("Dependency Error", "Cannot save data. Please install 'pandas' and 'openpyxl'.", style='danger', size=(400, 200))
-                
+                # The exported snapshot, not the live log
+                RunCatalog().add_chunks(export.path, export.chunks, compressed=COMPRESS_LOG is not None)
             except Exception as e:
-                self.show_modal("File Error", f"Failed to save data to Excel. Error: {e}", style='danger', size=(400, 200))
-        
+                print(f"Run saved but not cataloged: {e}")
+            # Confirmation modal
+            self.show_modal("Save Complete", f"Saved {export.rows_written} readings to {export.path}.", style='success', size=(300, 150))
+
+        self._close()
+
+    def _web_status(self):
+        """Frame status for browser viewers; runs on the web thread, so no Tk variables."""
+        key = self.run_log.segments.current_key
+        return {'throttle': key[0] if key else None, 'tripped': self.interlocks.trip_reason}
+
+    def _close(self):
+        self.governor.stop()
+        self.acquisition.stop()
+        self.steps.stop()
+        if self.web is not None:
+            self.web.stop()
+        if self.capture is not None:
+            self.capture.stop()
+            print(f"Transient captures: {len(self.capture.captures)} in {self.capture.directory}/"
+                  + (f", {len(self.capture.errors)} failed" if self.capture.errors else ""))
+        governor_stats = self.governor.timing()
+        if governor_stats.get('cycles'):
+            print(f"Governor loop: {governor_stats['cycles']} cycles, {governor_stats['missed']} missed, "
+                  f"jitter {governor_stats['jitter_ms']:.2f} ms")
+        poll_stats = self.scheduler.stats()['poll']
+        print(f"Poll deadlines: {poll_stats['cycles']} cycles, {poll_stats['missed']} missed, "
+              f"jitter {poll_stats['jitter_ms']:.2f} ms")
+        wakeup = self.acquisition.wakeup_latency
+        print(f"Acquisition wakeup latency: p99 {wakeup.percentile(0.99) / 1e6:.2f} ms, "
+              f"max {wakeup.max_ns / 1e6:.2f} ms (real-time: {self.acquisition.realtime_status})")
+        adaptive = self.adaptive.summary()
+        print(f"Adaptive sampling: {adaptive['fast_samples']} of {adaptive['samples']} samples fast "
+              f"({adaptive['fast_missed']} deadlines missed), triggers {adaptive['triggers']}")
+
+        # Keep the stage timings from this run alongside the data
+        try:
+            PROFILER.dump("profile.csv")
+        except OSError as e:
+            print(f"Profile dump error: {e}")
+
         # Close the application cleanly
         self.root.quit()
         self.root.destroy()
 
 # Run Application
 if __name__ == "__main__":
-    root = tk.Tk()
+    splash.destroy()
     app = SensorGUI(root)
+    root.update_idletasks()
+    PROFILER.record("startup:dashboard", time.perf_counter_ns() - _LAUNCH_NS)
+    for stage, stats in PROFILER.snapshot().items():
+        if stage.startswith(("startup:", "import:")):
+            print(f"{stage:<22}{stats['max_ms']:>9.1f} ms")
     root.mainloop()
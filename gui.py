@@ -1,58 +1,92 @@
 # Importing Packages
-import numpy as np
-import pandas as pd
-from collections import deque
-import threading
-import queue
 import time
-import random
+_LAUNCH_NS = time.perf_counter_ns()
 import tkinter as tk
 from tkinter import ttk
-import ttkbootstrap as tb
+from daq.profiler import PROFILER
+with PROFILER.span("import:ttkbootstrap"):
+    import ttkbootstrap as tb
+
+# Draw the themed window before the heavy imports below (seconds on a Pi);
+# pandas is only imported by the export path.
+if __name__ == "__main__":
+    root = tb.Window(themename="superhero")
+    root.title("Raspberry Pi Sensor Dashboard")
+    splash = ttk.Label(root, text="Loading dashboard...", padding=40)
+    splash.pack(expand=True)
+    root.update()
+    PROFILER.record("startup:first_frame", time.perf_counter_ns() - _LAUNCH_NS)
+
+with PROFILER.span("import:numpy"):
+    import numpy as np
+with PROFILER.span("import:daq"):
+    from daq.scheduler import TkScheduler, SKIP
+    from daq.channels import CHANNELS, N_CHANNELS, N_BASE, make_mock_reader, make_reader
+    from daq.storage import RunLog
+    from daq.export import BackgroundExport
+    from daq.catalog import RunCatalog, run_path
+    from daq.acquisition import Acquisition
+    from daq.adaptive import AdaptiveRate, THRESHOLDS, FAST_PERIOD
+    from daq.capture import TriggerCapture, TRIGGER_RULES
+    from daq.step_response import StepResponseMonitor, describe
+    from daq.spectrum import SpectrumMonitor
+    from daq.interlocks import InterlockEngine
 
 # Sensor Imports
-#from sensors.ESC import cut_throttle, restart_throttle
-#from sensors.servos import set_servo_angle, toggle_choke
+#from sensors.ESC import arm_esc, cut_throttle, restart_throttle
+#from sensors.servos import set_servo_angle, toggle_choke, close_throttle
 #from sensors.temp import read_temp
 #from sensors.rpm import read_rpm
 #from sensors.load_cell import read_load_cells
 #from sensors.flow import read_flow
 
 # Read all sensor values (mock implementation)
-def read_sensors():
-    sensor_values = {
-        # Temperature between 15°C and 100°C
-        "Temperature": round(random.uniform(15, 100), 2),
+# Samples are fixed-layout float64 records indexed by position in daq.channels.CHANNELS
+read_sensors = make_mock_reader()
+
+# Interlock actions, run on the acquisition thread when a limit trips
+INTERLOCK_ACTIONS = []
 
-        # RPM between 0 and 6000 rpm
-        "RPM": random.randint(0, 6000),
+# Channel rates that speed up sampling (mock data is pure noise, so only control events do)
+ADAPTIVE_THRESHOLDS = {}
 
-        # Load cells produce forces, say between -1000 and 1000 N
-        "Load Cell 1": round(random.uniform(-1000, 1000), 2),
-        "Load Cell 2": round(random.uniform(-1000, 1000), 2),
+# Sensor averaging per sampling period, switched with the adaptive rate (daq.tuning.PeriodTuning; None = fixed)
+RATE_TUNING = None
 
-        # Flow sensors: 0–2000 g/min and 0–20 L/min
-        "grams_per_min": round(random.uniform(0, 2000), 2),
-        "liters_per_min": round(random.uniform(0, 20), 2)
-    }
-    return sensor_values
+# Real-time priority for the acquisition thread (see daq.realtime); needs root or CAP_SYS_NICE
+REALTIME_ACQUISITION = False
+
+# Pre/post-trigger high-rate captures around control events (None = off):
+# TriggerCapture arguments naming the fast sources, streams and signal rules
+CAPTURE = None
+
+# Lossy compression of the saved run for long endurance logs (None = off), e.g.
+# daq.compress.BOUNDS: per-channel error bounds, read back with daq.compress.read_uniform
+COMPRESS_LOG = None
 
 # Read all sensor values (real implementation)
 '''
-def read_sensors():
-    temp_dict = read_temp()
-    rpm_dict = read_rpm()
-    load_cell_dict = read_load_cells()
-    flow_dict = read_flow()
-
-    return {
-        "Temperature": temp_dict['target_temp'],
-        "RPM": rpm_dict['rpm'],
-        "Load Cell 1": load_cell_dict['Load Cell 1 (Raw)'],
-        "Load Cell 2": load_cell_dict['Load Cell 2 (Raw)'],
-        "grams_per_min": flow_dict['grams_per_min'],
-        "liters_per_min": flow_dict['liters_per_min']
-    }
+# Start pigpiod and arm the ESC up front, so an interlock cut never connects or waits
+arm_esc()
+# Vibration channels from the load cells' full conversion rate (daq.spectrum)
+from sensors.load_cell import default_sensor as default_load_cells, LoadCellStream
+from sensors.rpm import read_rpm_instant
+LOAD_CELL_STREAM = LoadCellStream(default_load_cells()).start()
+VIBRATION = SpectrumMonitor(LOAD_CELL_STREAM, rpm=read_rpm_instant)
+read_sensors = make_reader({
+    'temp': read_temp, 'rpm': read_rpm,
+    'load_cells': read_load_cells, 'flow': read_flow,
+    'vibration': VIBRATION.read,
+})
+INTERLOCK_ACTIONS = [cut_throttle, close_throttle]
+ADAPTIVE_THRESHOLDS = THRESHOLDS
+REALTIME_ACQUISITION = True
+CAPTURE = {'sources': {'RPM': read_rpm_instant}, 'streams': {'Load Cells': LOAD_CELL_STREAM},
+           'rules': TRIGGER_RULES}
+# Averaging counts for the 1 s cycle and the adaptive fast one, measured on first run
+# (python -m daq.tuning <period> to redo); the slow counts apply until the rate changes
+from daq.tuning import PeriodTuning, hardware_tunables
+RATE_TUNING = PeriodTuning(hardware_tunables(), periods=(FAST_PERIOD, 1.0))
 '''
     
 class SensorGUI:
@@ -115,70 +149,84 @@ class SensorGUI:
         self.cut_restart_button.grid(row=5, column=0, pady=5)
 
         # ------------------- Sensor Display -------------------
+        # One tile per channel with a dashboard slot (the rest are logged, not shown)
+        self.display_channels = [i for i, c in enumerate(CHANNELS) if c.slot]
         self.frame_sensors.columnconfigure((0, 1), weight=1)
-        self.frame_sensors.rowconfigure((0, 1), weight=1)
-        self.sensor_labels = {}
-        self.avg_labels = {}
+        self.frame_sensors.rowconfigure(tuple(range((len(self.display_channels) + 1) // 2)), weight=1)
+        self.sensor_labels = []
+        self.avg_labels = []
         self.create_sensor_display()
 
-        # Data storage
-        self.sensor_data = {
-            "Temperature": deque(maxlen=20),
-            "RPM": deque(maxlen=20),
-            "Load Cell 1": deque(maxlen=20),
-            "Load Cell 2": deque(maxlen=20),
-            'grams_per_min': deque(maxlen=20),
-            'liters_per_min': deque(maxlen=20)
-        }
-        self.avg_data = {
-            "Temperature": deque(maxlen=20),
-            "RPM": deque(maxlen=20),
-            "Load Cell 1": deque(maxlen=20),
-            "Load Cell 2": deque(maxlen=20),
-            "grams_per_min": deque(maxlen=20),
-            "liters_per_min": deque(maxlen=20)
-        }
+        # Data storage: ring of sample records, rows by time, columns by channel position
+        self.history_len = 20
+        self.sensor_data = np.full((self.history_len, N_CHANNELS), np.nan)
+        self.sensor_count = 0
 
         self.moving_avg_window = 5
         self.wait_time_after_choke = 5
         self.after_delay = 1000  # ms
         self.waiting_for_readings = 0
-        self._excel_buffer = []
-
-        self.root.after(0, self.poll_sensors)
+        self.run_log = RunLog()
+        self.export = None  # BackgroundExport while the run is saved on close
+
+        # Sensors are read on their own thread, where the interlocks check every sample
+        self.interlocks = InterlockEngine(actions=INTERLOCK_ACTIONS)
+        self.acquisition = Acquisition(read_sensors, self.after_delay / 1000, realtime=REALTIME_ACQUISITION)
+        self.acquisition.add_hook(self.interlocks.check)
+        self.adaptive = AdaptiveRate(self.acquisition, ADAPTIVE_THRESHOLDS, base_period=self.after_delay / 1000,
+                                     on_period=RATE_TUNING.apply if RATE_TUNING is not None else None)
+        self.acquisition.add_hook(self.adaptive.check)
+        self.interlocks.actions.append(lambda: self.adaptive.event("interlock"))
+        self.capture = None
+        if CAPTURE is not None:
+            self.capture = TriggerCapture(self.acquisition, **CAPTURE)
+            self.interlocks.actions.append(lambda: self.capture.trigger("interlock"))
+        self.steps = StepResponseMonitor(self.acquisition, setpoint=int(self.throttle_var.get()),
+                                         on_result=lambda row: print(describe(row)))
+        self.acquisition.start()
+
+        self.scheduler = TkScheduler(self.root)
+        self.scheduler.add('poll', self.after_delay / 1000, self.poll_sensors, policy=SKIP)
 
         root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def poll_sensors(self):
+        if self.interlocks.tripped and self.sensor_active:
+            self.sensor_active = False
+            self.cut_restart_button.config(text="Restart")
+            self.status_label.config(text=f"INTERLOCK TRIP: {self.interlocks.trip_reason}")
+
+        samples = self.acquisition.drain()
         if self.choke_state.get():
             if self.waiting_for_readings > 0:
                 self.waiting_for_readings -= 1
                 self.status_label.config(
                     text=f"Waiting for {self.waiting_for_readings} cycles before resuming...")
-            else:
-                values = read_sensors()
-                if not values or any(v is None for v in values.values()):
+            elif samples:
+                if any(np.isnan(values[:N_BASE]).any() for _, values in samples):
                     self.status_label.config(
                         text="Sensor missing, skipping cycle...")
                     self.waiting_for_readings = self.wait_time_after_choke
                 else:
-                    excel_values = values.copy()
-                    excel_values['Throttle'] = int(self.throttle_var.get())
-                    self._excel_buffer.append(excel_values)
-                    self._update_values(values)
+                    for timestamp, values in samples:
+                        new_segment = self.run_log.append(
+                            timestamp, int(self.throttle_var.get()), values,
+                            choke=self.choke_state.get(), active=self.sensor_active)
+                        if new_segment:
+                            self.clear_data()
+                        self._update_values(values)
                     self.status_label.config(text="")
 
-        self.root.after(self.after_delay, self.poll_sensors)
-
     def _update_values(self, sensor_values):
-        for key, value in sensor_values.items():
-            self.sensor_labels[key].config(text=f"{value: 0.3f}")
-            self.sensor_data[key].append(value)
+        self.sensor_data[self.sensor_count % self.history_len] = sensor_values
+        self.sensor_count += 1
+        window = min(self.moving_avg_window, self.sensor_count)
+        rows = np.arange(self.sensor_count - window, self.sensor_count) % self.history_len
+        averages = self.sensor_data[rows].mean(axis=0)
 
-            avg_value = np.mean(
-                list(self.sensor_data[key])[-self.moving_avg_window:])
-            self.avg_data[key].append(avg_value)
-            self.avg_labels[key].config(text=f"Avg: {avg_value:.3f}")
+        for tile, index in enumerate(self.display_channels):
+            self.sensor_labels[tile].config(text=f"{sensor_values[index]: 0.3f}")
+            self.avg_labels[tile].config(text=f"Avg: {averages[index]:.3f}")
 
     def increment_throttle(self):
         new_value = min(120, self.throttle_var.get() + 1)
@@ -193,12 +241,10 @@ class SensorGUI:
         self.on_throttle_change()
 
     def create_sensor_display(self):
-        sensors = ["Temperature", "RPM", "Load Cell 1",
-                   "Load Cell 2", "grams_per_min", "liters_per_min"]
-        for idx, sensor in enumerate(sensors):
+        for idx, index in enumerate(self.display_channels):
             row, col = divmod(idx, 2)
 
-            container = ttk.LabelFrame(self.frame_sensors, text=sensor)
+            container = ttk.LabelFrame(self.frame_sensors, text=CHANNELS[index].name)
             container.grid(row=row, column=col, padx=10,
                            pady=10, sticky="nsew")
             container.grid_propagate(False)
@@ -214,43 +260,49 @@ class SensorGUI:
                 "Arial", 18), foreground="gray")
             avg_label.pack(anchor="center")
 
-            self.sensor_labels[sensor] = label
-            self.avg_labels[sensor] = avg_label
+            self.sensor_labels.append(label)
+            self.avg_labels.append(avg_label)
 
     def toggle_choke(self):
         self.choke_state.set(not self.choke_state.get())
+        self._control_event("choke")
         if self.choke_state.get():
             self.choke_button.config(text="Choke: Open")
             self.waiting_for_readings = self.wait_time_after_choke
         else:
             self.choke_button.config(text="Choke: Closed")
-            self.clear_data()
-            self.status_label.config(text="Choke Closed: Data Cleared")
+            self.status_label.config(text="Choke Closed")
 
     def toggle_cut_restart(self):
+        self._control_event("restart" if not self.sensor_active else "cut")
         if self.sensor_active:
             self.sensor_active = False
             #restart_throttle()
-            self.clear_data()
             self.cut_restart_button.config(text="Restart")
         else:
             self.sensor_active = True
+            self.interlocks.reset()
             #cut_throttle()
             self.cut_restart_button.config(text="Cut")
 
     def clear_data(self):
-        for key in self.sensor_data:
-            self.sensor_data[key].clear()
-            self.avg_data[key].clear()
-            self.sensor_labels[key].config(text="0")
-            self.avg_labels[key].config(text="Avg: 0")
+        self.sensor_data.fill(np.nan)
+        self.sensor_count = 0
+        for tile in range(len(self.display_channels)):
+            self.sensor_labels[tile].config(text="0")
+            self.avg_labels[tile].config(text="Avg: 0")
 
     def on_throttle_change(self, event=None):
         throttle_value = int(self.throttle_var.get())
         self.throttle_label.config(text=f"Throttle: {throttle_value}°")
         self.update_servo_angle(throttle_value)
+        self._control_event("throttle")
+        self.steps.setpoint(throttle_value)
 
-        self.clear_data()
+    def _control_event(self, name):
+        self.adaptive.event(name)
+        if self.capture is not None:
+            self.capture.trigger(name)
 
     def update_servo_angle(self, angle=None):
         if angle is None:
@@ -259,18 +311,52 @@ class SensorGUI:
         #set_servo_angle(18, angle)
 
     def on_close(self):
-        if self._excel_buffer:
-            df = pd.DataFrame(self._excel_buffer)
-            with pd.ExcelWriter("sensor_readings.xlsx", engine="openpyxl") as writer:
-                df.to_excel(writer, index=False, sheet_name="Readings")
-            print(f"Saved {len(df)} readings to sensor_readings.xlsx")
-
+        if self.export is not None:
+            return  # already saving
+        self.scheduler.stop()
+        self.acquisition.stop()
+        if self.capture is not None:
+            self.capture.stop()
+            print(f"{len(self.capture.captures)} transient captures in {self.capture.directory}")
+        self.steps.stop()
+        if not len(self.run_log):
+            self._quit()
+            return
+        # Saved on a worker thread; the window stays responsive and closes when the file is written
+        extra_tables = {'Step Response': self.steps.table()} if self.steps.results else {}
+        self.export = BackgroundExport(self.run_log, run_path(fmt='xlsx'), 'xlsx', extra_tables,
+                                       compress=COMPRESS_LOG).start()
+        self.status_label.config(text="Saving run...")
+        self.root.after(100, self._poll_export)
+
+    def _poll_export(self):
+        export = self.export
+        if not export.done.is_set():
+            self.status_label.config(text=f"Saving run... {export.fraction:.0%}")
+            self.root.after(100, self._poll_export)
+            return
+        if export.error is not None:
+            print(f"Failed to save data to {export.path}: {export.error}")
+        else:
+            try:
+                RunCatalog().add_chunks(export.path, export.chunks, compressed=COMPRESS_LOG is not None)
+            except Exception as e:
+                print(f"Run saved but not cataloged: {e}")
+            print(f"Saved {export.total_rows} readings to {export.path}")
+        self._quit()
+
+    def _quit(self):
         self.root.quit()
         self.root.destroy()
 
 # Run Application
 if __name__ == "__main__":
-    root = tb.Window(themename="superhero")
+    splash.destroy()
     app = SensorGUI(root)
+    root.update_idletasks()
+    PROFILER.record("startup:dashboard", time.perf_counter_ns() - _LAUNCH_NS)
+    for stage, stats in PROFILER.snapshot().items():
+        if stage.startswith(("startup:", "import:")):
+            print(f"{stage:<22}{stats['max_ms']:>9.1f} ms")
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
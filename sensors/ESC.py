@@ -1,53 +1,75 @@
 import time
-import pigpio  # For precise PWM control
-import sys
-import subprocess
-
-# Start the pigpio daemon
-subprocess.run(["sudo", "systemctl", "start", "pigpiod"])
+from sensors.pigpio_link import shared_link
 
 # Define ESC pin (Change this if needed)
 ESC_PIN = 12  # GPIO pin connected to ESC signal wire
 
-# Initialize pigpio
-pi = pigpio.pi()
-if not pi.connected:
-    print("Failed to connect to pigpio daemon.")
-    sys.exit(1)
-
-# Variables
-THROTTLE_CUT = True  # Flag to indicate if throttle is cut
-
-# Function to set throttle percentage (0 to 100)
-def set_throttle(throttle_percent):
-    pulse_width = int((throttle_percent / 100) * 1000) + 1000  # Map to 1000–2000 µs
-    pi.set_servo_pulsewidth(ESC_PIN, pulse_width)
-    #print_with_timestamp(f"Throttle set to {throttle_percent}%")
-
 # Function to print messages with timestamps
 def print_with_timestamp(message):
     timestamp = int(time.time() * 1000)
     print(f"[{timestamp} ms] {message}")
 
-# Setup ESC
-#print_with_timestamp("Initializing ESC...")
-set_throttle(0)  # Start at 0% throttle
-time.sleep(2)  # Allow ESC to initialize
+
+class ESC:
+    """One ESC on a PWM pin; starts cut (0%) after arming."""
+
+    def __init__(self, pin=ESC_PIN, link=None):
+        self.pin = pin
+        self.link = link if link is not None else shared_link()
+        self.throttle_cut = True  # Flag to indicate if throttle is cut
+
+    def arm(self):
+        """Send 0% and give the ESC time to initialize."""
+        #print_with_timestamp("Initializing ESC...")
+        self.set_throttle(0)  # Start at 0% throttle
+        time.sleep(2)  # Allow ESC to initialize
+        return self
+
+    # Function to set throttle percentage (0 to 100)
+    def set_throttle(self, throttle_percent):
+        pulse_width = int((throttle_percent / 100) * 1000) + 1000  # Map to 1000–2000 µs
+        self.link.servo(self.pin, pulse_width)  # waits: cut/restart must not be queued
+        #print_with_timestamp(f"Throttle set to {throttle_percent}%")
+
+    def cut_throttle(self):
+        """Cut the throttle (set to 0)."""
+        self.set_throttle(0)
+        self.throttle_cut = True
+        #print_with_timestamp("Throttle cut to 0%!")
+
+    def restart_throttle(self):
+        """Restart the throttle (set to 100)."""
+        if self.throttle_cut:
+            self.set_throttle(100)
+            self.throttle_cut = False
+            #print_with_timestamp("Throttle restarted to 100%!")
+        #else:
+            #print_with_timestamp("Throttle is already running. No action taken.")
+
+
+# Default ESC for single-rig use, armed by arm_esc() at startup
+_default = None
+
+def arm_esc(pin=ESC_PIN):
+    """Connect, arm the default ESC and wait for it to initialize (call once at startup)."""
+    global _default
+    _default = ESC(pin).arm()
+    return _default
+
+def _esc():
+    # Never connect or arm here: cut_throttle() runs on the interlock path
+    if _default is None:
+        raise RuntimeError("ESC not armed; call sensors.ESC.arm_esc() at startup")
+    return _default
 
 # Now we are not taking user input here, it's controlled by the GUI
+def set_throttle(throttle_percent):
+    _esc().set_throttle(throttle_percent)
+
 def cut_throttle():
     """Cut the throttle (set to 0)."""
-    set_throttle(0)
-    global THROTTLE_CUT
-    THROTTLE_CUT = True
-    #print_with_timestamp("Throttle cut to 0%!")
+    _esc().cut_throttle()
 
 def restart_throttle():
     """Restart the throttle (set to 100)."""
-    global THROTTLE_CUT
-    if THROTTLE_CUT:
-        set_throttle(100)
-        THROTTLE_CUT = False
-        #print_with_timestamp("Throttle restarted to 100%!")
-    #else:
-        #print_with_timestamp("Throttle is already running. No action taken.")
+    _esc().restart_throttle()
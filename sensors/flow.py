@@ -1,107 +1,108 @@
 import time
+import numpy as np
 import RPi.GPIO as GPIO
 from hx711 import HX711
+from daq.filters import Ema, OutlierReject
 
-# Configuration
+# Configuration (defaults for FlowSensor)
 EMA_ALPHA = 0.2
-OUTLIER_MIN = 15            # grams
-OUTLIER_REL = 0.15          # 15%
+STABLE_BAND = 5             # grams; the stable weight follows the filtered one only within this
 DENSITY = 871               # g/L
 INTERVAL = 1                # seconds
 READINGS = 5                # samples per read
+DOUT_PIN = 21
+PD_SCK_PIN = 20
+SCALE_RATIO = 40
 
-# Internal state
-_filtered_weight = None
-_stable_weight = None
-_interval_start_time = None
-_interval_start_weight = None
-
-# Initialize GPIO and scale once
-GPIO.setmode(GPIO.BCM)
-hx = HX711(dout_pin=21, pd_sck_pin=20)
-hx.zero()
-hx.set_scale_ratio(40)
-
-# Helpers
-def _filter_reading(new):
-    global _filtered_weight
-    _filtered_weight = new if _filtered_weight is None else EMA_ALPHA * new + (1 - EMA_ALPHA) * _filtered_weight
-    return _filtered_weight
-
-def _is_outlier(new):
-    global _stable_weight
-    if _stable_weight is None:
-        return False
-    change = abs(new - _stable_weight)
-    threshold = max(OUTLIER_MIN, OUTLIER_REL * abs(_stable_weight))
-    return change >= threshold
 
-# Public API for GUI
-def read_flow():
-    """
-    Perform one weight-reading cycle and return a dict with:
-      - raw_weight
-      - current_weight (EMA-filtered)
-      - stable_weight
-      - grams_per_min
-      - liters_per_min
-    """
-    global _stable_weight, _interval_start_time, _interval_start_weight
-
-    raw = hx.get_weight_mean(readings=READINGS)
-    if raw is False:
-        return {
-            'raw_weight': None,
-            'current_weight': None,
-            'stable_weight': _stable_weight,
-            'grams_per_min': 'No Raw Data',
-            'liters_per_min': 'No Raw Data'
-        }
+class FlowSensor:
+    """Fuel-tank scale on one HX711; flow is the weight lost per interval."""
+
+    def __init__(self, dout_pin=DOUT_PIN, pd_sck_pin=PD_SCK_PIN, scale_ratio=SCALE_RATIO,
+                 readings=READINGS, density=DENSITY, interval=INTERVAL, ema_alpha=EMA_ALPHA):
+        self.readings = readings
+        self.density = density
+        self.interval = interval
+        self.ema_alpha = ema_alpha
+
+        # Internal state
+        self._ema = Ema(1, alpha=ema_alpha)
+        self._stable = OutlierReject(1, min_abs=STABLE_BAND, rel=0.0)
+        self._stable_weight = None
+        self._interval_start_time = None
+        self._interval_start_weight = None
+
+        # Initialize GPIO and scale once
+        GPIO.setmode(GPIO.BCM)
+        self.hx = HX711(dout_pin=dout_pin, pd_sck_pin=pd_sck_pin)
+        self.hx.zero()
+        self.hx.set_scale_ratio(scale_ratio)
+
+    def read(self):
+        """
+        Perform one weight-reading cycle and return a dict with:
+          - raw_weight
+          - current_weight (EMA-filtered)
+          - stable_weight
+          - grams_per_min
+          - liters_per_min
+        """
+        raw = self.hx.get_weight_mean(readings=self.readings)
+        if raw is False:
+            return {
+                'raw_weight': None,
+                'current_weight': None,
+                'stable_weight': self._stable_weight,
+                'grams_per_min': 'No Raw Data',
+                'liters_per_min': 'No Raw Data'
+            }
+
+        w = float(self._ema.step(np.array([raw]))[0])
+
+        # update stable weight
+        self._stable_weight = float(self._stable.step(np.array([w]))[0])
 
-    w = _filter_reading(raw)
- 
-    '''
-    if _is_outlier(w):
-        # Ignore outlier, keep last stable values
-        return {
+        # init interval
+        if self._interval_start_time is None:
+            self._interval_start_time = time.time()
+            self._interval_start_weight = w
+
+        data = {
             'raw_weight': raw,
             'current_weight': w,
-            'stable_weight': _stable_weight,
-            'grams_per_min': 'Is Outlier',
-            'liters_per_min': 'Is Outlier'
+            'stable_weight': self._stable_weight,
+            'grams_per_min': 0,
+            'liters_per_min': 0
         }
-    '''
-    
-    # update stable weight
-    if _stable_weight is None or abs(w - _stable_weight) < 5:
-        _stable_weight = w
-
-    # init interval
-    if _interval_start_time is None:
-        _interval_start_time = time.time()
-        _interval_start_weight = w
-
-    data = {
-        'raw_weight': raw,
-        'current_weight': w,
-        'stable_weight': _stable_weight,
-        'grams_per_min': 0,
-        'liters_per_min': 0
-    }
-
-    # interval check
-    if time.time() - _interval_start_time >= INTERVAL:
-        delta = _interval_start_weight - w  # positive = fuel leaving
-        gpm = max(0, delta * (60 / INTERVAL))  # clamp to zero
-        #gpm = delta * (60 / INTERVAL)  # clamp to zero
-        lpm = gpm / DENSITY
-        data['grams_per_min'] = round(gpm, 2)
-        data['liters_per_min'] = round(lpm, 4)
-        # reset interval
-        _interval_start_time = time.time()
-        _interval_start_weight = w
-
-    return data
+
+        # interval check
+        if time.time() - self._interval_start_time >= self.interval:
+            delta = self._interval_start_weight - w  # positive = fuel leaving
+            gpm = max(0, delta * (60 / self.interval))  # clamp to zero
+            lpm = gpm / self.density
+            data['grams_per_min'] = round(gpm, 2)
+            data['liters_per_min'] = round(lpm, 4)
+            # reset interval
+            self._interval_start_time = time.time()
+            self._interval_start_weight = w
+
+        return data
+
+
+# Default instance for single-rig use, created on first read
+_default = None
+
+def default_sensor():
+    """The flow sensor wired per the CONFIG above."""
+    global _default
+    if _default is None:
+        _default = FlowSensor()
+    return _default
+
+# Public API for GUI
+def read_flow():
+    """Read the default flow sensor (pins and calibration from the CONFIG above)."""
+    return default_sensor().read()
 
 
 # Standalone test runner
@@ -1,81 +1,149 @@
 import time
+import warnings
+import threading
+import numpy as np
 import RPi.GPIO as GPIO
 from hx711 import HX711
+from daq.filters import Ema, OutlierReject
 
-# GPIO setup
-GPIO.setmode(GPIO.BCM)
+# Default wiring: (dout_pin, pd_sck_pin, calibration factor) per load cell
+LOAD_CELLS = [
+    (5, 6, 42.0),
+    (13, 19, 42.0),
+]
 
-# Initialize HX711 for one load cell
-hx1 = HX711(dout_pin=5, pd_sck_pin=6)
-hx2 = HX711(dout_pin=13, pd_sck_pin=19)
+# Filtering parameters
+EMA_ALPHA = 0.2   # Exponential Moving Average smoothing factor
+STABLE_BAND = 5   # the stable weight follows the filtered one only while it moves less than this
+READINGS = 5      # HX711 conversions averaged per read
+STREAM_LEN = 4096 # single conversions kept per cell while streaming (~100 s at 40 SPS each)
+ERROR_BACKOFF = 0.05  # s the stream waits after a row where every cell failed
 
-hx1.zero()
-hx2.zero()
 
-# Calibration factor (adjust based on calibration)
-calibration_factor_1 = 42.0
-calibration_factor_2 = 42.0
-hx1.set_scale_ratio(calibration_factor_1)
-hx2.set_scale_ratio(calibration_factor_2)
+class LoadCell:
+    """One HX711 load cell."""
 
-# Filtering parameters
-EMA_ALPHA = 0.2  # Exponential Moving Average smoothing factor
+    def __init__(self, dout_pin, pd_sck_pin, calibration_factor, readings=READINGS):
+        self.readings = readings
+
+        GPIO.setmode(GPIO.BCM)
+        self.hx = HX711(dout_pin=dout_pin, pd_sck_pin=pd_sck_pin)
+        self.hx.zero()
+        self.hx.set_scale_ratio(calibration_factor)
+
+    def read(self):
+        """Averaged weight, or NaN if the HX711 gave no data."""
+        raw = self.hx.get_weight_mean(readings=self.readings)
+        return np.nan if raw is False else raw
+
+
+class LoadCells:
+    """
+    The thrust/torque load cells of one rig, reported as 'Load Cell N (...)' keys.
+    All cells are filtered together as one vector (EMA, then the stable hold).
+    """
+
+    def __init__(self, cells=LOAD_CELLS, readings=READINGS):
+        self.cells = [LoadCell(dout, sck, factor, readings) for dout, sck, factor in cells]
+        self.ema = Ema(len(self.cells), alpha=EMA_ALPHA)
+        self.stable = OutlierReject(len(self.cells), min_abs=STABLE_BAND, rel=0.0)
+        self.stream = None  # LoadCellStream while one runs
+        self._cursor = 0
+
+    def _read_raw(self):
+        if self.stream is None:
+            return np.array([cell.read() for cell in self.cells])
+        # The stream owns the chips; average its conversions since the last read
+        _, values, self._cursor = self.stream.since(self._cursor)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # no new conversions yet
+            return np.nanmean(values, axis=0) if len(values) else np.full(len(self.cells), np.nan)
+
+    def read(self):
+        raw = self._read_raw()
+        filtered = self.ema.step(raw)
+        stable = self.stable.step(filtered)
+        # A cell that gave no data reports zeros, as before
+        raw, filtered, stable = (np.nan_to_num(v) for v in (raw, filtered, stable))
+        data = {}
+        for n in range(len(self.cells)):
+            data[f"Load Cell {n + 1} (Raw)"] = round(float(raw[n]), 2)
+            data[f"Load Cell {n + 1} (Filtered)"] = round(float(filtered[n]), 2)
+            data[f"Load Cell {n + 1} (Stable)"] = round(float(stable[n]), 2)
+        return data
+
+
+class LoadCellStream:
+    """
+    Reads single conversions from every cell back to back on a background
+    thread (80 SPS per HX711 with its RATE pin high) into a preallocated
+    ring, for vibration analysis (daq.spectrum). A read that fails or raises
+    is counted in error_count and stored as NaN. While it runs,
+    LoadCells.read() averages the conversions since its previous call
+    instead of reading the chips itself.
+    """
+
+    def __init__(self, load_cells, length=STREAM_LEN):
+        self.load_cells = load_cells
+        self.times = np.full(length, np.nan)
+        self.values = np.full((length, len(load_cells.cells)), np.nan)
+        self.count = 0  # conversions written; the ring slot is count % length
+        self.error_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="hx711-stream", daemon=True)
+
+    def start(self):
+        self.load_cells._cursor = self.count
+        self.load_cells.stream = self
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.load_cells.stream = None
+
+    def _run(self):
+        cells = self.load_cells.cells
+        while not self._stop.is_set():
+            row = []
+            for cell in cells:
+                try:
+                    row.append(cell.hx.get_weight_mean(readings=1))
+                except Exception:
+                    row.append(False)   # counted and stored as NaN like a failed conversion
+            if all(value is False for value in row):
+                self._stop.wait(ERROR_BACKOFF)   # chips not answering; don't spin on them
+            i = self.count % len(self.times)
+            for c, value in enumerate(row):
+                if value is False:
+                    self.error_count += 1
+                    value = np.nan
+                self.values[i, c] = value
+            self.times[i] = time.monotonic()
+            self.count += 1
 
-# Filtered and stable weights
-filtered_weight_1 = None
-stable_weight_1 = None
+    def since(self, cursor):
+        """(times, values (rows, cells)) written after `cursor`, and the new cursor."""
+        end = self.count
+        # Leave a margin so the writer can't lap the rows being copied
+        start = max(cursor, end - len(self.times) + 64)
+        idx = np.arange(start, end) % len(self.times)
+        return self.times[idx], self.values[idx], end
 
-filtered_weight_2 = None
-stable_weight_2 = None
 
-def filter_reading(new_weight, filtered):
-    """Apply Exponential Moving Average (EMA) filter."""
-    if filtered is None:
-        return new_weight
-    return EMA_ALPHA * new_weight + (1 - EMA_ALPHA) * filtered
+# Default instance for single-rig use, created on first read
+_default = None
 
-def is_outlier(new_weight, stable):
-    """Detect outliers in both directions (spikes up or down)."""
-    if stable is None:
-        return False
-    change = abs(new_weight - stable)
-    threshold = max(15, 0.15 * abs(stable))
-    return change >= threshold
+def default_sensor():
+    """The load cells wired per LOAD_CELLS."""
+    global _default
+    if _default is None:
+        _default = LoadCells()
+    return _default
 
 def read_load_cells():
-    global filtered_weight_1, stable_weight_1, filtered_weight_2, stable_weight_2
-
-    # --- Load Cell 1 ---
-    raw1 = hx1.get_weight_mean(readings=5)
-    if raw1 is not False:
-        filtered_weight_1 = filter_reading(raw1, filtered_weight_1)
-        if not is_outlier(filtered_weight_1, stable_weight_1):
-            if stable_weight_1 is None or abs(filtered_weight_1 - stable_weight_1) < 5:
-                stable_weight_1 = filtered_weight_1
-    else:
-        raw1, filtered_weight_1, stable_weight_1 = 0.0, 0.0, 0.0
-
-    # --- Load Cell 2 ---
-    raw2 = hx2.get_weight_mean(readings=5)
-    if raw2 is not False:
-        filtered_weight_2 = filter_reading(raw2, filtered_weight_2)
-        if not is_outlier(filtered_weight_2, stable_weight_2):
-            if stable_weight_2 is None or abs(filtered_weight_2 - stable_weight_2) < 5:
-                stable_weight_2 = filtered_weight_2
-    else:
-        raw2, filtered_weight_2, stable_weight_2 = 0.0, 0.0, 0.0
-
-    return {
-        # Load Cell 1
-        "Load Cell 1 (Raw)": round(raw1, 2),
-        "Load Cell 1 (Filtered)": round(filtered_weight_1, 2) if filtered_weight_1 else 0.0,
-        "Load Cell 1 (Stable)": round(stable_weight_1, 2) if stable_weight_1 else 0.0,
-        
-        # Load Cell 2
-        "Load Cell 2 (Raw)": round(raw2, 2),
-        "Load Cell 2 (Filtered)": round(filtered_weight_2, 2) if filtered_weight_2 else 0.0,
-        "Load Cell 2 (Stable)": round(stable_weight_2, 2) if stable_weight_2 else 0.0,
-    }
+    return default_sensor().read()
 
 # Example usage loop
 if __name__ == "__main__":
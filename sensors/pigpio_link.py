@@ -0,0 +1,212 @@
+import time
+import struct
+import threading
+import subprocess
+import pigpio  # For precise PWM control and edge timing
+from daq.profiler import PROFILER, Histogram
+
+# CONFIG
+HOST = None             # pigpiod host (None: PIGPIO_ADDR or localhost)
+PORT = None             # pigpiod port (None: PIGPIO_PORT or 8888)
+START_DAEMON = ["sudo", "systemctl", "start", "pigpiod"]
+CONNECT_TRIES = 5
+RETRY_DELAY = 0.25      # s before the second attempt, doubled after each failure
+SAFETY_TIMEOUT = 0.2    # s a servo(wait=True) waits for the link before raising
+
+# What a dead daemon or dropped socket looks like to the pigpio library
+_LINK_ERRORS = (OSError, struct.error)
+
+
+class PigpioLink:
+    """
+    The one pigpiod connection shared by the ESC, servo and tach modules.
+
+    The daemon is started once, and every command goes over one socket,
+    serialized by a lock. If the daemon goes away, the next command
+    reconnects and then restores the servo pulse widths and edge callbacks.
+    Every command's round-trip time is recorded in `rtt` and as the
+    profiler span "pigpio_rtt".
+
+    servo(..., wait=False) returns at once. Only the newest width per pin is
+    kept, and a sender thread writes all pending widths in one batch. A
+    slider drag or governor loop therefore never waits on the socket or
+    sends stale positions. Safety actions use wait=True, which also discards
+    any queued width for that pin and fails fast (one connect attempt, at
+    most SAFETY_TIMEOUT waiting for the link) instead of blocking on a
+    reconnect.
+    """
+
+    def __init__(self, host=HOST, port=PORT):
+        self._address = {k: v for k, v in (('host', host), ('port', port)) if v is not None}
+        self.pi = None
+        self.rtt = Histogram()      # command round trips (ns); written under the lock
+        self.reconnects = 0
+        self._lock = threading.RLock()
+        self._connect_lock = threading.Lock()   # one (re)connect at a time, outside the command lock
+        self._daemon_started = False
+        self._widths = {}           # last commanded pulse width per pin, restored on reconnect
+        self._setups = []           # setup(pi) for callbacks, rerun on reconnect
+        self._pending = {}          # pin -> pulse width queued by servo(wait=False)
+        self._queued = threading.Condition()
+        self._sender = None
+
+    def connect(self, tries=CONNECT_TRIES):
+        """
+        The live connection, (re)connecting first if needed. The retries run
+        outside the command lock; tries=1 is the fail-fast form used on the
+        safety path (one attempt, no daemon start, no waiting on a reconnect
+        already in progress).
+        """
+        pi = self.pi
+        if pi is not None and pi.connected:
+            return pi
+        if not self._connect_lock.acquire(blocking=tries > 1):
+            raise ConnectionError("pigpio daemon unreachable (reconnect in progress).")
+        try:
+            if self.pi is not None and self.pi.connected:
+                return self.pi   # another thread reconnected meanwhile
+            if not self._daemon_started and tries > 1:
+                subprocess.run(START_DAEMON)
+                self._daemon_started = True
+            delay = RETRY_DELAY
+            for attempt in range(tries):
+                pi = pigpio.pi(**self._address)
+                if pi.connected:
+                    break
+                if attempt + 1 < tries:
+                    time.sleep(delay)
+                    delay *= 2
+            else:
+                raise ConnectionError("Failed to connect to pigpio daemon.")
+            with self._lock:
+                if self.pi is not None:
+                    self.reconnects += 1
+                    print(f"Reconnected to pigpio daemon (reconnect {self.reconnects})")
+                self.pi = pi
+                for pin, width in self._widths.items():
+                    pi.set_servo_pulsewidth(pin, width)
+                for setup in self._setups:
+                    setup(pi)
+            return pi
+        finally:
+            self._connect_lock.release()
+
+    def _drop(self, pi):
+        # Close the dead handle (socket and callback thread); the next connect() opens a new one
+        pi.connected = False
+        try:
+            pi.stop()
+        except Exception:
+            pass
+
+    def call(self, name, *args, tries=CONNECT_TRIES):
+        """Run one pigpio command (e.g. call('read', 17)), reconnecting once if the link dropped."""
+        for attempt in range(2):
+            pi = self.connect(tries)
+            with self._lock:
+                start = time.perf_counter_ns()
+                try:
+                    result = getattr(pi, name)(*args)
+                except _LINK_ERRORS:
+                    self._drop(pi)
+                    if attempt:
+                        raise
+                    continue
+                rtt_ns = time.perf_counter_ns() - start
+                self.rtt.add(rtt_ns)
+                PROFILER.record("pigpio_rtt", rtt_ns)
+                return result
+
+    def servo(self, pin, width, wait=True):
+        """Set a servo/ESC pulse width (µs; 0 = off)."""
+        if wait:
+            # Safety path: fail within SAFETY_TIMEOUT rather than wait behind a reconnect or a busy link
+            self.connect(1 if self.pi is not None else CONNECT_TRIES)   # first use may start the daemon
+            if not self._lock.acquire(timeout=SAFETY_TIMEOUT):
+                raise TimeoutError(f"pigpio link busy; servo {pin} not set")
+            try:
+                with self._queued:
+                    self._pending.pop(pin, None)
+                self.call('set_servo_pulsewidth', pin, width, tries=1)
+                self._widths[pin] = width
+            finally:
+                self._lock.release()
+            return
+        with self._queued:
+            self._pending[pin] = width
+            self._queued.notify()
+        if self._sender is None:
+            self._sender = threading.Thread(target=self._send_loop, name="pigpio-sender", daemon=True)
+            self._sender.start()
+
+    def _send_loop(self):
+        while True:
+            with self._queued:
+                while not self._pending:
+                    self._queued.wait()
+            try:
+                self.connect()   # any reconnect happens here, outside the command lock
+            except ConnectionError as e:
+                print(f"pigpio: servo updates held: {e}")
+                time.sleep(RETRY_DELAY)
+                continue
+            # Take the batch under the command lock, so a servo(wait=True) can't be overtaken
+            with self._lock:
+                with self._queued:
+                    batch, self._pending = self._pending, {}
+                for pin, width in batch.items():
+                    try:
+                        self.call('set_servo_pulsewidth', pin, width, tries=1)
+                        self._widths[pin] = width
+                    except Exception as e:
+                        print(f"pigpio: servo {pin} update failed: {e}")
+
+    def callback(self, pin, edge, func, pull=pigpio.PUD_OFF, glitch_us=0):
+        """Edge callback func(gpio, level, tick) on this connection; re-registered after a reconnect."""
+        def setup(pi):
+            pi.set_mode(pin, pigpio.INPUT)
+            pi.set_pull_up_down(pin, pull)
+            if glitch_us:
+                pi.set_glitch_filter(pin, glitch_us)
+            pi.callback(pin, edge, func)
+
+        with self._lock:
+            self._setups.append(setup)
+            connected = self.pi is not None and self.pi.connected
+            if connected:
+                setup(self.pi)
+        if not connected:
+            self.connect()  # a new connection runs every setup, including this one
+
+    def stats(self):
+        """Command count, round-trip percentiles (ms) and reconnects."""
+        return {
+            'commands': self.rtt.count,
+            'rtt_p50_ms': self.rtt.percentile(0.5) / 1e6,
+            'rtt_p99_ms': self.rtt.percentile(0.99) / 1e6,
+            'rtt_max_ms': self.rtt.max_ns / 1e6,
+            'reconnects': self.reconnects,
+        }
+
+
+# The link every module uses unless given another, opened on first use
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_link():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PigpioLink()
+    return _shared
+
+
+# Round-trip check on the rig: python -m sensors.pigpio_link [count]
+if __name__ == '__main__':
+    import sys
+    link = shared_link()
+    for _ in range(int(sys.argv[1]) if len(sys.argv) > 1 else 1000):
+        link.call('get_current_tick')
+    stats = link.stats()
+    print(f"{stats['commands']} commands: rtt p50 {stats['rtt_p50_ms']:.3f} ms, "
+          f"p99 {stats['rtt_p99_ms']:.3f} ms, max {stats['rtt_max_ms']:.3f} ms")
@@ -1,27 +1,80 @@
-from gpiozero import Button
 import time
+import pigpio
+from sensors.pigpio_link import shared_link
 
 # CONFIG
 TACH_PIN = 17       # GPIO pin number
 PPR = 1             # Pulses per revolution
+DURATION = 1        # seconds counted per read_rpm()
+STALL_TIMEOUT = 0.5 # seconds without a pulse before instant RPM reads 0
+GLITCH_US = 100     # edges shorter than this (µs) are ignored by pigpiod
 
-# Setup
-hall = Button(TACH_PIN)
-pulse_count = 0
 
-def count_pulse():
-    global pulse_count
-    pulse_count += 1
-
-hall.when_pressed = count_pulse
-
-def read_rpm(duration=1):
+class Tachometer:
     """
-    Measure RPM over a given duration (seconds).
-    Returns a dict: {"rpm": value, "pulses": value}
+    Hall-effect tach on one GPIO pin (pulled up, pulse pulls it low), counted
+    by a pigpio edge callback on the shared connection. Pulse periods come
+    from pigpiod's microsecond edge ticks, not from when Python got to run.
     """
-    global pulse_count
-    pulse_count = 0
-    time.sleep(duration)
-    rpm = (pulse_count / PPR) * (60 / duration)
-    return {"rpm": round(rpm, 2), "pulses": pulse_count}
+
+    def __init__(self, pin=TACH_PIN, ppr=PPR, duration=DURATION, link=None):
+        self.ppr = ppr
+        self.duration = duration
+        self.pulse_count = 0
+        self._last_pulse_time = None
+        self._last_tick = None
+        self._pulse_period = None
+        self.link = link if link is not None else shared_link()
+        self.link.callback(pin, pigpio.FALLING_EDGE, self._count_pulse,
+                           pull=pigpio.PUD_UP, glitch_us=GLITCH_US)
+
+    def _count_pulse(self, gpio, level, tick):
+        self.pulse_count += 1
+        if self._last_tick is not None:
+            self._pulse_period = pigpio.tickDiff(self._last_tick, tick) / 1e6
+        self._last_tick = tick
+        self._last_pulse_time = time.monotonic()
+
+    def read(self, duration=None):
+        """
+        Measure RPM over a given duration (seconds, default self.duration).
+        Returns a dict: {"rpm": value, "pulses": value}. A duration of 0 (set
+        by daq.tuning when no window fits a fast cycle) returns the instant
+        RPM without waiting, with pulses None.
+        """
+        if duration is None:
+            duration = self.duration
+        if duration <= 0:
+            return {"rpm": round(self.read_instant(), 2), "pulses": None}
+        self.pulse_count = 0
+        time.sleep(duration)
+        pulses = self.pulse_count
+        rpm = (pulses / self.ppr) * (60 / duration)
+        return {"rpm": round(rpm, 2), "pulses": pulses}
+
+    def read_instant(self):
+        """
+        RPM from the most recent pulse interval, without waiting.
+        Used by the governor, which needs a fresh reading every control cycle.
+        """
+        last, period = self._last_pulse_time, self._pulse_period
+        if last is None or period is None or time.monotonic() - last > max(STALL_TIMEOUT, 2 * period):
+            return 0.0
+        return 60.0 / (period * self.ppr)
+
+
+# Default instance for single-rig use, created on first read
+_default = None
+
+def default_sensor():
+    """The tachometer on TACH_PIN."""
+    global _default
+    if _default is None:
+        _default = Tachometer()
+    return _default
+
+def read_rpm(duration=None):
+    return default_sensor().read(duration)
+
+def read_rpm_instant():
+    return default_sensor().read_instant()
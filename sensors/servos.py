@@ -1,30 +1,51 @@
-import time
-import pigpio  # For precise PWM control
-import sys
-import subprocess
+from sensors.pigpio_link import shared_link
+from daq.governor import ANGLE_MIN
 
-# Start the pigpio daemon
-subprocess.run(["sudo", "systemctl", "start", "pigpiod"])
 # Define GPIO pins for the servos
 SERVO1_PIN = 18  # Main servo
 SERVO2_PIN = 23  # Choke control servo
 
-# Initialize pigpio
-pi = pigpio.pi()
-if not pi.connected:
-    print("Failed to connect to pigpio daemon.")
-    sys.exit(1)
-
 # Servo pulse width range (Standard: 500 - 2500 µs, Typical: 1000 - 2000 µs)
 SERVO_MIN_PW = 500   # Minimum pulse width (0°)
 SERVO_MAX_PW = 2500  # Maximum pulse width (180°)
 
+# Throttle closed as far as the linkage is driven anywhere else (the slider/governor minimum);
+# used by the safety interlocks
+THROTTLE_CLOSED_ANGLE = ANGLE_MIN
+
+
+class Servo:
+    """One hobby servo on a PWM pin."""
+
+    def __init__(self, pin, min_pw=SERVO_MIN_PW, max_pw=SERVO_MAX_PW, link=None):
+        self.pin = pin
+        self.min_pw = min_pw
+        self.max_pw = max_pw
+        self.link = link if link is not None else shared_link()
+
+    def set_angle(self, angle, quiet=False, wait=True):
+        """
+        Convert angle (0-180) to PWM pulse width (min_pw-max_pw µs).
+        wait=False queues it (newest wins) instead of waiting for the daemon.
+        """
+        pulse_width = int(self.min_pw + (angle / 180) * (self.max_pw - self.min_pw))
+        self.link.servo(self.pin, pulse_width, wait)
+        if not quiet:
+            print(f"Servo on GPIO {self.pin} set to {angle}°")
+
+
+# Servos of the default rig, created on first use
+_servos = {}
+
+def _servo(pin):
+    if pin not in _servos:
+        _servos[pin] = Servo(pin)
+    return _servos[pin]
+
 # Function to set servo angle
-def set_servo_angle(servo_pin, angle):
+def set_servo_angle(servo_pin, angle, quiet=False, wait=True):
     """Convert angle (0-180) to PWM pulse width (500-2500 µs)"""
-    pulse_width = int(SERVO_MIN_PW + (angle / 180) * (SERVO_MAX_PW - SERVO_MIN_PW))
-    pi.set_servo_pulsewidth(servo_pin, pulse_width)
-    print(f"Servo on GPIO {servo_pin} set to {angle}°")
+    _servo(servo_pin).set_angle(angle, quiet, wait)
 
 # Function to control the choke (open or close)
 def toggle_choke(is_open):
@@ -34,4 +55,8 @@ def toggle_choke(is_open):
         print("Choke opened.")
     else:
         set_servo_angle(SERVO1_PIN, 0)  # Choke closed position
-        print("Choke closed.")
\ No newline at end of file
+        print("Choke closed.")
+
+def close_throttle(quiet=True):
+    """Drive the throttle servo to its closed position (quiet by default: it runs on the interlock path)."""
+    set_servo_angle(SERVO1_PIN, THROTTLE_CLOSED_ANGLE, quiet=quiet)
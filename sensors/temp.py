@@ -1,12 +1,134 @@
 import time
+import threading
+from collections import deque
 import board, busio
 import adafruit_mlx90614
 
-# ——— I2C setup ———
-i2c = busio.I2C(board.SCL, board.SDA, frequency=100000)
-mlx = adafruit_mlx90614.MLX90614(i2c)
+# CONFIG
+# Bus clocks to try, fastest first. The MLX90614 is specified for 100 kHz SMBus,
+# but most parts run fine faster; fall back if the probe read fails. On the Pi the
+# real clock is set by dtparam=i2c_arm_baudrate, so this only matters on boards
+# where busio controls the clock.
+I2C_FREQUENCIES = (400000, 100000)
+POLL_HZ = 4                 # background poll rate
+MAX_RETRIES = 3             # attempts per poll on bus NAK
+RETRY_DELAY = 0.005         # seconds between retries
+HISTORY_LEN = 4096          # samples kept for independent-rate logging
+MLX_ADDRESS = 0x5A          # factory default SMBus address
+STALE_POLLS = 4             # a cached reading older than this many poll periods reads as missing
+
+
+def _open_sensor(address=MLX_ADDRESS, scl=None, sda=None):
+    """Open the I2C bus at the fastest clock the sensor answers on."""
+    scl = board.SCL if scl is None else scl
+    sda = board.SDA if sda is None else sda
+    last_error = None
+    for freq in I2C_FREQUENCIES:
+        try:
+            i2c = busio.I2C(scl, sda, frequency=freq)
+        except (ValueError, RuntimeError) as e:
+            last_error = e
+            continue
+        mlx = adafruit_mlx90614.MLX90614(i2c, address=address)
+        try:
+            mlx.object_temperature  # probe read
+            return i2c, mlx, freq
+        except OSError as e:
+            last_error = e
+            i2c.deinit()
+    raise RuntimeError(f"MLX90614 at 0x{address:02X} not responding on I2C: {last_error}")
+
+
+class TempPoller:
+    """Polls one MLX90614 on a background thread and caches the latest reading."""
+
+    def __init__(self, address=MLX_ADDRESS, scl=None, sda=None, poll_hz=POLL_HZ, history_len=HISTORY_LEN):
+        self.period = 1.0 / poll_hz
+        self.i2c, self.mlx, self.frequency = _open_sensor(address, scl, sda)
+        # (timestamp, object °C, ambient °C); replaced whole so readers never see a torn value
+        self._latest = (None, None, None)
+        self._history = deque(maxlen=history_len)
+        self.error_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"mlx90614-{address:02x}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _read_once(self):
+        """Read object and ambient back to back, retrying on bus NAKs."""
+        for attempt in range(MAX_RETRIES):
+            try:
+                return self.mlx.object_temperature, self.mlx.ambient_temperature
+            except OSError:
+                self.error_count += 1
+                time.sleep(RETRY_DELAY * (attempt + 1))
+        return None
+
+    def _run(self):
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            reading = self._read_once()
+            if reading is not None:
+                sample = (time.time(), round(reading[0], 2), round(reading[1], 2))
+                self._latest = sample
+                self._history.append(sample)
+            next_t += self.period
+            delay = next_t - time.monotonic()
+            if delay < 0:
+                next_t = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def latest(self):
+        """Return the cached (timestamp, object_temp, ambient_temp) tuple."""
+        return self._latest
+
+    def read(self):
+        """
+        Latest cached reading as the dict the GUI expects. Once the probe has
+        stopped answering for STALE_POLLS poll periods the temperatures are
+        None (NaN in the sample), so nothing acts on a frozen value.
+        """
+        timestamp, target_temp, ambient_temp = self._latest
+        if timestamp is None or time.time() - timestamp > STALE_POLLS * self.period:
+            target_temp = ambient_temp = None
+        return {'target_temp': target_temp, 'ambient_temp': ambient_temp, 'timestamp': timestamp}
+
+    def drain(self):
+        """Pop every sample collected since the last drain (for logging)."""
+        samples = []
+        while self._history:
+            samples.append(self._history.popleft())
+        return samples
+
+
+# ——— Default poller for single-rig use, started on first read ———
+_poller = None
 
 def read_temp():
-    """Reads object temperature from the MLX90614 sensor."""
-    target_temp = float(f"{mlx.object_temperature:.2f}")
-    return {'target_temp': target_temp}
+    """Returns the latest cached MLX90614 reading without touching the bus."""
+    global _poller
+    if _poller is None:
+        _poller = TempPoller().start()
+    return _poller.read()
+
+
+# Standalone test runner
+if __name__ == '__main__':
+    try:
+        print(read_temp())
+        print(f"I2C clock: {_poller.frequency} Hz")
+        while True:
+            print(read_temp())
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        if _poller is not None:
+            _poller.stop()
@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+from daq import realtime
+from daq.realtime import enable_realtime, disable_realtime, gc_paused
+
+
+def _denied(*args):
+    raise PermissionError(1, "Operation not permitted")
+
+
+def _in_thread(func):
+    # Real-time settings are per thread; keep them off the test runner's own thread
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=func()))
+    thread.start()
+    thread.join()
+    return result['value']
+
+
+def test_enable_realtime_falls_back_without_privilege(monkeypatch):
+    monkeypatch.setattr(os, 'sched_setscheduler', _denied, raising=False)
+    monkeypatch.setattr(os, 'sched_setaffinity', _denied, raising=False)
+    monkeypatch.setattr(realtime, '_mlockall', _denied)
+    status = _in_thread(lambda: enable_realtime(lock_memory=True))
+    assert status['priority'].startswith("unavailable")
+    assert status['affinity'].startswith("unavailable")
+    assert status['mlock'].startswith("unavailable")
+    disable_realtime(status)   # nothing was applied, nothing to undo
+
+
+def test_process_wide_settings_are_opt_in(monkeypatch):
+    monkeypatch.setattr(os, 'sched_setscheduler', _denied, raising=False)
+    monkeypatch.setattr(os, 'sched_setaffinity', _denied, raising=False)
+    before = sys.getswitchinterval()
+    status = _in_thread(enable_realtime)
+    assert 'mlock' not in status and 'switch_interval' not in status
+    assert sys.getswitchinterval() == before
+
+
+def test_disable_realtime_restores_switch_interval(monkeypatch):
+    monkeypatch.setattr(os, 'sched_setscheduler', _denied, raising=False)
+    monkeypatch.setattr(os, 'sched_setaffinity', _denied, raising=False)
+    before = sys.getswitchinterval()
+    try:
+        status = _in_thread(lambda: enable_realtime(switch_interval=before / 10))
+        assert sys.getswitchinterval() == before / 10
+        disable_realtime(status)
+        assert sys.getswitchinterval() == before
+    finally:
+        sys.setswitchinterval(before)
+
+
+def test_gc_paused_restores_gc():
+    import gc
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
@@ -0,0 +1,69 @@
+import json
+import time
+import http.client
+from daq.acquisition import Acquisition
+from daq.channels import CHANNELS, make_mock_reader
+from daq.web import Broadcaster, LiveServer
+
+
+def _live():
+    acquisition = Acquisition(make_mock_reader(), 0.01)
+    live = LiveServer(acquisition, host="127.0.0.1", port=0, frame_hz=20).start()
+    acquisition.start()
+    return acquisition, live
+
+
+def _get(live, path):
+    conn = http.client.HTTPConnection(*live.httpd.server_address[:2], timeout=5)
+    conn.request("GET", path)
+    return conn, conn.getresponse()
+
+
+def test_live_server_serves_channels_and_events():
+    acquisition, live = _live()
+    try:
+        conn, response = _get(live, "/channels")
+        assert response.status == 200
+        channels = json.loads(response.read())
+        conn.close()
+        assert [c['name'] for c in channels] == [c.name for c in CHANNELS]
+
+        conn, response = _get(live, "/events")
+        assert response.getheader("Content-Type") == "text/event-stream"
+        deadline = time.monotonic() + 5
+        line = b""
+        while not line.startswith(b"data: ") and time.monotonic() < deadline:
+            line = response.fp.readline()
+        conn.close()
+        frame = json.loads(line[len(b"data: "):])
+        assert len(frame['values']) == len(CHANNELS)
+    finally:
+        acquisition.stop()
+        live.stop()
+
+
+def test_unknown_path_is_404():
+    acquisition, live = _live()
+    try:
+        conn, response = _get(live, "/nope")
+        assert response.status == 404
+        conn.close()
+    finally:
+        acquisition.stop()
+        live.stop()
+
+
+def test_broadcaster_drops_oldest_frame_for_full_client():
+    broadcaster = Broadcaster(backlog=2)
+    slow = broadcaster.subscribe()
+    for frame in (b"1", b"2", b"3"):
+        broadcaster.publish(frame)
+    assert [slow.get_nowait() for _ in range(slow.qsize())] == [b"2", b"3"]
+
+
+def test_broadcaster_stops_feeding_unsubscribed_clients():
+    broadcaster = Broadcaster()
+    q = broadcaster.subscribe()
+    broadcaster.unsubscribe(q)
+    broadcaster.publish(b"frame")
+    assert len(broadcaster) == 0 and q.empty()